@@ -0,0 +1,256 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+# Under the app's static/ folder, which Streamlit serves itself (server.enableStaticServing,
+# with range requests), so the browser fetches artifacts from the page's own origin.
+ARTIFACTS_DIR = os.getenv("ARTIFACTS_DIR", os.path.join("static", "artifacts"))
+# Base URL the browser uses for ARTIFACTS_DIR; relative to the Streamlit page by default.
+ARTIFACT_PUBLIC_URL = os.getenv("ARTIFACT_PUBLIC_URL", "app/static/artifacts")
+# Optional standalone server for deployments that serve artifacts elsewhere, e.g. behind a
+# reverse proxy at ARTIFACT_PUBLIC_URL=https://notes.example.com/artifacts ("1" starts it).
+ARTIFACT_SERVER = os.getenv("ARTIFACT_SERVER", "0") == "1"
+# Loopback only by default: artifacts are served without authentication.
+ARTIFACT_HOST = os.getenv("ARTIFACT_HOST", "127.0.0.1")
+ARTIFACT_PORT = int(os.getenv("ARTIFACT_PORT", "8765"))
+# Artifacts not written or re-used for this many seconds are pruned.
+ARTIFACT_TTL = int(os.getenv("ARTIFACT_TTL", str(7 * 24 * 3600)))
+
+CONTENT_TYPES = {
+    ".pdf": "application/pdf",
+    ".md": "text/markdown; charset=utf-8",
+    ".html": "text/html; charset=utf-8",
+    ".epub": "application/epub+zip",
+    ".txt": "text/plain; charset=utf-8",
+}
+CHUNK_SIZE = 64 * 1024
+
+# A handle is the SHA-256 of the content plus its extension, e.g. "3fa1...e9.pdf".
+HANDLE_PATTERN = re.compile(r"^[0-9a-f]{64}\.[a-z0-9]+$")
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def path_for(handle: str, directory: str = None) -> str:
+    if not HANDLE_PATTERN.match(handle or ""):
+        raise ValueError(f"Invalid artifact handle: {handle!r}")
+    return os.path.join(directory or ARTIFACTS_DIR, handle[:2], handle)
+
+
+def put(data, suffix: str = ".pdf", directory: str = None) -> str:
+    """Stores bytes (or text) under their content hash and returns the handle."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    handle = hashlib.sha256(data).hexdigest() + suffix
+    path = path_for(handle, directory)
+    if os.path.exists(path):
+        # Same content already stored; refresh it so pruning keeps it.
+        os.utime(path)
+        return handle
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        # Atomic, so readers never see a partial file and concurrent writers of the same content agree.
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return handle
+
+
+def read(handle: str, directory: str = None) -> bytes:
+    with open(path_for(handle, directory), "rb") as f:
+        return f.read()
+
+
+def read_text(handle: str, directory: str = None) -> str:
+    return read(handle, directory).decode("utf-8")
+
+
+def exists(handle: str, directory: str = None) -> bool:
+    try:
+        return os.path.isfile(path_for(handle, directory))
+    except ValueError:
+        return False
+
+
+def prune(max_age: int = ARTIFACT_TTL, directory: str = None):
+    """Deletes artifacts older than max_age seconds and returns how many were removed."""
+    directory = directory or ARTIFACTS_DIR
+    if not os.path.isdir(directory):
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.unlink(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+    return removed
+
+
+def url_for(handle: str, download: bool = False, filename: str = None) -> str:
+    """
+    Returns the browser URL of an artifact, mirroring its path in the store.
+
+    download=True makes the standalone server send it as an attachment;
+    Streamlit's static serving ignores it.
+    """
+    path_for(handle)
+    url = f"{ARTIFACT_PUBLIC_URL.rstrip('/')}/{handle[:2]}/{handle}"
+    if download:
+        url += "?download=1"
+        if filename:
+            url += f"&filename={quote(filename)}"
+    return url
+
+
+def parse_range(header: str, size: int):
+    """
+    Parses a single-range "bytes=" header into an inclusive (start, end).
+
+    Returns None when the header is absent or not a single byte range (the
+    whole file is served), and raises ValueError when it can't be satisfied.
+    """
+    match = RANGE_PATTERN.match((header or "").strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes.
+        length = int(last)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("range not satisfiable")
+    return start, end
+
+
+class ArtifactHandler(BaseHTTPRequestHandler):
+    """Serves GET/HEAD /artifacts/[<aa>/]<handle> with single-range support for PDF viewers."""
+
+    directory = None
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body):
+        url = urlsplit(self.path)
+        prefix = "/artifacts/"
+        handle = url.path[len(prefix):] if url.path.startswith(prefix) else ""
+        # url_for mirrors the store's layout, e.g. /artifacts/3f/3fa1...e9.pdf.
+        shard, _, rest = handle.partition("/")
+        if rest and rest[:2] == shard:
+            handle = rest
+        try:
+            path = path_for(handle, self.directory)
+            size = os.path.getsize(path)
+        except (ValueError, OSError):
+            self.send_error(404)
+            return
+
+        etag = f'"{handle}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        try:
+            byte_range = parse_range(self.headers.get("Range"), size)
+        except ValueError:
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{size}")
+            self.end_headers()
+            return
+
+        start, end = byte_range or (0, size - 1)
+        length = max(0, end - start + 1)
+        query = parse_qs(url.query)
+        extension = os.path.splitext(handle)[1]
+
+        self.send_response(206 if byte_range else 200)
+        self.send_header("Content-Type", CONTENT_TYPES.get(extension, "application/octet-stream"))
+        self.send_header("Content-Length", str(length))
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("ETag", etag)
+        # Content-addressed, so a handle's bytes never change.
+        self.send_header("Cache-Control", "public, max-age=31536000, immutable")
+        if byte_range:
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        if query.get("download"):
+            # Header values must be latin-1; keep the name plain ASCII.
+            filename = query.get("filename", [handle])[0].encode("ascii", "ignore").decode().replace('"', "")
+            self.send_header("Content-Disposition", f'attachment; filename="{filename}"')
+        else:
+            self.send_header("Content-Disposition", "inline")
+        self.end_headers()
+        if not send_body:
+            return
+
+        with open(path, "rb") as f:
+            f.seek(start)
+            remaining = length
+            while remaining > 0:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                try:
+                    self.wfile.write(chunk)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Viewers routinely abort a request once they have the bytes they need.
+                    return
+                remaining -= len(chunk)
+
+    def log_message(self, *args):
+        pass
+
+
+def serve(port: int = ARTIFACT_PORT, host: str = ARTIFACT_HOST, directory: str = None):
+    """Serves the artifact store from a daemon thread and returns the server."""
+    handler = type("BoundArtifactHandler", (ArtifactHandler,), {"directory": directory})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Artifacts available at http://{host}:{port}/artifacts/")
+    return server
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def ensure_server():
+    """Starts the process-wide artifact server once if ARTIFACT_SERVER is on; later calls return the same server."""
+    global _server
+    if not ARTIFACT_SERVER:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = serve()
+            except OSError as e:
+                # Typically another app process on this machine already serves the same store.
+                print(f"⚠️ Artifact server not started on port {ARTIFACT_PORT}: {e}")
+                _server = False
+        return _server or None
+
@@ -0,0 +1,179 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime
+
+import config
+import exporters
+import younote
+from video_url import InvalidVideoURL, extract_video_id, parse_video_url
+
+# Gemini calls are paced by ratelimit (GEMINI_RPM/GEMINI_TPM per key), which every
+# process using the key shares; this only bounds how many workflows run at once.
+DEFAULT_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "3"))
+DEFAULT_MAX_RETRIES = int(os.getenv("BATCH_MAX_RETRIES", "3"))
+
+
+def read_urls(path: str) -> list:
+    """Reads one URL per line, skipping blank lines and # comments."""
+    with open(path, encoding="utf-8") as f:
+        return [
+            line.strip()
+            for line in f
+            if line.strip() and not line.strip().startswith("#")
+        ]
+
+
+def _write_exports(final_state, url, output_dir):
+    video_id = extract_video_id(url) or "unknown"
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    files = []
+    for note_type in younote.NOTE_TYPES[final_state["decision"]]:
+        for name, data in final_state.get("exports", {}).get(note_type, {}).items():
+            if not data:
+                continue
+            suffix = exporters.FORMATS[name].suffix
+            path = os.path.join(output_dir, f"notes_{note_type}_{video_id}_{timestamp}{suffix}")
+            with open(path, "wb") as f:
+                f.write(data)
+            files.append(path)
+    return files
+
+
+async def process_url(url, decision, output_dir, max_retries=DEFAULT_MAX_RETRIES, formats=None):
+    """Runs one URL through the workflow with retries and returns its manifest record."""
+    started = time.monotonic()
+    error = None
+    try:
+        parse_video_url(url)
+    except InvalidVideoURL as e:
+        # Retrying can't fix the URL.
+        print(f"❌ {url}: {e}")
+        return {
+            "url": url,
+            "video_id": None,
+            "status": "failed",
+            "decision": decision,
+            "files": [],
+            "attempts": 0,
+            "seconds": round(time.monotonic() - started, 2),
+            "error": str(e),
+        }
+    for attempt in range(1, max_retries + 1):
+        try:
+            final_state = await younote.extract_youtube_content(url, decision, formats=formats)
+            if final_state.get("error"):
+                raise RuntimeError(final_state["error"])
+            files = _write_exports(final_state, url, output_dir)
+            return {
+                "url": url,
+                "video_id": extract_video_id(url),
+                "status": "ok",
+                "decision": decision,
+                "files": files,
+                "attempts": attempt,
+                "seconds": round(time.monotonic() - started, 2),
+            }
+        except Exception as e:
+            error = str(e)
+            print(f"❌ {url} failed (attempt {attempt}/{max_retries}): {error}")
+            if attempt < max_retries:
+                # Exponential backoff with jitter so retries don't hit the quota in lockstep.
+                await asyncio.sleep(2 ** attempt + random.uniform(0, 1))
+
+    return {
+        "url": url,
+        "video_id": extract_video_id(url),
+        "status": "failed",
+        "decision": decision,
+        "files": [],
+        "attempts": max_retries,
+        "seconds": round(time.monotonic() - started, 2),
+        "error": error,
+    }
+
+
+async def run_batch(
+    urls,
+    decision: int = 2,
+    output_dir: str = "notes",
+    manifest_path: str = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    formats=None,
+):
+    """
+    Converts many URLs concurrently and returns their manifest records.
+
+    At most `concurrency` workflows run at once. Each finished URL is appended
+    to the JSONL manifest (default: <output_dir>/manifest.jsonl) and its exports
+    (`formats`, default exporters.EXPORT_FORMATS) are written as soon as it
+    completes; a failed URL never aborts the batch.
+    """
+    formats = exporters.validate_formats(formats)
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = manifest_path or os.path.join(output_dir, "manifest.jsonl")
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    manifest_lock = asyncio.Lock()
+
+    async def worker(url):
+        async with semaphore:
+            record = await process_url(url, decision, output_dir, max_retries, formats)
+        async with manifest_lock:
+            with open(manifest_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+        print(f"{'✅' if record['status'] == 'ok' else '❌'} {url} -> {record['status']}")
+        return record
+
+    return await asyncio.gather(*(worker(url) for url in urls))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate notes (PDF, HTML, EPUB, text) for many YouTube URLs.")
+    parser.add_argument("urls", nargs="*", help="YouTube URLs to convert")
+    parser.add_argument("-f", "--file", help="File with one URL per line")
+    parser.add_argument("-d", "--decision", type=int, choices=[1, 2, 3], default=2,
+                        help="1 = short, 2 = long, 3 = both")
+    parser.add_argument("-o", "--output-dir", default="notes")
+    parser.add_argument("-m", "--manifest", help="JSONL manifest path (default: <output-dir>/manifest.jsonl)")
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--retries", type=int, default=DEFAULT_MAX_RETRIES)
+    parser.add_argument("--formats", default=",".join(exporters.EXPORT_FORMATS),
+                        help=f"Comma-separated export formats ({', '.join(exporters.FORMATS)})")
+    args = parser.parse_args(argv)
+
+    urls = list(args.urls)
+    if args.file:
+        urls.extend(read_urls(args.file))
+    if not urls:
+        parser.error("no URLs given")
+    formats = [name.strip() for name in args.formats.split(",") if name.strip()]
+    try:
+        exporters.validate_formats(formats)
+    except ValueError as e:
+        parser.error(str(e))
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    if not config.get_api_key():
+        config.set_api_key(os.getenv("GEMINI_API_KEY"))
+
+    records = asyncio.run(run_batch(
+        urls,
+        decision=args.decision,
+        output_dir=args.output_dir,
+        manifest_path=args.manifest,
+        concurrency=args.concurrency,
+        max_retries=args.retries,
+        formats=formats,
+    ))
+    failed = sum(1 for r in records if r["status"] != "ok")
+    print(f"Done: {len(records) - failed} succeeded, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,67 @@
+"""
+PDF rendering benchmark over synthetic markdown from 1 KB to 5 MB.
+
+Each size is measured in a fresh process so its peak RSS is not inflated by
+the larger documents before it. Reports throughput, p50/p95 render time and
+peak RSS per size.
+
+Run from the repository root:
+    python benchmarks/bench_pdf.py [--sizes 1K,10K,100K,1M,5M] [--repeat 5]
+"""
+import argparse
+import multiprocessing
+import time
+
+from common import peak_rss_mb, percentile, synthetic_markdown
+
+UNITS = {"K": 1024, "M": 1024 * 1024}
+
+
+def parse_size(text):
+    text = text.strip().upper()
+    if text[-1] in UNITS:
+        return int(float(text[:-1]) * UNITS[text[-1]])
+    return int(text)
+
+
+def measure(size, repeat, results):
+    import pdf_converter
+
+    markdown = synthetic_markdown(size)
+    baseline_rss = peak_rss_mb()
+    timings = []
+    pdf_size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        pdf_size = len(pdf_converter.convert_notes_to_pdf(markdown, "Benchmark", "https://youtu.be/bench"))
+        timings.append(time.perf_counter() - started)
+    results.put((size, timings, pdf_size, baseline_rss, peak_rss_mb()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1K,10K,100K,1M,5M")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    print(f"{'markdown':>10} {'pdf':>10} {'MB/s':>8} {'p50 ms':>10} {'p95 ms':>10} {'peak RSS MB':>12}")
+    for size in (parse_size(s) for s in args.sizes.split(",")):
+        # Big documents take a while; don't repeat them as often.
+        repeat = args.repeat if size < 1024 * 1024 else max(1, args.repeat // 5)
+        results = context.Queue()
+        process = context.Process(target=measure, args=(size, repeat, results))
+        process.start()
+        size, timings, pdf_size, baseline_rss, peak_rss = results.get()
+        process.join()
+
+        throughput = size / (1024 * 1024) / percentile(timings, 50)
+        print(
+            f"{size / 1024:>9.0f}K {pdf_size / 1024:>9.0f}K {throughput:>8.2f} "
+            f"{percentile(timings, 50) * 1000:>10.1f} {percentile(timings, 95) * 1000:>10.1f} "
+            f"{peak_rss:>7.1f} (+{peak_rss - baseline_rss:.1f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
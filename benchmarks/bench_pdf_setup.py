@@ -0,0 +1,66 @@
+"""
+Per-document setup cost of the PDF renderer, before and after theme caching.
+
+"before" rebuilds the stylesheet and uses uncompiled re.sub calls for every
+document, like convert_notes_to_pdf used to; "after" uses the shared
+NotesRenderer with its prebuilt theme and the current format_text, which
+parses inline markup in a single pass (correct nesting and escaping rather
+than raw speed).
+
+Run from the repository root:
+    python benchmarks/bench_pdf_setup.py
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdf_converter
+
+SAMPLE_LINE = "Some **bold** text, some *italic* text and `inline code` in one line."
+SMALL_NOTES = (
+    "## Topic\n"
+    "* **Key term**: a short *definition* with `code`\n"
+    "📊 **[DIAGRAM ALERT]**: a small chart\n"
+    "Plain paragraph text.\n"
+) * 5
+
+
+def format_text_uncompiled(text):
+    text = re.sub(r"\*\*(.*?)\*\*", r"<b>\1</b>", text)
+    text = re.sub(r"\*(.*?)\*", r"<i>\1</i>", text)
+    text = re.sub(r"`([^`]+)`", r'<font name="Courier" color="#666666">\1</font>', text)
+    return text
+
+
+def per_call(label, func, number):
+    seconds = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print(f"{label:<45} {seconds * 1e6:10.1f} us")
+    return seconds
+
+
+def main():
+    renderer = pdf_converter.get_renderer()
+
+    print("Stylesheet setup per document")
+    before = per_call("  before: build_styles() every call", pdf_converter.build_styles, 200)
+    after = per_call("  after: shared NotesRenderer theme", lambda: renderer.styles["Normal"], 200000)
+    print(f"  saved per document: {(before - after) * 1e6:.1f} us")
+
+    print("Inline formatting per line")
+    per_call("  before: re.sub with pattern strings", lambda: format_text_uncompiled(SAMPLE_LINE), 20000)
+    per_call("  after: format_text (single-pass parser)", lambda: pdf_converter.format_text(SAMPLE_LINE), 20000)
+
+    print("Small document end to end")
+    per_call(
+        "  before: fresh NotesRenderer per document",
+        lambda: pdf_converter.NotesRenderer().convert(SMALL_NOTES),
+        50,
+    )
+    per_call("  after: shared renderer", lambda: renderer.convert(SMALL_NOTES), 50)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+End-to-end workflow benchmark with the MCP agent and Gemini replaced by fakes.
+
+Runs extract_youtube_content for many synthetic video URLs and reports
+throughput, p50/p95 latency and peak RSS. The result cache is disabled so
+every request runs the full graph. Nothing touches the network: by default
+the transcript fast path is off and every request goes through the fake
+agent; --transcript-bytes serves synthetic transcripts from a temporary
+directory instead, so the fast path is measured offline too.
+
+Run from the repository root, e.g.:
+    python benchmarks/bench_pipeline.py --requests 50 --concurrency 10
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("YTPDF_CACHE_ENABLED", "0")
+# The fakes have no quota; the per-key rate limiter would only add waits.
+os.environ.setdefault("GEMINI_RPM", "0")
+os.environ.setdefault("GEMINI_TPM", "0")
+# The bench IDs are valid video IDs; never look their captions up on YouTube.
+os.environ.setdefault("TRANSCRIPT_PROVIDER", "none")
+
+from common import peak_rss_mb, percentile, synthetic_transcript
+
+import fakes
+import transcripts
+import younote
+
+
+def _video_url(index):
+    return f"https://www.youtube.com/watch?v=bench{index:06d}"
+
+
+async def run(args):
+    """Runs the benchmark, prints the report and returns its numbers."""
+    if not args.transcript_bytes:
+        transcripts.TRANSCRIPT_PROVIDER = "none"
+        return await _run(args)
+    with tempfile.TemporaryDirectory(prefix="ytpdf-bench-") as directory:
+        for index in range(args.requests):
+            path = os.path.join(directory, f"bench{index:06d}.txt")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(synthetic_transcript(args.transcript_bytes, seed=index))
+        transcripts.TRANSCRIPT_PROVIDER = f"file:{directory}"
+        return await _run(args)
+
+
+async def _run(args):
+    agent = fakes.install(
+        younote,
+        agent_latency=args.agent_latency,
+        agent_bytes=args.agent_bytes,
+        llm_latency=args.llm_latency,
+        llm_bytes=args.llm_bytes,
+    )
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+    errors = 0
+
+    async def one(index):
+        nonlocal errors
+        url = _video_url(index)
+        async with semaphore:
+            started = time.perf_counter()
+            state = await younote.extract_youtube_content(url, args.decision, api_key="offline-benchmark")
+            latencies.append(time.perf_counter() - started)
+            if state.get("error"):
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - started
+
+    print(f"requests:     {args.requests} (concurrency {args.concurrency}, decision {args.decision})")
+    print(f"agent calls:  {agent.calls}")
+    print(f"transcripts:  {transcripts.TRANSCRIPT_PROVIDER}")
+    print(f"errors:       {errors}")
+    print(f"throughput:   {args.requests / elapsed:.2f} req/s")
+    print(f"latency p50:  {percentile(latencies, 50) * 1000:.1f} ms")
+    print(f"latency p95:  {percentile(latencies, 95) * 1000:.1f} ms")
+    print(f"peak RSS:     {peak_rss_mb():.1f} MB (this process; PDF workers not included)")
+    return {"agent_calls": agent.calls, "errors": errors, "latencies": latencies}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--decision", type=int, choices=[1, 2, 3], default=2)
+    parser.add_argument("--agent-latency", type=float, default=0.5, help="seconds per fake agent run")
+    parser.add_argument("--agent-bytes", type=int, default=12_000, help="size of the fake analysis")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="seconds per fake Gemini call")
+    parser.add_argument("--llm-bytes", type=int, default=4_000, help="size of the fake markdown notes")
+    parser.add_argument("--transcript-bytes", type=int, default=0,
+                        help="size of a synthetic transcript per video (0 runs every request through the agent)")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Prompt token report per workflow stage, before and after input compaction.
+
+For each stage the prompt is split into its static instructions (the prefix
+Gemini can serve from its context cache) and the per-request input. Token
+counts are estimated at ~4 characters per token, like the rate limiter does,
+unless --gemini is given, which asks Gemini's countTokens (needs GEMINI_API_KEY).
+
+Run from the repository root:
+    python benchmarks/bench_prompts.py [--slides 12] [--analysis notes.md]
+"""
+import argparse
+import os
+
+from common import synthetic_analysis
+
+import chunking
+import compaction
+import prompts
+
+
+def estimated_tokens(text):
+    return len(text) // 4
+
+
+def conversion_prompts(content):
+    """The prompts the markdown stage sends for both variants of one analysis."""
+    stages = {}
+    for note_type, build in (("short", prompts.get_short_convert_markdown_prompt),
+                             ("long", prompts.get_long_convert_markdown_prompt)):
+        if not chunking.needs_map_reduce(content):
+            stages[note_type] = [build(content)]
+            continue
+        parts = chunking.split_analysis(content)
+        stages[f"{note_type} (map)"] = [
+            prompts.get_chunk_convert_markdown_prompt(part, note_type, index, len(parts))
+            for index, part in enumerate(parts, 1)
+        ]
+    return stages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--slides", type=int, default=12, help="Slides in the synthetic analysis")
+    parser.add_argument("--analysis", help="Use this analysis file instead of a synthetic one")
+    parser.add_argument("--gemini", action="store_true", help="Count tokens with Gemini instead of estimating")
+    args = parser.parse_args()
+
+    count = estimated_tokens
+    if args.gemini:
+        import clients
+
+        count = clients.get_llm(os.environ["GEMINI_API_KEY"]).get_num_tokens
+
+    if args.analysis:
+        with open(args.analysis, encoding="utf-8") as f:
+            analysis = f.read()
+    else:
+        analysis = synthetic_analysis(args.slides)
+    compacted, stats = compaction.compact(analysis)
+
+    print(f"analysis: {stats.chars_before} -> {stats.chars_after} chars, "
+          f"{stats.duplicates_removed} repeated passages and {stats.headings_removed} scaffolding lines removed")
+    print(f"{'stage':<16} {'calls':>5} {'prefix':>8} {'input':>8} {'compacted':>10} {'saved':>7}")
+
+    analysis_prompt = prompts.get_video_analysis_prompt("https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+    print(f"{'analysis':<16} {1:>5} {count(analysis_prompt.instructions):>8} "
+          f"{count(analysis_prompt.content):>8} {'-':>10} {'-':>7}")
+
+    before, after = conversion_prompts(analysis), conversion_prompts(compacted)
+    for stage in sorted(set(before) | set(after)):
+        original = before.get(stage, [])
+        reduced = after.get(stage, [])
+        prefix = count(next(iter(original or reduced)).instructions)
+        input_before = sum(count(prompt.content) for prompt in original)
+        input_after = sum(count(prompt.content) for prompt in reduced)
+        saved = 1 - input_after / input_before if input_before else 0
+        print(f"{stage:<16} {len(reduced):>5} {prefix:>8} {input_before:>8} {input_after:>10} {saved:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
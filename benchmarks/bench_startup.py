@@ -0,0 +1,100 @@
+"""
+Cold-start cost of the entry-point modules, and of the heavy imports they defer.
+
+Every measurement runs in a fresh interpreter: the time and peak RSS of
+importing each entry point, the first-use cost of each deferred dependency
+(compiling the graph, loading the agent, the Gemini client and ReportLab),
+and the slowest imports of `younote` according to `python -X importtime`.
+
+Run from the repository root:
+    python benchmarks/bench_startup.py --repeat 5
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = ["younote", "jobs", "pdf_workers", "batch"]
+# What the first generation pays for on top of `import younote`.
+FIRST_USE = {
+    "younote.get_app()": "import younote; younote.get_app()",
+    "import yt_mcp (agno, mcp)": "import yt_mcp",
+    "Gemini chat client class": "import clients; clients._chat_model_class()",
+    "pdf_converter.get_renderer()": "import pdf_converter; pdf_converter.get_renderer()",
+}
+
+PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+{setup}
+elapsed = time.perf_counter() - started
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+print(json.dumps({{"seconds": elapsed, "rss_mb": peak_mb}}))
+"""
+
+
+def probe(setup, importtime=False):
+    """Runs `setup` in a fresh interpreter and returns (seconds, peak RSS in MB, stderr)."""
+    command = [sys.executable] + (["-X", "importtime"] if importtime else [])
+    command += ["-c", PROBE.format(setup=setup)]
+    result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, check=True)
+    measured = json.loads(result.stdout.strip().splitlines()[-1])
+    return measured["seconds"], measured["rss_mb"], result.stderr
+
+
+def best_of(setup, repeat):
+    runs = [probe(setup)[:2] for _ in range(repeat)]
+    return min(seconds for seconds, _ in runs), min(rss for _, rss in runs)
+
+
+def parse_importtime(stderr):
+    """Yields (depth, cumulative microseconds, module) for each -X importtime line."""
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Two spaces of indentation per nesting level.
+        yield (len(name) - len(name.lstrip())) // 2, int(cumulative), name.strip()
+
+
+def slowest_imports(module, count):
+    """Imports made by `module` and its direct imports, by cumulative import time."""
+    startup = {name for _, _, name in parse_importtime(probe("pass", importtime=True)[2])}
+    imports = [
+        (cumulative, name)
+        for depth, cumulative, name in parse_importtime(probe(f"import {module}", importtime=True)[2])
+        if depth <= 1 and name not in startup
+    ]
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    parser.add_argument("--top", type=int, default=12, help="Slowest imports of younote to list")
+    args = parser.parse_args()
+
+    baseline, baseline_rss = best_of("pass", args.repeat)
+    print(f"{'bare interpreter (RSS baseline)':<35} {baseline * 1000:9.1f} ms {baseline_rss:8.1f} MB")
+
+    print("Entry point imports")
+    for module in ENTRY_POINTS:
+        seconds, rss = best_of(f"import {module}", args.repeat)
+        print(f"  {'import ' + module:<33} {seconds * 1000:9.1f} ms {rss:8.1f} MB")
+
+    print("Deferred until first use (including the import above)")
+    for label, setup in FIRST_USE.items():
+        seconds, rss = best_of(setup, args.repeat)
+        print(f"  {label:<33} {seconds * 1000:9.1f} ms {rss:8.1f} MB")
+
+    print("Slowest imports of younote (-X importtime, cumulative)")
+    for cumulative, name in slowest_imports("younote", args.top):
+        print(f"  {name:<33} {cumulative / 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
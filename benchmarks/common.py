@@ -0,0 +1,122 @@
+"""Helpers shared by the benchmark scripts."""
+import os
+import random
+import resource
+import sys
+
+# Make the repository modules importable when a script is run directly.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = (
+    "lecture slide concept theorem example gradient matrix protocol energy cell "
+    "market function variable proof analysis model data network process system"
+).split()
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS reports bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def synthetic_markdown(size_bytes, seed=0):
+    """
+    Builds deterministic notes markdown of roughly size_bytes, using the
+    structures the conversion prompts produce: headings, bullets with bold
+    terms, numbered lists, tables, code blocks and diagram alerts.
+    """
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    section = 0
+    while total < size_bytes:
+        section += 1
+        block = [
+            f"## {section}. {_sentence(rng, 4)}",
+            "",
+            _sentence(rng, 30) + ".",
+            f"### {_sentence(rng, 3)}",
+            f"* **{rng.choice(WORDS)}**: {_sentence(rng)} with *emphasis* and `code`.",
+            f"  - {_sentence(rng, 8)}",
+            f"1. {_sentence(rng, 10)}",
+            f"2. {_sentence(rng, 10)}",
+            "| Term | Meaning |",
+            "|------|---------|",
+            f"| **{rng.choice(WORDS)}** | {_sentence(rng, 6)} |",
+            "```",
+            f"f(x) = {rng.randint(1, 9)}x + {rng.randint(1, 9)}",
+            "```",
+            f"📊 **[DIAGRAM ALERT]**: {_sentence(rng, 14)}",
+            "",
+        ]
+        text = "\n".join(block) + "\n"
+        parts.append(text)
+        total += len(text.encode("utf-8"))
+    return "".join(parts)
+
+
+def synthetic_analysis(slides=12, seed=0):
+    """
+    Builds a deterministic video analysis shaped like the analysis prompt's output:
+    its section headings, "**SLIDE N**" entries and "**Minutes X-Y**" blocks, with
+    slide text restated under explanations, inventory and timeline as models do.
+    """
+    rng = random.Random(seed)
+    titles = [_sentence(rng, 3) for _ in range(slides)]
+    points = [[_sentence(rng, 14) + "." for _ in range(3)] for _ in range(slides)]
+
+    lines = ["## SLIDE CONTENT EXTRACTION (600-800 words)", ""]
+    for number, (title, slide_points) in enumerate(zip(titles, points), 1):
+        lines.append(f"**SLIDE {number}**: {title} - {_sentence(rng, 10)}.")
+        lines.extend(f"- **Main Content**: {point}" for point in slide_points)
+        lines.append(f"- **Key Terms**: {', '.join(rng.sample(WORDS, 4))}")
+        lines.append("")
+    lines.append("[Continue for all slides]")
+
+    lines += ["", "## TEACHER'S EXPLANATIONS (800-1000 words)", ""]
+    for title, slide_points in zip(titles, points):
+        lines.append(f"### {title}")
+        lines.append(f"- **Detailed Explanations**: {_sentence(rng, 25)}.")
+        lines.append(f"- **Emphasis Points**: {slide_points[0]}")
+        lines.append("")
+
+    lines += ["## COMPLETE EDUCATIONAL CONTENT INVENTORY (400-500 words)", ""]
+    lines.extend(f"- **Concepts Taught**: {slide_points[1]}" for slide_points in points)
+
+    lines += ["", "## CHRONOLOGICAL LEARNING PROGRESSION", ""]
+    for number, (title, slide_points) in enumerate(zip(titles, points)):
+        lines.append(f"**Minutes {number * 2}-{number * 2 + 2}**: {title}")
+        lines.append(f"- Slide content: {slide_points[0]}")
+        lines.append(f"- Teacher explanation: {_sentence(rng, 12)}.")
+        lines.append(f"- Key learning points: {slide_points[2]}")
+        lines.append("")
+    lines.append("[Continue throughout entire video]")
+    return "\n".join(lines) + "\n"
+
+
+def synthetic_transcript(size_bytes, seed=0):
+    """Builds a deterministic transcript of roughly size_bytes in the "[mm:ss] text" form transcripts.py produces."""
+    rng = random.Random(seed)
+    lines = []
+    total = 0
+    minute = 0
+    while total < size_bytes:
+        line = f"[{minute // 60:02d}:{minute % 60:02d}] " + " ".join(_sentence(rng, 15) + "." for _ in range(6))
+        lines.append(line)
+        total += len(line.encode("utf-8")) + 1
+        minute += 1
+    return "\n".join(lines)
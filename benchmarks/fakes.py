@@ -0,0 +1,88 @@
+"""
+Deterministic local stand-ins for the MCP agent and the Gemini chat model.
+
+Both fakes sleep for a configurable latency and return text of a configurable
+size, so the whole workflow can be benchmarked without Node, npx or network.
+"""
+import asyncio
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from common import synthetic_markdown
+
+
+class FakeAgent:
+    """Replacement for yt_mcp.run_agent with fixed latency and output size."""
+
+    def __init__(self, latency=0.5, output_bytes=12_000, chunk_bytes=200):
+        self.latency = latency
+        self.output = synthetic_markdown(output_bytes, seed=1)
+        self.chunk_bytes = chunk_bytes
+        self.calls = 0
+
+    async def __call__(self, message, on_token=None, on_retry=None, on_usage=None):
+        self.calls += 1
+        if on_usage is not None:
+            # Same rough 4-characters-per-token estimate FakeChatModel reports.
+            on_usage((len(str(message)) + len(self.output)) // 4)
+        if on_token is None:
+            await asyncio.sleep(self.latency)
+            return self.output
+
+        chunks = [self.output[i:i + self.chunk_bytes] for i in range(0, len(self.output), self.chunk_bytes)]
+        for chunk in chunks:
+            await asyncio.sleep(self.latency / len(chunks))
+            on_token(chunk)
+        return self.output
+
+
+class FakeChatModel:
+    """
+    Replacement for ChatGoogleGenerativeAI covering the calls the workflow makes
+    (ainvoke, abatch, astream), including usage_metadata for token accounting.
+    """
+
+    latency = 0.3
+    output_bytes = 4_000
+    chunk_bytes = 100
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.output = synthetic_markdown(self.output_bytes, seed=2)
+
+    def _usage(self, prompt):
+        prompt_tokens = len(str(prompt)) // 4
+        output_tokens = len(self.output) // 4
+        return {
+            "input_tokens": prompt_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": prompt_tokens + output_tokens,
+        }
+
+    async def ainvoke(self, prompt, *args, **kwargs):
+        await asyncio.sleep(self.latency)
+        return AIMessage(content=self.output, usage_metadata=self._usage(prompt))
+
+    async def abatch(self, prompts, *args, **kwargs):
+        return await asyncio.gather(*(self.ainvoke(prompt) for prompt in prompts))
+
+    async def astream(self, prompt, *args, **kwargs):
+        chunks = [self.output[i:i + self.chunk_bytes] for i in range(0, len(self.output), self.chunk_bytes)]
+        for index, chunk in enumerate(chunks):
+            await asyncio.sleep(self.latency / len(chunks))
+            usage = self._usage(prompt) if index == len(chunks) - 1 else None
+            yield AIMessageChunk(content=chunk, usage_metadata=usage)
+
+
+def install(younote, agent_latency=0.5, agent_bytes=12_000, llm_latency=0.3, llm_bytes=4_000):
+    """Swaps the fakes into an imported younote module and returns the fake agent."""
+    agent = FakeAgent(latency=agent_latency, output_bytes=agent_bytes)
+    FakeChatModel.latency = llm_latency
+    FakeChatModel.output_bytes = llm_bytes
+
+    import clients
+
+    younote.run_agent = agent
+    clients.ChatGoogleGenerativeAI = FakeChatModel
+    clients.get_pool().clear()
+    return agent
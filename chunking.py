@@ -0,0 +1,70 @@
+import os
+import re
+
+# Analyses longer than this (in characters) are converted with map-reduce.
+MAP_REDUCE_THRESHOLD = int(os.getenv("MAP_REDUCE_THRESHOLD", "24000"))
+# Target size of one map chunk, in characters.
+MAP_CHUNK_CHARS = int(os.getenv("MAP_CHUNK_CHARS", "12000"))
+# Map calls in flight at once per conversion.
+MAP_PARALLELISM = int(os.getenv("MAP_PARALLELISM", "4"))
+
+# Boundaries the analysis prompt produces: "## SECTION" headings, "**SLIDE N**"
+# entries and "**Minutes X-Y**" chronological blocks.
+SECTION_BOUNDARY = re.compile(r"^(?=##\s)|^(?=\s*\*\*(?:Minutes?|SLIDE)\s+\d)", re.MULTILINE)
+
+
+def split_sections(content: str) -> list:
+    """Splits an analysis at its section headings, slides and minute blocks, keeping each boundary with its section."""
+    starts = sorted({m.start() for m in SECTION_BOUNDARY.finditer(content)} | {0})
+    sections = [content[start:end] for start, end in zip(starts, starts[1:] + [len(content)])]
+    return [section for section in sections if section.strip()]
+
+
+def _split_oversized(section: str, max_chars: int) -> list:
+    """Splits a section that is too big on its own at line boundaries."""
+    pieces = []
+    current = ""
+    for line in section.splitlines(keepends=True):
+        while len(line) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(line[:max_chars])
+            line = line[max_chars:]
+        if current and len(current) + len(line) > max_chars:
+            pieces.append(current)
+            current = ""
+        current += line
+    if current.strip():
+        pieces.append(current)
+    return pieces
+
+
+def split_analysis(content: str, max_chars: int = MAP_CHUNK_CHARS) -> list:
+    """
+    Splits a video analysis into chunks of at most about max_chars.
+
+    Whole sections are packed greedily into chunks so the map prompts see
+    complete slides/minute blocks; only a single section bigger than
+    max_chars is cut further.
+    """
+    chunks = []
+    current = ""
+    for section in split_sections(content):
+        if len(section) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.extend(_split_oversized(section, max_chars))
+        elif len(current) + len(section) > max_chars:
+            chunks.append(current)
+            current = section
+        else:
+            current += section
+    if current.strip():
+        chunks.append(current)
+    return chunks
+
+
+def needs_map_reduce(content: str) -> bool:
+    return len(content) > MAP_REDUCE_THRESHOLD
@@ -0,0 +1,90 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import config
+
+# Clients kept alive across requests, over all API keys and client kinds.
+CLIENT_POOL_SIZE = int(os.getenv("CLIENT_POOL_SIZE", "32"))
+
+# langchain_google_genai takes about a second to import, so it's loaded with the first
+# client. Assigning a class here beforehand (as the benchmarks' fakes do) replaces it.
+ChatGoogleGenerativeAI = None
+
+
+def fingerprint(api_key: str) -> str:
+    """Short stable ID for an API key, safe to use as a dict key, label or log field."""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+class ClientPool:
+    """
+    Bounded LRU of API clients keyed by (kind, key fingerprint).
+
+    Reusing a client keeps its HTTP connections warm; the bound keeps a
+    process serving many users with their own keys from growing without limit.
+    """
+
+    def __init__(self, size: int = CLIENT_POOL_SIZE):
+        self.size = size
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, kind: str, api_key: str, factory):
+        key = (kind, fingerprint(api_key))
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+                return client
+        # Built outside the lock; if two threads race, the first one stored wins.
+        client = factory(api_key)
+        with self._lock:
+            client = self._clients.setdefault(key, client)
+            self._clients.move_to_end(key)
+            while len(self._clients) > self.size:
+                self._clients.popitem(last=False)
+        return client
+
+    def clear(self):
+        with self._lock:
+            self._clients.clear()
+
+    def __len__(self):
+        return len(self._clients)
+
+
+_pool = ClientPool()
+
+
+def get_pool() -> ClientPool:
+    return _pool
+
+
+def _chat_model_class():
+    global ChatGoogleGenerativeAI
+    if ChatGoogleGenerativeAI is None:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI
+
+
+def get_llm(api_key: str = None):
+    """Returns the LangChain Gemini chat client for this key (default: the current request's key)."""
+    api_key = api_key or config.require_api_key()
+    return _pool.get(
+        "langchain",
+        api_key,
+        # Retries are left to ratelimit.call, which backs off per key instead of per client.
+        lambda key: _chat_model_class()(
+            model="gemini-2.5-flash", api_key=key, temperature=0, max_retries=1
+        ),
+    )
+
+
+def get_genai_client(api_key: str = None):
+    """Returns the google-genai client the agno agent's Gemini model uses for this key."""
+    from google import genai
+
+    api_key = api_key or config.require_api_key()
+    return _pool.get("genai", api_key, lambda key: genai.Client(api_key=key))
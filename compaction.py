@@ -0,0 +1,78 @@
+import os
+import re
+from dataclasses import dataclass
+
+# Compact the analysis before it's sent to the conversion model ("0" sends it verbatim).
+COMPACT_CONTENT = os.getenv("COMPACT_CONTENT", "1") == "1"
+# Lines shorter than this (after normalization) are never treated as duplicates.
+COMPACT_MIN_LINE_CHARS = int(os.getenv("COMPACT_MIN_LINE_CHARS", "40"))
+
+# The section headings the analysis prompt asks for; they only structure the
+# analysis and carry nothing the notes need.
+SCAFFOLDING_HEADING = re.compile(
+    r"^#{1,4}\s*(?:\d+\.\s*)?(?:SLIDE CONTENT EXTRACTION|TEACHER'?S EXPLANATIONS"
+    r"|EDUCATIONAL STRUCTURE(?: & LEARNING OBJECTIVES)?|COMPLETE EDUCATIONAL CONTENT INVENTORY"
+    r"|CHRONOLOGICAL LEARNING PROGRESSION|EXTRACTION REQUIREMENTS)\b.*$",
+    re.IGNORECASE,
+)
+# Template lines the model sometimes echoes back, e.g. "[Continue for all slides]".
+PLACEHOLDER_LINE = re.compile(r"^\s*\[(?:Continue|Repeat)[^\]]*\]\s*$", re.IGNORECASE)
+# Leading bullet/number markers and a short "Label:" prefix, ignored when comparing lines,
+# so "- Slide content: X" repeats "**Main Content**: X".
+LINE_PREFIX = re.compile(r"^\s*(?:[-*+]|\d+[.)])?\s*(?:\**[\w' /&-]{1,40}\**\s*:\s*)?")
+NON_WORD = re.compile(r"[\W_]+")
+
+
+@dataclass
+class CompactionStats:
+    chars_before: int = 0
+    chars_after: int = 0
+    headings_removed: int = 0
+    duplicates_removed: int = 0
+
+    @property
+    def saved_chars(self) -> int:
+        return self.chars_before - self.chars_after
+
+
+def normalize(line: str) -> str:
+    """Comparison key of a line: no list marker, label, markdown or punctuation, lowercased."""
+    return NON_WORD.sub(" ", LINE_PREFIX.sub("", line, count=1)).strip().lower()
+
+
+def compact(content: str, min_line_chars: int = COMPACT_MIN_LINE_CHARS):
+    """
+    Shrinks a video analysis before conversion and returns (text, CompactionStats).
+
+    Drops the analysis prompt's own scaffolding headings and echoed template
+    lines, and every passage (line) that repeats an earlier one; the analysis
+    lists the same slide text under slides, explanations, the inventory and the
+    timeline. Headings, code blocks, tables and short lines are always kept.
+    """
+    stats = CompactionStats(chars_before=len(content))
+    seen = set()
+    kept = []
+    in_code = False
+    for line in content.splitlines():
+        stripped = line.strip()
+        if stripped.startswith("```"):
+            in_code = not in_code
+        elif not in_code:
+            if SCAFFOLDING_HEADING.match(stripped) or PLACEHOLDER_LINE.match(stripped):
+                stats.headings_removed += 1
+                continue
+            if not stripped.startswith(("#", "|")):
+                key = normalize(stripped)
+                if len(key) >= min_line_chars:
+                    if key in seen:
+                        stats.duplicates_removed += 1
+                        continue
+                    seen.add(key)
+        # Runs of blank lines left behind by removed lines collapse into one.
+        if not in_code and not stripped and kept and not kept[-1].strip():
+            continue
+        kept.append(line.rstrip())
+
+    text = "\n".join(kept).strip() + "\n"
+    stats.chars_after = len(text)
+    return text, stats
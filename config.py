@@ -1,18 +1,41 @@
-# This variable will hold the API key during a user's session.
-# It acts as a shared state that other modules can access.
-_API_KEY = None
+import contextvars
+from contextlib import contextmanager
+
+# The Gemini API key of the request being handled. A context variable rather than a
+# module global, so concurrent sessions, tasks and threads each see their own key:
+# asyncio tasks inherit it from whoever created them, new threads start without one.
+_api_key = contextvars.ContextVar("ytpdf_api_key", default=None)
 
 def set_api_key(key: str):
     """
-    Sets the Gemini API key for the current session.
-    Your Streamlit app will call this function.
+    Sets the Gemini API key for the current context (e.g. one Streamlit script run).
+    Tasks started afterwards from this context inherit it.
     """
-    global _API_KEY
-    _API_KEY = key
+    return _api_key.set(key)
 
 def get_api_key() -> str:
     """
-    Retrieves the currently set Gemini API key.
+    Retrieves the Gemini API key of the current context, or None if none was set.
     Any other module (like younote.py) will call this.
     """
-    return _API_KEY
\ No newline at end of file
+    return _api_key.get()
+
+def require_api_key() -> str:
+    key = _api_key.get()
+    if not key:
+        raise ValueError("A Gemini API key is required.")
+    return key
+
+@contextmanager
+def api_key_context(key: str):
+    """Uses `key` for everything run inside the block, restoring the previous key afterwards."""
+    token = _api_key.set(key)
+    try:
+        yield key
+    finally:
+        try:
+            _api_key.reset(token)
+        except ValueError:
+            # An async generator left unfinished is closed later from another context,
+            # where there is nothing to restore.
+            pass
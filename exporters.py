@@ -0,0 +1,297 @@
+"""
+Notes export formats rendered from one parsed document.
+
+The markdown is parsed once into a Document (markdown_ast blocks plus title
+and source); every format renders from those blocks. HTML and plain text are
+cheap string building, so they can be shown before the PDF is done.
+"""
+import hashlib
+import io
+import os
+import uuid
+import zipfile
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from html import escape
+from typing import Callable, Dict, Iterable, Tuple
+
+import markdown_ast
+
+# Bump whenever the rendered output changes (PDF layout, fonts, markdown parsing), so
+# PDFs cached by an older renderer are not served; see result_cache.make_key.
+RENDERER_VERSION = "1"
+
+# Formats produced when a request doesn't choose (comma-separated).
+EXPORT_FORMATS = tuple(f.strip() for f in os.getenv("EXPORT_FORMATS", "pdf,html").split(",") if f.strip())
+
+STYLESHEET = """
+body { font-family: "DejaVu Sans", "Noto Sans", Helvetica, Arial, sans-serif; line-height: 1.5;
+       max-width: 48em; margin: 1.5em auto; padding: 0 1em; color: #111; }
+.meta { color: #666; font-size: 0.9em; }
+code, pre { font-family: "DejaVu Sans Mono", Menlo, Consolas, monospace; }
+code { color: #555; }
+pre { background: #f8f8f8; border: 1px solid #ccc; padding: 0.5em; overflow-x: auto; }
+blockquote { color: #555; font-style: italic; margin-left: 1.5em; }
+table { border-collapse: collapse; margin: 0.5em 0; }
+th, td { border: 1px solid #999; padding: 0.25em 0.5em; vertical-align: top; }
+th { background: #eee; }
+.diagram { color: #c00; margin: 0.5em 0 0.5em 1.5em; }
+"""
+
+
+@dataclass(frozen=True)
+class Document:
+    """Parsed notes, shared by every export format."""
+
+    title: str
+    source_url: str
+    blocks: Tuple[markdown_ast.Block, ...]
+    generated_at: str
+
+
+def parse(markdown: str, title: str = "Educational Notes", source_url: str = "") -> Document:
+    return Document(
+        title=title,
+        source_url=source_url,
+        blocks=tuple(markdown_ast.parse(markdown)),
+        generated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+    )
+
+
+# --- HTML (also the EPUB content document, so the markup is kept XHTML-valid) ---
+
+def inline_html(children) -> str:
+    parts = []
+    for child in children:
+        if isinstance(child, markdown_ast.Text):
+            parts.append(escape(child.text, quote=False))
+        elif isinstance(child, markdown_ast.Code):
+            parts.append(f"<code>{escape(child.text, quote=False)}</code>")
+        elif isinstance(child, markdown_ast.Strong):
+            parts.append(f"<strong>{inline_html(child.children)}</strong>")
+        else:
+            parts.append(f"<em>{inline_html(child.children)}</em>")
+    return "".join(parts)
+
+
+def _table_html(block) -> str:
+    rows = []
+    if block.header:
+        rows.append("<tr>" + "".join(f"<th>{inline_html(cell)}</th>" for cell in block.header) + "</tr>")
+    for row in block.rows:
+        rows.append("<tr>" + "".join(f"<td>{inline_html(cell)}</td>" for cell in row) + "</tr>")
+    return "<table>" + "".join(rows) + "</table>"
+
+
+def html_body(document: Document):
+    """Returns the document's body markup and its outline as [(level, anchor, text)]."""
+    parts = [
+        f'<h1 class="title">{escape(document.title, quote=False)}</h1>',
+        f'<p class="meta">Generated: {document.generated_at}</p>',
+    ]
+    if document.source_url:
+        url = escape(document.source_url)
+        parts.append(f'<p class="meta">Source: <a href="{url}">{url}</a></p>')
+    outline = []
+    # One entry per open list level, each with an open <li>.
+    open_lists = []
+
+    def close_lists(depth=0):
+        while len(open_lists) > depth:
+            parts.append(f"</li></{open_lists.pop()}>")
+
+    for block in document.blocks:
+        if isinstance(block, markdown_ast.ListItem):
+            tag = "ol" if block.ordered else "ul"
+            close_lists(block.depth + 1)
+            if len(open_lists) == block.depth + 1 and open_lists[-1] == tag:
+                parts.append("</li><li>")
+            else:
+                close_lists(block.depth)
+                while len(open_lists) <= block.depth:
+                    start = f' start="{block.number}"' if block.ordered and block.number != "1" else ""
+                    parts.append(f"<{tag}{start}><li>")
+                    open_lists.append(tag)
+            parts.append(inline_html(block.children))
+            continue
+        if not isinstance(block, markdown_ast.BlankLine):
+            close_lists()
+
+        if isinstance(block, markdown_ast.Heading):
+            anchor = f"s{len(outline) + 1}"
+            outline.append((block.level, anchor, markdown_ast.inline_text(block.children)))
+            parts.append(f'<h{block.level} id="{anchor}">{inline_html(block.children)}</h{block.level}>')
+        elif isinstance(block, markdown_ast.Paragraph):
+            parts.append(f"<p>{inline_html(block.children)}</p>")
+        elif isinstance(block, markdown_ast.CodeBlock):
+            parts.append(f"<pre><code>{escape(block.text, quote=False)}</code></pre>")
+        elif isinstance(block, markdown_ast.Table):
+            parts.append(_table_html(block))
+        elif isinstance(block, markdown_ast.BlockQuote):
+            parts.append(f"<blockquote><p>{inline_html(block.children)}</p></blockquote>")
+        elif isinstance(block, markdown_ast.DiagramAlert):
+            parts.append(f'<p class="diagram">📊 <strong>DIAGRAM:</strong> {inline_html(block.children)}</p>')
+        elif isinstance(block, markdown_ast.Rule):
+            parts.append("<hr/>")
+    close_lists()
+    return "\n".join(parts), outline
+
+
+def to_html(document: Document) -> bytes:
+    """Standalone HTML page with inline styles; no network access needed to view it."""
+    body, _ = html_body(document)
+    return (
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"/>"
+        f"<title>{escape(document.title, quote=False)}</title><style>{STYLESHEET}</style></head>\n"
+        f"<body>\n{body}\n</body></html>\n"
+    ).encode("utf-8")
+
+
+# --- EPUB 3 ---
+
+CONTAINER_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles><rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/></rootfiles>
+</container>
+"""
+
+XHTML_PAGE = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE html>
+<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops">
+<head><title>{title}</title><link rel="stylesheet" type="text/css" href="style.css"/></head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+
+def _epub_nav(document, outline) -> str:
+    items = "".join(
+        f'<li><a href="notes.xhtml#{anchor}">{escape(text, quote=False)}</a></li>'
+        for level, anchor, text in outline
+        if level <= 2
+    ) or '<li><a href="notes.xhtml">Notes</a></li>'
+    body = f'<nav epub:type="toc" id="toc"><h1>Contents</h1><ol>{items}</ol></nav>'
+    return XHTML_PAGE.format(title=escape(document.title, quote=False), body=body)
+
+
+def _epub_package(document, identifier) -> str:
+    modified = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="uid">
+  <metadata xmlns:dc="http://purl.org/dc/elements/1.1/">
+    <dc:identifier id="uid">{identifier}</dc:identifier>
+    <dc:title>{escape(document.title, quote=False)}</dc:title>
+    <dc:language>en</dc:language>
+    <dc:source>{escape(document.source_url, quote=False)}</dc:source>
+    <meta property="dcterms:modified">{modified}</meta>
+  </metadata>
+  <manifest>
+    <item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>
+    <item id="notes" href="notes.xhtml" media-type="application/xhtml+xml"/>
+    <item id="style" href="style.css" media-type="text/css"/>
+  </manifest>
+  <spine><itemref idref="notes"/></spine>
+</package>
+"""
+
+
+def to_epub(document: Document) -> bytes:
+    """EPUB 3 with one content document and a table of contents from the headings."""
+    body, outline = html_body(document)
+    digest = hashlib.sha256(body.encode("utf-8")).hexdigest()
+    identifier = f"urn:uuid:{uuid.uuid5(uuid.NAMESPACE_URL, f'{document.source_url}#{digest}')}"
+
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as epub:
+        # The mimetype entry must come first and be stored uncompressed.
+        epub.writestr(zipfile.ZipInfo("mimetype"), "application/epub+zip", compress_type=zipfile.ZIP_STORED)
+        epub.writestr("META-INF/container.xml", CONTAINER_XML)
+        epub.writestr("OEBPS/content.opf", _epub_package(document, identifier))
+        epub.writestr("OEBPS/nav.xhtml", _epub_nav(document, outline))
+        epub.writestr("OEBPS/style.css", STYLESHEET)
+        epub.writestr("OEBPS/notes.xhtml", XHTML_PAGE.format(title=escape(document.title, quote=False), body=body))
+    return buffer.getvalue()
+
+
+# --- Plain text ---
+
+def to_text(document: Document) -> bytes:
+    lines = [document.title, "=" * len(document.title), f"Generated: {document.generated_at}"]
+    if document.source_url:
+        lines.append(f"Source: {document.source_url}")
+    lines.append("")
+    for block in document.blocks:
+        if isinstance(block, markdown_ast.BlankLine):
+            if lines and lines[-1]:
+                lines.append("")
+        elif isinstance(block, markdown_ast.Heading):
+            text = markdown_ast.inline_text(block.children)
+            if lines and lines[-1]:
+                lines.append("")
+            lines.append(text)
+            if block.level <= 2:
+                lines.append(("=" if block.level == 1 else "-") * len(text))
+        elif isinstance(block, markdown_ast.ListItem):
+            marker = f"{block.number}." if block.ordered else "•"
+            lines.append(f"{'  ' * block.depth}{marker} {markdown_ast.inline_text(block.children)}")
+        elif isinstance(block, markdown_ast.CodeBlock):
+            lines.extend(f"    {line}" for line in block.text.split("\n"))
+        elif isinstance(block, markdown_ast.Table):
+            for row in ((block.header,) if block.header else ()) + block.rows:
+                lines.append(" | ".join(markdown_ast.inline_text(cell) for cell in row))
+        elif isinstance(block, markdown_ast.BlockQuote):
+            lines.append(f"> {markdown_ast.inline_text(block.children)}")
+        elif isinstance(block, markdown_ast.DiagramAlert):
+            lines.append(f"[DIAGRAM] {markdown_ast.inline_text(block.children)}")
+        elif isinstance(block, markdown_ast.Rule):
+            lines.append("-" * 40)
+        else:
+            lines.append(markdown_ast.inline_text(block.children))
+    return ("\n".join(lines).strip() + "\n").encode("utf-8")
+
+
+# --- PDF ---
+
+def to_pdf(document: Document) -> bytes:
+    """Renders the PDF in this process (pdf_workers.render_pdf takes the blocks to render in the pool)."""
+    import pdf_converter
+
+    buffer = io.BytesIO()
+    pdf_converter.get_renderer().render_blocks(document.blocks, buffer, document.title, document.source_url)
+    return buffer.getvalue()
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    render: Callable[[Document], bytes]
+    suffix: str
+    label: str
+
+
+FORMATS: Dict[str, ExportFormat] = {
+    "pdf": ExportFormat(to_pdf, ".pdf", "PDF"),
+    "html": ExportFormat(to_html, ".html", "HTML"),
+    "epub": ExportFormat(to_epub, ".epub", "EPUB"),
+    "txt": ExportFormat(to_text, ".txt", "Plain text"),
+}
+
+
+def validate_formats(formats: Iterable[str] = None) -> Tuple[str, ...]:
+    """Returns the requested formats in a canonical order (default: EXPORT_FORMATS)."""
+    requested = set(formats if formats is not None else EXPORT_FORMATS)
+    unknown = requested - set(FORMATS)
+    if unknown:
+        raise ValueError(f"Unknown export format(s): {', '.join(sorted(unknown))}")
+    if not requested:
+        raise ValueError("At least one export format is required")
+    return tuple(name for name in FORMATS if name in requested)
+
+
+def export(document: Document, formats: Iterable[str]) -> Dict[str, bytes]:
+    """Renders `document` in each of `formats` (which may be empty), returning {format: bytes}."""
+    formats = list(formats)
+    if not formats:
+        return {}
+    return {name: FORMATS[name].render(document) for name in validate_formats(formats)}
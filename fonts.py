@@ -0,0 +1,249 @@
+import functools
+import os
+import threading
+from collections import namedtuple
+from xml.sax.saxutils import escape
+
+import reportlab
+from reportlab.lib.fonts import addMapping
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFError, TTFont
+
+# Extra directories searched for TTF files (os.pathsep-separated), before the system ones.
+PDF_FONT_DIRS = [d for d in os.getenv("PDF_FONT_DIRS", "").split(os.pathsep) if d]
+FONT_SEARCH_PATH = PDF_FONT_DIRS + [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "fonts"),
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    os.path.expanduser("~/.fonts"),
+    os.path.expanduser("~/.local/share/fonts"),
+    "/Library/Fonts",
+    "/System/Library/Fonts",
+    "C:\\Windows\\Fonts",
+    # ReportLab ships Vera, so there is always a TrueType family to fall back on.
+    os.path.join(os.path.dirname(reportlab.__file__), "fonts"),
+]
+
+# Regular, bold, italic and bold italic files per family, in order of preference.
+TEXT_FAMILIES = [
+    ("DejaVuSans", ("DejaVuSans.ttf", "DejaVuSans-Bold.ttf", "DejaVuSans-Oblique.ttf", "DejaVuSans-BoldOblique.ttf")),
+    ("NotoSans", ("NotoSans-Regular.ttf", "NotoSans-Bold.ttf", "NotoSans-Italic.ttf", "NotoSans-BoldItalic.ttf")),
+    ("LiberationSans", ("LiberationSans-Regular.ttf", "LiberationSans-Bold.ttf", "LiberationSans-Italic.ttf", "LiberationSans-BoldItalic.ttf")),
+    ("Vera", ("Vera.ttf", "VeraBd.ttf", "VeraIt.ttf", "VeraBI.ttf")),
+]
+MONO_FAMILIES = [
+    ("DejaVuSansMono", ("DejaVuSansMono.ttf", "DejaVuSansMono-Bold.ttf", "DejaVuSansMono-Oblique.ttf", "DejaVuSansMono-BoldOblique.ttf")),
+    ("NotoSansMono", ("NotoSansMono-Regular.ttf", "NotoSansMono-Bold.ttf", None, None)),
+    ("LiberationMono", ("LiberationMono-Regular.ttf", "LiberationMono-Bold.ttf", "LiberationMono-Italic.ttf", "LiberationMono-BoldItalic.ttf")),
+    ("VeraMono", ("VeraMono.ttf", "VeraMoBd.ttf", "VeraMoIt.ttf", "VeraMoBI.ttf")),
+]
+# Fonts for characters the text or code font lacks. ReportLab only embeds TrueType
+# outlines, so colour-bitmap emoji fonts (Noto Color Emoji) can't be used here.
+FALLBACK_FONTS = {
+    "emoji": ("NotoEmoji-Regular.ttf", "Symbola.ttf", "Symbola_hint.ttf"),
+    "symbols": ("NotoSansSymbols2-Regular.ttf", "NotoSansSymbols-Regular.ttf", "DejaVuSans.ttf"),
+    "cjk": ("DroidSansFallbackFull.ttf", "DroidSansFallback.ttf", "wqy-microhei.ttc", "wqy-zenhei.ttc"),
+}
+# Which fallback groups to try first for a glyph range; all other groups are tried after.
+RANGE_FALLBACKS = [
+    (0x1F000, 0x1FAFF, ("emoji", "symbols")),
+    (0x2190, 0x2BFF, ("symbols", "emoji")),
+    (0x2E80, 0x9FFF, ("cjk",)),
+    (0xAC00, 0xD7AF, ("cjk",)),
+    (0xF900, 0xFAFF, ("cjk",)),
+    (0xFF00, 0xFFEF, ("cjk",)),
+]
+# Font subsets kept per face. The first subset of each font holds printable ASCII at
+# fixed codes plus the first non-ASCII glyphs used, so similar documents share it.
+FONT_SUBSET_CACHE_SIZE = int(os.getenv("FONT_SUBSET_CACHE_SIZE", "32"))
+# Emoji presentation selectors and joiners; dropped when no font has them.
+INVISIBLE = {"\u200d", "\ufe0e", "\ufe0f"}
+
+# Base-14 families, used for a face when no TrueType file was found.
+BASE14_TEXT = ("Helvetica", "Helvetica-Bold", "Helvetica-Oblique", "Helvetica-BoldOblique")
+BASE14_MONO = ("Courier", "Courier-Bold", "Courier-Oblique", "Courier-BoldOblique")
+
+Family = namedtuple("Family", "regular bold italic bold_italic")
+
+
+def index_font_files(directories):
+    """Maps lowercased font file names to paths, first directory wins."""
+    found = {}
+    for directory in directories:
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.lower().endswith((".ttf", ".ttc")):
+                    found.setdefault(name.lower(), os.path.join(root, name))
+    return found
+
+
+def register_family(family, regular, bold, italic, bold_italic):
+    """Registers a family for <b>/<i>, even when some faces are the regular one reused."""
+    pdfmetrics.registerFontFamily(family, regular, bold, italic, bold_italic)
+    # The last face registered under a name wins the reverse lookup, so a reused
+    # regular face would otherwise be treated as bold italic inside <font> tags.
+    addMapping(family, 0, 0, regular)
+
+
+def memoize_subsets(face, size=FONT_SUBSET_CACHE_SIZE):
+    """Caches a TTF face's subset builder, which ReportLab otherwise reruns for every document."""
+    make_subset = face.makeSubset
+    cached = functools.lru_cache(maxsize=size)(lambda glyphs: make_subset(list(glyphs)))
+    face.makeSubset = lambda subset: cached(tuple(subset))
+
+
+class FontRegistry:
+    """
+    Process-wide set of registered TrueType fonts with per-glyph fallback.
+
+    Font files are parsed once, when the registry is built; ReportLab then embeds
+    only the glyphs each document uses, from subsets cached across documents.
+    Glyph-to-font lookups are memoized, so rendering a document costs a dict
+    lookup per non-ASCII character.
+    """
+
+    def __init__(self, search_path=FONT_SEARCH_PATH):
+        self._files = index_font_files(search_path)
+        self._coverage = {}
+        self._chosen = {}
+        self._missing = set()
+        self.text = self._register_family(TEXT_FAMILIES) or Family(*BASE14_TEXT)
+        self.mono = self._register_family(MONO_FAMILIES) or Family(*BASE14_MONO)
+        self.fallbacks = {
+            group: [name for name in map(self._register_single, files) if name]
+            for group, files in FALLBACK_FONTS.items()
+        }
+        # Maps the base-14 names used by stylesheets onto the registered faces.
+        self.substitutes = dict(zip(BASE14_TEXT, self.text))
+        self.substitutes.update(zip(BASE14_MONO, self.mono))
+
+    def _load(self, name, filename):
+        """Registers one TTF under `name`, returning False if it's missing or unusable."""
+        if name in self._coverage:
+            return True
+        path = self._files.get(filename.lower())
+        if path is None:
+            return False
+        try:
+            font = TTFont(name, path)
+        except TTFError as e:
+            # e.g. CFF-flavoured OpenType, which ReportLab can't embed.
+            print(f"⚠️ Skipping font {path}: {e}")
+            return False
+        if FONT_SUBSET_CACHE_SIZE > 0:
+            memoize_subsets(font.face)
+        pdfmetrics.registerFont(font)
+        self._coverage[name] = font.face.charToGlyph
+        return True
+
+    def _register_family(self, families):
+        # Prefer a family with all four faces (italics matter in notes); a partial one
+        # (e.g. fonts-dejavu-core has no obliques) only if nothing complete is installed.
+        available = [
+            (family, files) for family, files in families
+            if files[0] and files[0].lower() in self._files
+        ]
+        available.sort(key=lambda item: not all(f and f.lower() in self._files for f in item[1]))
+        for family, files in available:
+            if not self._load(family, files[0]):
+                continue
+            faces = [family]
+            for suffix, filename in zip(("-Bold", "-Italic", "-BoldItalic"), files[1:]):
+                name = family + suffix
+                faces.append(name if filename and self._load(name, filename) else family)
+            register_family(family, *faces)
+            return Family(*faces)
+        return None
+
+    def _register_single(self, filename):
+        name = os.path.splitext(filename)[0]
+        if name in self._coverage:
+            # Already registered, e.g. as the text family, whose <b>/<i> mapping must stay.
+            return name
+        families = dict(TEXT_FAMILIES + MONO_FAMILIES)
+        if name in families:
+            # A text family used as fallback still gets its bold/italic faces.
+            return name if self._register_family([(name, families[name])]) else None
+        if not self._load(name, filename):
+            return None
+        # <b>/<i> inside a fallback run keep using the same face.
+        register_family(name, name, name, name, name)
+        return name
+
+    def covers(self, font_name, char):
+        coverage = self._coverage.get(font_name)
+        if coverage is None:
+            # Base-14 fonts only encode (roughly) Latin-1.
+            return ord(char) < 256
+        return ord(char) in coverage
+
+    def _chain(self, char):
+        code = ord(char)
+        groups = next((groups for low, high, groups in RANGE_FALLBACKS if low <= code <= high), ())
+        for group in list(groups) + [g for g in FALLBACK_FONTS if g not in groups]:
+            yield from self.fallbacks[group]
+
+    def font_for(self, char, primary):
+        """Returns the font to draw `char` with: `primary` if it has the glyph, else a fallback."""
+        key = (primary, char)
+        font = self._chosen.get(key)
+        if font is None:
+            font = primary
+            if not self.covers(primary, char):
+                font = next((name for name in self._chain(char) if self.covers(name, char)), "")
+                if not font and char not in INVISIBLE and char not in self._missing:
+                    self._missing.add(char)
+                    print(f"⚠️ No PDF font has a glyph for U+{ord(char):04X}; add a TTF to PDF_FONT_DIRS")
+            self._chosen[key] = font
+        return font
+
+    def markup(self, text: str, family: Family = None, bold: bool = False, italic: bool = False) -> str:
+        """
+        Escapes `text` for a ReportLab paragraph, wrapping runs the family's font
+        can't draw in <font> tags for the first fallback font that can.
+
+        A <font> tag resets bold/italic, so pass the surrounding ones to keep them.
+        """
+        primary = (family or self.text).regular
+        if text.isascii():
+            return escape(text)
+        parts = []
+        run, run_font = [], primary
+        for char in text:
+            font = self.font_for(char, primary)
+            if not font:
+                if char in INVISIBLE:
+                    continue
+                font = primary
+            if font != run_font and run:
+                parts.append(self._wrap(escape("".join(run)), run_font, primary, bold, italic))
+                run = []
+            run_font = font
+            run.append(char)
+        if run:
+            parts.append(self._wrap(escape("".join(run)), run_font, primary, bold, italic))
+        return "".join(parts)
+
+    @staticmethod
+    def _wrap(text, font, primary, bold, italic):
+        if font == primary:
+            return text
+        if italic:
+            text = f"<i>{text}</i>"
+        if bold:
+            text = f"<b>{text}</b>"
+        return f'<font name="{font}">{text}</font>'
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> FontRegistry:
+    """Returns the process-wide font registry, loading the fonts on first use."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = FontRegistry()
+    return _registry
@@ -0,0 +1,624 @@
+import argparse
+import asyncio
+import functools
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import artifacts
+import exporters
+import pdf_workers
+import younote
+from video_url import parse_video_url
+
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", os.path.join(".cache", "jobs.sqlite3"))
+# Worker processes started by the web app; 0 only enqueues (run `python jobs.py` elsewhere).
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Seconds between queue polls when idle, and between progress writes while a job streams.
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "1.0"))
+JOB_PROGRESS_INTERVAL = float(os.getenv("JOB_PROGRESS_INTERVAL", "0.5"))
+# A running job whose worker hasn't checked in for this long is assumed orphaned by a dead worker.
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "900"))
+# Seconds between a worker's heartbeats for its running job; keep well below JOB_STALE_SECONDS.
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", "30"))
+# Running jobs are cancelled after this many seconds.
+JOB_TIMEOUT = float(os.getenv("JOB_TIMEOUT", "1800"))
+# A watched job is cancelled when nobody has polled its status for this long (user left).
+JOB_ABANDON_SECONDS = float(os.getenv("JOB_ABANDON_SECONDS", "120"))
+# Finished jobs (and their results) are deleted after this many seconds.
+JOB_RETENTION = int(os.getenv("JOB_RETENTION", str(24 * 3600)))
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    dedup_key TEXT NOT NULL,
+    youtube_url TEXT NOT NULL,
+    decision INTEGER NOT NULL,
+    -- Comma-separated export formats (exporters.FORMATS names).
+    formats TEXT NOT NULL DEFAULT 'pdf',
+    status TEXT NOT NULL,
+    progress TEXT NOT NULL DEFAULT '{}',
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    started_at REAL,
+    -- Last status poll; a job nobody watches anymore is cancelled.
+    seen_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, created_at);
+-- At most one queued/running job per video, decision and formats; identical submissions join it.
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_active ON jobs (dedup_key)
+    WHERE status IN ('queued', 'running');
+-- Outputs live in the artifact store; only their handles are kept here.
+CREATE TABLE IF NOT EXISTS job_artifacts (
+    job_id TEXT NOT NULL,
+    note_type TEXT NOT NULL,
+    markdown_handle TEXT,
+    pdf_handle TEXT,
+    -- JSON {format: handle} of every export, the PDF included.
+    exports TEXT,
+    PRIMARY KEY (job_id, note_type)
+);
+-- Sessions waiting for a job; deduplicated submissions share the job, so one of them
+-- cancelling only detaches it while others are still polling.
+CREATE TABLE IF NOT EXISTS job_watchers (
+    job_id TEXT NOT NULL,
+    watcher TEXT NOT NULL,
+    seen_at REAL NOT NULL,
+    PRIMARY KEY (job_id, watcher)
+);
+"""
+
+# Columns added after the first release of the schema, for queues created before them.
+_ADDED_COLUMNS = {
+    "jobs": {
+        "cancel_requested": "INTEGER NOT NULL DEFAULT 0",
+        "started_at": "REAL",
+        "seen_at": "REAL",
+        "formats": "TEXT NOT NULL DEFAULT 'pdf'",
+    },
+    "job_artifacts": {
+        "exports": "TEXT",
+    },
+}
+
+
+class JobStopped(Exception):
+    """Raised in a worker when a job is cancelled, abandoned or over its deadline."""
+
+    def __init__(self, status, reason):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+
+
+def dedup_key(youtube_url: str, decision: int, formats=("pdf",)) -> str:
+    return f"{parse_video_url(youtube_url).video_id}:{decision}:{','.join(formats)}"
+
+
+class JobStore:
+    """
+    Persistent job queue in SQLite, shared by the web app and the worker processes.
+
+    Every process opens its own connection; WAL mode lets the UI poll while
+    workers write progress.
+    """
+
+    def __init__(self, path: str = JOBS_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        for table, added in _ADDED_COLUMNS.items():
+            columns = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            for column, definition in added.items():
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+        self._conn.commit()
+
+    def submit(self, youtube_url: str, decision: int, formats=None, watcher: str = None) -> str:
+        """
+        Queues a job and returns its ID, or the ID of an identical job already queued or running.
+
+        formats are exporters.FORMATS names (default exporters.EXPORT_FORMATS).
+        watcher identifies the submitting session, which is registered as
+        waiting for the job (see cancel). An invalid URL
+        (video_url.InvalidVideoURL) or unknown decision or format raises
+        ValueError before anything is queued.
+        """
+        if decision not in younote.NOTE_TYPES:
+            raise ValueError(f"Unknown decision {decision!r}")
+        formats = exporters.validate_formats(formats)
+        youtube_url = parse_video_url(youtube_url).url
+        key = dedup_key(youtube_url, decision, formats)
+        now = time.time()
+        with self._lock, self._conn:
+            try:
+                job_id = uuid.uuid4().hex
+                self._conn.execute(
+                    "INSERT INTO jobs (id, dedup_key, youtube_url, decision, formats, status, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (job_id, key, youtube_url, decision, ",".join(formats), QUEUED, now, now),
+                )
+            except sqlite3.IntegrityError:
+                job_id = self._conn.execute(
+                    "SELECT id FROM jobs WHERE dedup_key = ? AND status IN (?, ?)",
+                    (key, QUEUED, RUNNING),
+                ).fetchone()[0]
+                print(f"Joining job {job_id} already in progress for {key}")
+            if watcher:
+                self._watch(job_id, watcher, now)
+            return job_id
+
+    def _watch(self, job_id, watcher, now):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO job_watchers (job_id, watcher, seen_at) VALUES (?, ?, ?)",
+            (job_id, watcher, now),
+        )
+
+    def claim_next(self):
+        """Marks the oldest queued job as running and returns it, or None when the queue is empty."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT id, youtube_url, decision, formats FROM jobs WHERE status = ? "
+                "ORDER BY created_at LIMIT 1",
+                (QUEUED,),
+            ).fetchone()
+            if row is None:
+                return None
+            now = time.time()
+            claimed = self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ?, started_at = ? WHERE id = ? AND status = ?",
+                (RUNNING, now, now, row[0], QUEUED),
+            ).rowcount
+        if not claimed:
+            # Another dispatcher took it first.
+            return None
+        return {"id": row[0], "youtube_url": row[1], "decision": row[2], "formats": row[3].split(",")}
+
+    def heartbeat(self, job_id: str):
+        """Tells requeue_stale the job's worker is alive, even while the job streams nothing."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET updated_at = ? WHERE id = ? AND status = ?",
+                (time.time(), job_id, RUNNING),
+            )
+
+    def update_progress(self, job_id: str, progress: dict):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET progress = ?, updated_at = ? WHERE id = ?",
+                (json.dumps(progress), time.time(), job_id),
+            )
+
+    def finish(self, job_id: str, final_state):
+        """Moves the workflow's notes and exports to the artifact store and marks the job done (or failed on a workflow error)."""
+        if final_state.get("error"):
+            self.fail(job_id, final_state["error"])
+            return
+        handles = []
+        for note_type in younote.NOTE_TYPES[final_state["decision"]]:
+            markdown_content = final_state.get(f"{note_type}_markdown_content")
+            exports = {
+                name: artifacts.put(data, exporters.FORMATS[name].suffix)
+                for name, data in (final_state.get("exports") or {}).get(note_type, {}).items()
+                if data
+            }
+            handles.append((
+                job_id,
+                note_type,
+                artifacts.put(markdown_content, ".md") if markdown_content else None,
+                exports.get("pdf"),
+                json.dumps(exports),
+            ))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO job_artifacts (job_id, note_type, markdown_handle, pdf_handle, exports) "
+                "VALUES (?, ?, ?, ?, ?)",
+                handles,
+            )
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ?",
+                (DONE, time.time(), job_id),
+            )
+
+    def fail(self, job_id: str, error: str, status: str = FAILED):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+                (status, error, time.time(), job_id),
+            )
+
+    def cancel(self, job_id: str, watcher: str = None, abandon_after: float = JOB_ABANDON_SECONDS) -> bool:
+        """
+        Stops `watcher` waiting for the job, then cancels it if nobody else still is:
+        a queued job at once, a running one by asking its worker to stop.
+
+        Watchers that haven't polled for abandon_after seconds don't count.
+        False if the job keeps running for other watchers or had already finished.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            if watcher:
+                self._conn.execute(
+                    "DELETE FROM job_watchers WHERE job_id = ? AND watcher = ?", (job_id, watcher)
+                )
+            others = self._conn.execute(
+                "SELECT COUNT(*) FROM job_watchers WHERE job_id = ? AND seen_at >= ?",
+                (job_id, now - abandon_after if abandon_after else 0),
+            ).fetchone()[0]
+            if others:
+                print(f"Job {job_id}: {others} other watcher(s) still waiting, not cancelling")
+                return False
+            if self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, "Cancelled", now, job_id, QUEUED),
+            ).rowcount:
+                return True
+            return bool(self._conn.execute(
+                "UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE id = ? AND status = ?",
+                (now, job_id, RUNNING),
+            ).rowcount)
+
+    def stop_reason(self, job_id: str, timeout: float = JOB_TIMEOUT, abandon_after: float = JOB_ABANDON_SECONDS):
+        """Returns (status, reason) when a running job should stop, else None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT cancel_requested, started_at, seen_at FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return CANCELLED, "Job was deleted"
+        cancel_requested, started_at, seen_at = row
+        now = time.time()
+        if cancel_requested:
+            return CANCELLED, "Cancelled"
+        if timeout and started_at and now - started_at > timeout:
+            return FAILED, f"Job exceeded its {timeout:.0f}s deadline"
+        # Only jobs someone has polled can be abandoned; API clients that never poll are left alone.
+        if abandon_after and seen_at and now - seen_at > abandon_after:
+            return CANCELLED, "Abandoned: nobody was waiting for the result"
+        return None
+
+    def get(self, job_id: str, touch: bool = False, watcher: str = None):
+        """
+        Returns the job's status record, or None for an unknown (or purged) job.
+
+        touch marks it as watched, by `watcher` if given (e.g. a page reloaded
+        with the job in its URL starts watching it again).
+        """
+        with self._lock:
+            if touch:
+                now = time.time()
+                with self._conn:
+                    self._conn.execute("UPDATE jobs SET seen_at = ? WHERE id = ?", (now, job_id))
+                    if watcher:
+                        self._watch(job_id, watcher, now)
+            row = self._conn.execute(
+                "SELECT id, youtube_url, decision, status, progress, error, created_at, updated_at "
+                "FROM jobs WHERE id = ?",
+                (job_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row[0],
+            "youtube_url": row[1],
+            "decision": row[2],
+            "status": row[3],
+            "progress": json.loads(row[4]),
+            "error": row[5],
+            "created_at": row[6],
+            "updated_at": row[7],
+        }
+
+    def result(self, job_id: str) -> dict:
+        """
+        Returns {note_type: {"markdown_handle": ..., "pdf_handle": ..., "exports": {format: handle}}}
+        for a finished job.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT note_type, markdown_handle, pdf_handle, exports FROM job_artifacts WHERE job_id = ?",
+                (job_id,),
+            ).fetchall()
+        return {
+            note_type: {
+                "markdown_handle": markdown_handle,
+                "pdf_handle": pdf_handle,
+                "exports": json.loads(exports) if exports else ({"pdf": pdf_handle} if pdf_handle else {}),
+            }
+            for note_type, markdown_handle, pdf_handle, exports in rows
+        }
+
+    def requeue_stale(self, stale_seconds: int = JOB_STALE_SECONDS):
+        """Puts running jobs whose worker stopped sending progress and heartbeats back in the queue."""
+        with self._lock, self._conn:
+            count = self._conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE status = ? AND updated_at < ?",
+                (QUEUED, time.time(), RUNNING, time.time() - stale_seconds),
+            ).rowcount
+        if count:
+            print(f"Requeued {count} orphaned job(s)")
+
+    def purge(self, retention: int = JOB_RETENTION):
+        cutoff = time.time() - retention
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM job_watchers WHERE job_id NOT IN (SELECT id FROM jobs WHERE status IN (?, ?)) "
+                "AND seen_at < ?",
+                (QUEUED, RUNNING, cutoff),
+            )
+            self._conn.execute(
+                "DELETE FROM job_artifacts WHERE job_id IN "
+                "(SELECT id FROM jobs WHERE status IN (?, ?, ?) AND updated_at < ?)",
+                (*FINISHED, cutoff),
+            )
+            self._conn.execute(
+                "DELETE FROM jobs WHERE status IN (?, ?, ?) AND updated_at < ?",
+                (*FINISHED, cutoff),
+            )
+
+
+# --- Worker process side ---
+
+_worker_loop = None
+_worker_stores = {}
+
+
+def _init_worker():
+    global _worker_loop
+    # Jobs already run outside the web process, so PDFs render inline instead of in a nested pool.
+    pdf_workers.PDF_WORKERS = 0
+    # One loop per worker keeps the MCP session pool and Gemini clients warm across jobs.
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+
+
+async def _consume(store, job_id, youtube_url, decision, formats, api_key):
+    progress = {}
+    last_write = 0.0
+    final_state = None
+    # Iterated to the end (not left at "done") so the generator finishes in this task.
+    async for event in younote.stream_youtube_content(
+        youtube_url, decision, request_id=job_id, api_key=api_key, formats=formats
+    ):
+        if event["type"] == "done":
+            final_state = event["state"]
+            continue
+        now = time.monotonic()
+        if event["type"] == "reset":
+            # A streamed call is being retried; its partial text would otherwise show up twice.
+            progress[event["stage"]] = ""
+            last_write = 0.0
+        elif event["type"] == "preview":
+            # The HTML preview arrives whole; it's written at once so the UI can show it while the PDF renders.
+            progress[f"{event['stage']}_preview"] = event["text"]
+            last_write = 0.0
+        else:
+            progress[event["stage"]] = progress.get(event["stage"], "") + event["text"]
+        if now - last_write >= JOB_PROGRESS_INTERVAL:
+            store.update_progress(job_id, progress)
+            last_write = now
+    return final_state
+
+
+async def _execute(store, job_id, youtube_url, decision, formats, api_key):
+    """Runs the workflow, cancelling it as soon as the job is cancelled, abandoned or over its deadline."""
+    task = asyncio.ensure_future(_consume(store, job_id, youtube_url, decision, formats, api_key))
+    last_heartbeat = time.monotonic()
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=JOB_POLL_INTERVAL)
+        if done:
+            return task.result()
+        # Long agent tool calls, rate-limit waits and PDF renders stream nothing; without
+        # a heartbeat another JobService starting up would requeue and run the job twice.
+        if time.monotonic() - last_heartbeat >= JOB_HEARTBEAT_INTERVAL:
+            store.heartbeat(job_id)
+            last_heartbeat = time.monotonic()
+        stop = store.stop_reason(job_id)
+        if stop:
+            print(f"Job {job_id}: stopping ({stop[1]})")
+            task.cancel()
+            # Waiting lets the graph cancel pending LLM calls and kill the MCP server before the next job.
+            await asyncio.gather(task, return_exceptions=True)
+            raise JobStopped(*stop)
+
+
+def _run_job(path, job_id, youtube_url, decision, formats, api_key):
+    """Runs one job in a worker process and records its outcome in the store."""
+    store = _worker_stores.get(path)
+    if store is None:
+        store = _worker_stores[path] = JobStore(path)
+    print(f"Job {job_id}: {youtube_url}")
+    try:
+        final_state = _worker_loop.run_until_complete(
+            _execute(store, job_id, youtube_url, decision, formats, api_key)
+        )
+        store.finish(job_id, final_state)
+    except JobStopped as e:
+        store.fail(job_id, e.reason, e.status)
+    except Exception as e:
+        store.fail(job_id, f"{type(e).__name__}: {e}")
+
+
+# --- Dispatcher ---
+
+class JobService:
+    """
+    Feeds queued jobs to a pool of worker processes.
+
+    Submission only writes to the queue, so it returns immediately and the
+    job survives reruns and page refreshes. API keys given with a submission
+    are kept in memory only and handed to the worker with the job; jobs
+    without one use GEMINI_API_KEY. A key is held only while its job is
+    queued: it is dropped when the job is claimed, cancelled or otherwise
+    leaves the queue.
+    """
+
+    def __init__(self, store: JobStore = None, workers: int = JOB_WORKERS):
+        self.store = store or JobStore()
+        self.workers = workers
+        self._keys = {}
+        self._keys_lock = threading.Lock()
+        self._executor = None
+        self._slots = threading.Semaphore(max(1, workers))
+        self._wake = threading.Event()
+        self._closed = False
+
+        self.store.purge()
+        self.store.requeue_stale()
+        artifacts.prune()
+        if workers > 0:
+            threading.Thread(target=self._dispatch, name="ytpdf-jobs", daemon=True).start()
+
+    def submit(self, youtube_url: str, decision: int, api_key: str = None, formats=None, watcher: str = None) -> str:
+        # The dispatcher claims under the same lock, so it can't take the job before its key is registered.
+        with self._keys_lock:
+            job_id = self.store.submit(youtube_url, decision, formats, watcher)
+            if api_key:
+                # A joined job that already started runs with its own key; don't keep this one.
+                job = self.store.get(job_id)
+                if job is not None and job["status"] == QUEUED:
+                    self._keys.setdefault(job_id, api_key)
+        self._wake.set()
+        return job_id
+
+    def status(self, job_id: str, watcher: str = None):
+        """Returns the job's status record; polling it also tells the worker someone is still waiting."""
+        return self.store.get(job_id, touch=True, watcher=watcher)
+
+    def cancel(self, job_id: str, watcher: str = None) -> bool:
+        """Detaches `watcher` from the job and cancels it unless others are still waiting (see JobStore.cancel)."""
+        cancelled = self.store.cancel(job_id, watcher)
+        if cancelled:
+            self._forget_key(job_id)
+        return cancelled
+
+    def result(self, job_id: str) -> dict:
+        return self.store.result(job_id)
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return self._executor
+
+    def _forget_key(self, job_id):
+        with self._keys_lock:
+            return self._keys.pop(job_id, None)
+
+    def _forget_stale_keys(self):
+        """Drops keys of jobs that left the queue without being claimed here (e.g. cancelled by another process)."""
+        with self._keys_lock:
+            for job_id in list(self._keys):
+                job = self.store.get(job_id)
+                if job is None or job["status"] != QUEUED:
+                    del self._keys[job_id]
+
+    def _claim(self):
+        """Claims the next queued job; returns (job, api_key given with it) or (None, None)."""
+        with self._keys_lock:
+            job = self.store.claim_next()
+            return job, self._keys.pop(job["id"], None) if job is not None else None
+
+    def _dispatch(self):
+        while not self._closed:
+            self._slots.acquire()
+            job, api_key = self._claim()
+            if job is None:
+                self._slots.release()
+                self._forget_stale_keys()
+                self._wake.wait(JOB_POLL_INTERVAL)
+                self._wake.clear()
+                continue
+
+            api_key = api_key or os.getenv("GEMINI_API_KEY")
+            if not api_key:
+                self.store.fail(job["id"], "A Gemini API key is required.")
+                self._slots.release()
+                continue
+
+            try:
+                future = self._get_executor().submit(
+                    _run_job, self.store.path, job["id"], job["youtube_url"], job["decision"],
+                    job["formats"], api_key,
+                )
+            except BrokenProcessPool as e:
+                self._executor = None
+                self.store.fail(job["id"], f"Worker pool failed: {e}")
+                self._slots.release()
+                continue
+            future.add_done_callback(functools.partial(self._finished, job["id"]))
+
+    def _finished(self, job_id, future):
+        self._slots.release()
+        self._forget_key(job_id)
+        try:
+            future.result()
+        except BrokenProcessPool as e:
+            print(f"⚠️ Job worker died, restarting the pool: {e}")
+            self._executor = None
+            self.store.fail(job_id, f"Worker process died: {e}")
+        except Exception as e:
+            self.store.fail(job_id, f"{type(e).__name__}: {e}")
+
+    def close(self):
+        self._closed = True
+        self._wake.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_service() -> JobService:
+    """Returns the process-wide job service, starting its workers on first use."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = JobService()
+        return _service
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run job workers against the shared queue.")
+    parser.add_argument("-w", "--workers", type=int, default=max(1, JOB_WORKERS))
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    service = JobService(workers=args.workers)
+    print(f"Processing jobs from {service.store.path} with {args.workers} worker(s)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
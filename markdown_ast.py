@@ -0,0 +1,304 @@
+"""
+Tokenizer and AST for the markdown subset our Gemini prompts produce.
+
+Blocks: ATX headings (# to ######), paragraphs, bullet items (*, -, +) and
+numbered items (1. / 1)) with nesting by indentation, fenced code blocks,
+pipe tables, blockquotes, horizontal rules and 📊 **[DIAGRAM ALERT]** lines.
+Inline: **strong**, *emphasis* and `code`, parsed in a single linear pass.
+
+parse_blocks() consumes lines lazily and yields one block at a time, so it can
+sit behind a streaming LLM response. Every output format renders from these
+nodes instead of re-parsing the markdown itself.
+"""
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+
+# --- Inline nodes ---
+
+@dataclass(frozen=True)
+class Text:
+    text: str
+
+
+@dataclass(frozen=True)
+class Code:
+    text: str
+
+
+@dataclass(frozen=True)
+class Strong:
+    children: Tuple["Inline", ...]
+
+
+@dataclass(frozen=True)
+class Emphasis:
+    children: Tuple["Inline", ...]
+
+
+Inline = Union[Text, Code, Strong, Emphasis]
+
+
+# --- Block nodes ---
+
+@dataclass(frozen=True)
+class Heading:
+    level: int
+    children: Tuple[Inline, ...]
+
+
+@dataclass(frozen=True)
+class Paragraph:
+    children: Tuple[Inline, ...]
+
+
+@dataclass(frozen=True)
+class ListItem:
+    depth: int
+    ordered: bool
+    # The item's label as written ("1", "2", ...) for numbered items, None for bullets.
+    number: Optional[str]
+    children: Tuple[Inline, ...]
+
+
+@dataclass(frozen=True)
+class CodeBlock:
+    text: str
+    language: str = ""
+
+
+@dataclass(frozen=True)
+class Table:
+    header: Tuple[Tuple[Inline, ...], ...]
+    rows: Tuple[Tuple[Tuple[Inline, ...], ...], ...]
+
+
+@dataclass(frozen=True)
+class BlockQuote:
+    children: Tuple[Inline, ...]
+
+
+@dataclass(frozen=True)
+class DiagramAlert:
+    children: Tuple[Inline, ...]
+
+
+@dataclass(frozen=True)
+class Rule:
+    pass
+
+
+@dataclass(frozen=True)
+class BlankLine:
+    pass
+
+
+Block = Union[Heading, Paragraph, ListItem, CodeBlock, Table, BlockQuote, DiagramAlert, Rule, BlankLine]
+
+
+# --- Inline parsing ---
+
+INLINE_MARKER_PATTERN = re.compile(r"[*`]")
+
+
+def parse_inline(text: str) -> Tuple[Inline, ...]:
+    """
+    Parses **strong**, *emphasis* and `code` spans in one left-to-right pass.
+
+    A closer that doesn't match the innermost opener leaves the unmatched
+    openers above it as literal text, so mis-nested markers degrade to plain
+    text instead of producing broken tags. The pass is linear in the input.
+    """
+    # Nodes are collected in one flat list; each open marker remembers where its
+    # literal placeholder sits. Closing a marker wraps everything after the
+    # placeholder into one node, so every node is moved at most once per level
+    # and unmatched markers simply stay behind as literal text.
+    out = []
+    openers: List[Tuple[str, int]] = []
+    open_counts = {"*": 0, "**": 0}
+    text_start = 0
+    n = len(text)
+
+    def flush(end):
+        if end > text_start:
+            out.append(Text(text[text_start:end]))
+
+    match = INLINE_MARKER_PATTERN.search(text)
+    while match:
+        i = match.start()
+
+        if text[i] == "`":
+            end = text.find("`", i + 1)
+            if end > i + 1:
+                flush(i)
+                out.append(Code(text[i + 1:end]))
+                text_start = end + 1
+                match = INLINE_MARKER_PATTERN.search(text, text_start)
+                continue
+            match = INLINE_MARKER_PATTERN.search(text, i + 1)
+            continue
+
+        before = text[i - 1] if i > 0 else " "
+        if openers and not before.isspace() and text.startswith("***", i):
+            # A closing run of three closes the innermost span first, so "***x***"
+            # and "**bold *it***" nest instead of leaving a stray "*" behind.
+            marker = openers[-1][0]
+        else:
+            marker = "**" if text.startswith("**", i) else "*"
+        after = text[i + len(marker)] if i + len(marker) < n else " "
+
+        if open_counts[marker] and not before.isspace():
+            flush(i)
+            # Inner openers of the other kind are abandoned and stay literal.
+            while openers[-1][0] != marker:
+                open_counts[openers.pop()[0]] -= 1
+            _, start = openers.pop()
+            open_counts[marker] -= 1
+            children = _merge_text(out[start + 1:])
+            del out[start:]
+            out.append(Strong(children) if marker == "**" else Emphasis(children))
+            text_start = i + len(marker)
+        elif not after.isspace():
+            flush(i)
+            openers.append((marker, len(out)))
+            open_counts[marker] += 1
+            out.append(Text(marker))
+            text_start = i + len(marker)
+
+        match = INLINE_MARKER_PATTERN.search(text, i + len(marker))
+
+    flush(n)
+    return _merge_text(out)
+
+
+def _merge_text(children) -> Tuple[Inline, ...]:
+    """Joins adjacent Text nodes, e.g. literal markers left behind by unmatched openers."""
+    merged = []
+    pending = []
+    for child in children:
+        if isinstance(child, Text):
+            if child.text:
+                pending.append(child.text)
+            continue
+        if pending:
+            merged.append(Text("".join(pending)))
+            pending = []
+        merged.append(child)
+    if pending:
+        merged.append(Text("".join(pending)))
+    return tuple(merged)
+
+
+def inline_text(children: Iterable[Inline]) -> str:
+    """Returns the plain text of inline nodes with all formatting dropped."""
+    parts = []
+    for child in children:
+        if isinstance(child, (Text, Code)):
+            parts.append(child.text)
+        else:
+            parts.append(inline_text(child.children))
+    return "".join(parts)
+
+
+# --- Block parsing ---
+
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+LIST_PATTERN = re.compile(r"^([ \t]*)([*+-]|\d{1,9}[.)])\s+(.*)$")
+RULE_PATTERN = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+TABLE_SEPARATOR_PATTERN = re.compile(r"^\|?\s*:?-+:?\s*(\|\s*:?-+:?\s*)*\|?$")
+# The label with its closing "]", "**" and ":" in any order, e.g. "**[DIAGRAM ALERT]**:" or "**DIAGRAM ALERT:**".
+DIAGRAM_PREFIX_PATTERN = re.compile(r"^.*?DIAGRAM ALERT[\]*:]*\s*")
+
+# Columns of indentation per list nesting level.
+LIST_INDENT = 2
+
+
+def _split_row(line: str) -> List[str]:
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|"):
+        line = line[:-1]
+    return [cell.strip() for cell in line.split("|")]
+
+
+def _build_table(lines: List[str]) -> Table:
+    rows = [_split_row(line) for line in lines]
+    if len(lines) >= 2 and TABLE_SEPARATOR_PATTERN.match(lines[1].strip()):
+        header, body = rows[0], rows[2:]
+    else:
+        header, body = [], rows
+    return Table(
+        header=tuple(parse_inline(cell) for cell in header),
+        rows=tuple(tuple(parse_inline(cell) for cell in row) for row in body),
+    )
+
+
+def parse_blocks(lines: Iterable[str]) -> Iterator[Block]:
+    """Tokenizes markdown lines into blocks in a single pass, yielding each as soon as it is complete."""
+    code_lines = None
+    code_language = ""
+    table_lines = []
+
+    for line in lines:
+        stripped = line.strip()
+
+        if code_lines is not None:
+            if stripped.startswith("```"):
+                yield CodeBlock("\n".join(code_lines), code_language)
+                code_lines = None
+            else:
+                code_lines.append(line)
+            continue
+
+        if stripped.startswith("|"):
+            table_lines.append(stripped)
+            continue
+        if table_lines:
+            yield _build_table(table_lines)
+            table_lines = []
+
+        if stripped.startswith("```") and len(stripped) > 6 and stripped.endswith("```"):
+            # One-line fence, e.g. the ```formula``` the long notes prompt asks for.
+            yield CodeBlock(stripped[3:-3].strip())
+        elif stripped.startswith("```"):
+            code_lines = []
+            code_language = stripped[3:].strip()
+        elif not stripped:
+            yield BlankLine()
+        elif "DIAGRAM ALERT" in stripped:
+            yield DiagramAlert(parse_inline(DIAGRAM_PREFIX_PATTERN.sub("", stripped, count=1)))
+        elif stripped.startswith("#"):
+            match = HEADING_PATTERN.match(stripped)
+            if match:
+                yield Heading(len(match.group(1)), parse_inline(match.group(2)))
+            else:
+                yield Paragraph(parse_inline(stripped))
+        elif RULE_PATTERN.match(stripped):
+            yield Rule()
+        elif stripped.startswith(">"):
+            yield BlockQuote(parse_inline(stripped.lstrip(">").strip()))
+        else:
+            match = LIST_PATTERN.match(line)
+            if match:
+                indent = len(match.group(1).expandtabs(4))
+                marker = match.group(2)
+                ordered = marker[0].isdigit()
+                yield ListItem(
+                    depth=indent // LIST_INDENT,
+                    ordered=ordered,
+                    number=marker[:-1] if ordered else None,
+                    children=parse_inline(match.group(3)),
+                )
+            else:
+                yield Paragraph(parse_inline(stripped))
+
+    if table_lines:
+        yield _build_table(table_lines)
+    # An unterminated code fence is dropped, as before.
+
+
+def parse(markdown: str) -> List[Block]:
+    """Parses a whole markdown string into a list of blocks."""
+    return list(parse_blocks(markdown.split("\n")))
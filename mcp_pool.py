@@ -0,0 +1,224 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+import anyio
+from agno.tools.mcp import MultiMCPTools
+from mcp import ClientSession, StdioServerParameters
+from mcp.shared.exceptions import McpError
+
+# Number of warm MCP servers kept alive per process.
+POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "2"))
+# Seconds to wait for a free session before giving up.
+BORROW_TIMEOUT = float(os.getenv("MCP_BORROW_TIMEOUT", "300"))
+# Seconds an idle session gets to answer a ping before it is replaced (0 skips the check).
+HEALTH_CHECK_TIMEOUT = float(os.getenv("MCP_HEALTH_CHECK_TIMEOUT", "5"))
+
+# Failures of the MCP connection itself; after one the session may be mid-message or dead.
+# Anything else a borrower raises (a Gemini 429, a model error) leaves the session usable.
+TRANSPORT_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    McpError,
+    ConnectionError,
+    EOFError,
+)
+
+
+def is_transport_error(error) -> bool:
+    """True if `error`, one of its causes or (for exception groups) sub-errors is an MCP transport failure."""
+    seen = set()
+    pending = [error]
+    while pending:
+        e = pending.pop()
+        if e is None or id(e) in seen:
+            continue
+        seen.add(id(e))
+        if isinstance(e, TRANSPORT_ERRORS):
+            return True
+        pending.extend(getattr(e, "exceptions", ()))
+        pending.extend((e.__cause__, e.__context__))
+    return False
+
+
+def default_server_params():
+    return StdioServerParameters(
+        command="npx",
+        args=["-y", "youtube-video-summarizer-mcp"],
+    )
+
+
+class PooledSession:
+    """
+    One warm MCP server connection.
+
+    The MultiMCPTools context is entered and exited by a dedicated owner task,
+    because anyio cancel scopes must be closed by the task that opened them.
+    Borrowers only use `tools` and never touch the context directly.
+    """
+
+    def __init__(self, server_params, timeout_seconds=120.0):
+        self.server_params = server_params
+        self.timeout_seconds = timeout_seconds
+        self.tools = None
+        self._ready = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._task = None
+        self._error = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+        await self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        return self
+
+    async def _run(self):
+        try:
+            async with MultiMCPTools(
+                server_params_list=[self.server_params],
+                timeout_seconds=self.timeout_seconds,
+            ) as tools:
+                self.tools = tools
+                self._ready.set()
+                await self._stop.wait()
+        except Exception as e:
+            self._error = e
+        finally:
+            self.tools = None
+            self._ready.set()
+
+    def is_healthy(self) -> bool:
+        """A session is healthy while its owner task is still holding the context open."""
+        return (
+            self._task is not None
+            and not self._task.done()
+            and self.tools is not None
+            and self._error is None
+        )
+
+    async def ping(self, timeout=HEALTH_CHECK_TIMEOUT) -> bool:
+        """Round-trips a ping to the server, so a hung or crashed server isn't handed out."""
+        if not self.is_healthy():
+            return False
+        sessions = [
+            context for context in getattr(self.tools, "_active_contexts", ())
+            if isinstance(context, ClientSession)
+        ]
+        if not sessions or timeout <= 0:
+            return True
+        try:
+            await asyncio.wait_for(asyncio.gather(*(session.send_ping() for session in sessions)), timeout)
+        except Exception as e:
+            print(f"⚠️ MCP session failed its health check: {e!r}")
+            return False
+        return True
+
+    async def close(self, timeout=10):
+        """Asks the owner task to exit the context; after `timeout` seconds it is cancelled."""
+        self._stop.set()
+        if self._task is not None and timeout <= 0:
+            # Cancel without waiting: the server shuts down in the background.
+            self._task.cancel()
+        elif self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                self._task.cancel()
+
+
+class MCPSessionPool:
+    """
+    Bounded pool of warm MCP sessions with borrow/return semantics.
+
+    Sessions are started lazily up to `size`. An idle session must answer a
+    ping before it is lent out. A session whose borrower hit an MCP transport
+    error (closed stream, protocol error) or was cancelled is discarded on
+    return, and a fresh one is started on the next borrow; other errors (e.g.
+    a Gemini failure during the agent run) return it to the pool.
+    """
+
+    def __init__(self, server_params=None, size=POOL_SIZE, timeout_seconds=120.0):
+        self.server_params = server_params or default_server_params()
+        self.size = max(1, size)
+        self.timeout_seconds = timeout_seconds
+        self._idle = []
+        self._slots = asyncio.Semaphore(self.size)
+        self._closed = False
+
+    async def _acquire(self):
+        while self._idle:
+            session = self._idle.pop()
+            if await session.ping():
+                return session
+            print("Discarding unhealthy MCP session")
+            await session.close()
+
+        print("Starting new MCP session...")
+        return await PooledSession(self.server_params, self.timeout_seconds).start()
+
+    @asynccontextmanager
+    async def session(self, timeout=BORROW_TIMEOUT):
+        """Borrows a warm MultiMCPTools instance, returning it to the pool afterwards."""
+        if self._closed:
+            raise RuntimeError("MCP session pool is closed")
+
+        await asyncio.wait_for(self._slots.acquire(), timeout=timeout)
+        session = None
+        broken = False
+        cancelled = False
+        try:
+            session = await self._acquire()
+            yield session.tools
+        except asyncio.CancelledError:
+            # The job was cancelled or hit its deadline: kill the server right away
+            # instead of waiting for it to finish the request nobody wants anymore.
+            broken = cancelled = True
+            raise
+        except BaseException as e:
+            # A closed stream or protocol error may leave the session mid-message,
+            # so it is not safe to hand to the next borrower.
+            broken = not isinstance(e, Exception) or is_transport_error(e)
+            raise
+        finally:
+            if session is not None:
+                if broken or self._closed or not session.is_healthy():
+                    await session.close(timeout=0 if cancelled else 10)
+                else:
+                    self._idle.append(session)
+            self._slots.release()
+
+    async def warm_up(self, count=None):
+        """Starts up to `count` sessions ahead of time so the first request skips the cold start."""
+        count = min(count or self.size, self.size)
+        started = []
+        for _ in range(count - len(self._idle)):
+            started.append(await PooledSession(self.server_params, self.timeout_seconds).start())
+        self._idle.extend(started)
+
+    async def close(self):
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for session in idle:
+            await session.close()
+
+
+_pools = {}
+
+
+def get_pool() -> MCPSessionPool:
+    """
+    Returns the process-wide pool for the running event loop.
+
+    Sessions are bound to the loop that started them, so callers that use a new
+    loop per request (asyncio.run) get a fresh pool rather than dead sessions.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _pools.get(loop)
+    if pool is None:
+        for old_loop in [l for l in _pools if l.is_closed()]:
+            del _pools[old_loop]
+        pool = MCPSessionPool()
+        _pools[loop] = pool
+    return pool
@@ -0,0 +1,259 @@
+import contextvars
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# "-" logs JSON lines to stdout, any other value is a file path; unset disables it.
+METRICS_LOG = os.getenv("METRICS_LOG")
+# Port for the Prometheus text endpoint (/metrics); unset disables it.
+METRICS_PORT = os.getenv("METRICS_PORT")
+
+_current_stage = contextvars.ContextVar("ytpdf_current_stage", default=None)
+
+_sinks = []
+_sinks_lock = threading.Lock()
+_configured = False
+
+# Process-wide counters and gauges, keyed by (name, sorted label items).
+_counters = {}
+_gauges = {}
+_registry_lock = threading.Lock()
+
+
+def inc(name, amount=1, **labels):
+    """Increments a counter exposed on the Prometheus endpoint."""
+    key = (name, tuple(sorted(labels.items())))
+    with _registry_lock:
+        _counters[key] = _counters.get(key, 0) + amount
+
+
+def set_gauge(name, value, **labels):
+    """Sets a gauge exposed on the Prometheus endpoint."""
+    key = (name, tuple(sorted(labels.items())))
+    with _registry_lock:
+        _gauges[key] = value
+
+
+def render_prometheus() -> str:
+    """Renders every counter and gauge in the Prometheus text exposition format."""
+    lines = []
+    with _registry_lock:
+        for registry, kind in ((_counters, "counter"), (_gauges, "gauge")):
+            seen = set()
+            for (name, labels), value in sorted(registry.items()):
+                if name not in seen:
+                    lines.append(f"# TYPE {name} {kind}")
+                    seen.add(name)
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class JsonLogSink:
+    """Writes one JSON line per finished stage."""
+
+    def __init__(self, target="-"):
+        self._lock = threading.Lock()
+        self._stream = sys.stdout if target == "-" else open(target, "a", encoding="utf-8")
+
+    def emit(self, record):
+        with self._lock:
+            self._stream.write(json.dumps(record) + "\n")
+            self._stream.flush()
+
+
+class PrometheusSink:
+    """Aggregates stage records into counters and serves them as Prometheus text."""
+
+    def emit(self, record):
+        stage = record["stage"]
+        inc("ytpdf_stage_runs_total", stage=stage)
+        inc("ytpdf_stage_seconds_total", record["seconds"], stage=stage)
+        inc("ytpdf_stage_tokens_total", record["prompt_tokens"], stage=stage, kind="prompt")
+        inc("ytpdf_stage_tokens_total", record["completion_tokens"], stage=stage, kind="completion")
+        inc("ytpdf_stage_tokens_total", record["cached_tokens"], stage=stage, kind="cached")
+        inc("ytpdf_stage_tokens_total", record["saved_tokens"], stage=stage, kind="saved")
+        inc("ytpdf_stage_bytes_total", record["bytes_in"], stage=stage, direction="in")
+        inc("ytpdf_stage_bytes_total", record["bytes_out"], stage=stage, direction="out")
+        inc("ytpdf_cache_lookups_total", record["cache_hits"], stage=stage, result="hit")
+        inc("ytpdf_cache_lookups_total", record["cache_misses"], stage=stage, result="miss")
+        if record["error"]:
+            inc("ytpdf_stage_errors_total", stage=stage)
+
+    def render(self) -> str:
+        return render_prometheus()
+
+    def serve(self, port: int, host: str = "0.0.0.0"):
+        """Serves /metrics from a daemon thread and returns the server."""
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split("?")[0] != "/metrics":
+                    handler.send_error(404)
+                    return
+                body = render_prometheus().encode("utf-8")
+                handler.send_response(200)
+                handler.send_header("Content-Type", "text/plain; version=0.0.4")
+                handler.send_header("Content-Length", str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"Metrics available at http://{host}:{port}/metrics")
+        return server
+
+
+def add_sink(sink):
+    """Registers a sink; any object with an emit(record) method works."""
+    with _sinks_lock:
+        _sinks.append(sink)
+
+
+def _configure_from_env():
+    global _configured
+    with _sinks_lock:
+        if _configured:
+            return
+        _configured = True
+    if METRICS_LOG:
+        add_sink(JsonLogSink(METRICS_LOG))
+    if METRICS_PORT:
+        sink = PrometheusSink()
+        sink.serve(int(METRICS_PORT))
+        add_sink(sink)
+
+
+def _emit(record):
+    _configure_from_env()
+    for sink in list(_sinks):
+        try:
+            sink.emit(record)
+        except Exception as e:
+            print(f"Metrics sink failed: {e}")
+
+
+def _payload_size(value) -> int:
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return 0
+
+
+def _state_size(state) -> int:
+    return sum(_payload_size(v) for v in state.values()) if isinstance(state, dict) else 0
+
+
+@contextmanager
+def stage(name, request_id=None):
+    """Times a block as one stage and emits its record when it ends."""
+    record = {
+        "request_id": request_id,
+        "stage": name,
+        "started_at": time.time(),
+        "seconds": 0.0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        # Prompt tokens served from Gemini's context cache, and estimated tokens
+        # kept out of prompts by compaction.
+        "cached_tokens": 0,
+        "saved_tokens": 0,
+        "bytes_in": 0,
+        "bytes_out": 0,
+        "cache_hits": 0,
+        "cache_misses": 0,
+        "error": None,
+    }
+    token = _current_stage.set(record)
+    started = time.perf_counter()
+    try:
+        yield record
+    except BaseException as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        record["seconds"] = round(time.perf_counter() - started, 6)
+        _current_stage.reset(token)
+        _emit(record)
+
+
+def record_tokens(prompt_tokens=0, completion_tokens=0, cached_tokens=0):
+    """Adds LLM token usage to the stage running in the current context."""
+    record = _current_stage.get()
+    if record is not None:
+        record["prompt_tokens"] += prompt_tokens or 0
+        record["completion_tokens"] += completion_tokens or 0
+        record["cached_tokens"] += cached_tokens or 0
+
+
+def record_usage(message):
+    """Adds the usage_metadata of a LangChain message (or chunk) to the current stage."""
+    usage = getattr(message, "usage_metadata", None) or {}
+    details = usage.get("input_token_details") or {}
+    record_tokens(usage.get("input_tokens", 0), usage.get("output_tokens", 0), details.get("cache_read", 0))
+
+
+def record_saved_tokens(tokens):
+    """Adds prompt tokens avoided (e.g. by compacting the input) to the current stage."""
+    record = _current_stage.get()
+    if record is not None:
+        record["saved_tokens"] += tokens or 0
+
+
+def record_cache(hit: bool):
+    record = _current_stage.get()
+    if record is not None:
+        record["cache_hits" if hit else "cache_misses"] += 1
+
+
+def instrument(name, node):
+    """
+    Wraps a LangGraph node so each run is recorded as a stage.
+
+    Captures wall time, bytes of text/PDF payload going in and coming out, and
+    any tokens or cache lookups recorded while the node runs. The request ID
+    is taken from the state.
+    """
+
+    def snapshot(state):
+        return {k: id(v) for k, v in state.items()}
+
+    def finish(record, before, result):
+        # Nodes update the state in place, so "out" counts only the values the node replaced.
+        if isinstance(result, dict):
+            record["bytes_out"] = sum(
+                _payload_size(v) for k, v in result.items() if before.get(k) != id(v)
+            )
+            if result.get("error") and not record["error"]:
+                record["error"] = result["error"]
+
+    if inspect.iscoroutinefunction(node):
+        @functools.wraps(node)
+        async def wrapper(state):
+            before = snapshot(state)
+            with stage(name, state.get("request_id")) as record:
+                record["bytes_in"] = _state_size(state)
+                result = await node(state)
+                finish(record, before, result)
+                return result
+    else:
+        @functools.wraps(node)
+        def wrapper(state):
+            before = snapshot(state)
+            with stage(name, state.get("request_id")) as record:
+                record["bytes_in"] = _state_size(state)
+                result = node(state)
+                finish(record, before, result)
+                return result
+
+    return wrapper
@@ -1,51 +1,91 @@
 import io
-import re
+import itertools
+import threading
 from datetime import datetime
-from xml.sax.saxutils import escape
+from types import MappingProxyType
+from typing import BinaryIO, Iterable, Iterator, Union
 
 from reportlab.lib.colors import HexColor, black, red
+from reportlab.lib.fonts import ps2tt
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 from reportlab.lib.units import inch
-from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+from reportlab.platypus import (
+    Flowable,
+    HRFlowable,
+    Paragraph,
+    SimpleDocTemplate,
+    Spacer,
+    Table,
+    TableStyle,
+)
 
+import fonts
+import markdown_ast
 
-def format_text(text: str) -> str:
-    """Applies bold, italic, and inline code formatting using HTML tags."""
-    # Process bold first (**text**)
-    text = re.sub(r"\*\*(.*?)\*\*", r"<b>\1</b>", text)
-    # Process italics (*text*), avoiding collision with bold
-    text = re.sub(r"\*(.*?)\*", r"<i>\1</i>", text)
-    # Process inline code (`code`)
-    text = re.sub(
-        r"`([^`]+)`", r'<font name="Courier" color="#666666">\1</font>', text
-    )
-    return text
 
+# Page margin on every side, shared by the page template and table widths.
+PAGE_MARGIN = 0.2 * inch
+CONTENT_WIDTH = letter[0] - 2 * PAGE_MARGIN
+# Bands above and below the frame for the running header and the page footer.
+HEADER_HEIGHT = 0.3 * inch
+FOOTER_HEIGHT = 0.3 * inch
+PAGE_DECORATION_COLOR = HexColor("#999999")
 
-def convert_notes_to_pdf(
-    markdown_content: str,
-    video_title: str = "Educational Notes",
-    video_url: str = "",
-) -> bytes:
+# Paragraph style per heading level; deeper levels reuse the smallest heading.
+HEADING_STYLES = {1: "CustomHeading1", 2: "CustomHeading2", 3: "CustomHeading3"}
+# Bullet style and marker per list nesting level; deeper levels reuse the last one.
+LIST_STYLES = ["BulletPoint", "BulletPoint2", "BulletPoint3"]
+BULLET_MARKERS = ["•", "–", "·"]
+
+
+def inline_markup(children, bold: bool = False, italic: bool = False) -> str:
     """
-    Converts a markdown string into a PDF file in memory and returns its bytes.
+    Renders inline AST nodes as ReportLab paragraph markup, escaping text.
+
+    `bold`/`italic` describe the surrounding style, so glyphs set in a fallback
+    font (whose <font> tag resets them) keep the weight of the text around them.
     """
-    # Create an in-memory buffer to hold the PDF data
-    buffer = io.BytesIO()
-
-    # Create the PDF document template using the buffer
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=letter,
-        leftMargin=0.2 * inch,
-        rightMargin=0.2 * inch,
-        topMargin=0.2 * inch,
-        bottomMargin=0.2 * inch,
-    )
+    registry = fonts.get_registry()
+    parts = []
+    for child in children:
+        if isinstance(child, markdown_ast.Text):
+            parts.append(registry.markup(child.text, bold=bold, italic=italic))
+        elif isinstance(child, markdown_ast.Code):
+            code = registry.markup(child.text, registry.mono, bold, italic)
+            parts.append(f'<font name="{registry.mono.regular}" color="#666666">{code}</font>')
+        elif isinstance(child, markdown_ast.Strong):
+            parts.append(f"<b>{inline_markup(child.children, True, italic)}</b>")
+        else:
+            parts.append(f"<i>{inline_markup(child.children, bold, True)}</i>")
+    return "".join(parts)
 
-    # --- Define Styles ---
+
+def styled_markup(children, style) -> str:
+    """inline_markup for a paragraph in `style`, e.g. bold throughout for headings."""
+    _, bold, italic = ps2tt(style.fontName)
+    return inline_markup(children, bool(bold), bool(italic))
+
+
+def format_text(text: str) -> str:
+    """Applies bold, italic, and inline code formatting using HTML tags."""
+    return inline_markup(markdown_ast.parse_inline(text))
+
+
+def build_styles(registry=None):
+    """Returns the stylesheet used for notes PDFs, set in the registry's Unicode fonts."""
+    registry = registry or fonts.get_registry()
     styles = getSampleStyleSheet()
+    styles.add(
+        ParagraphStyle(
+            name="CustomHeading1",
+            parent=styles["Heading1"],
+            fontSize=18,
+            spaceAfter=14,
+            spaceBefore=20,
+            textColor=black,
+        )
+    )
     styles.add(
         ParagraphStyle(
             name="CustomHeading2",
@@ -86,6 +126,42 @@ def convert_notes_to_pdf(
             textColor=black,
         )
     )
+    styles.add(
+        ParagraphStyle(
+            name="BulletPoint2",
+            parent=styles["BulletPoint"],
+            leftIndent=40,
+            bulletIndent=30,
+        )
+    )
+    styles.add(
+        ParagraphStyle(
+            name="BulletPoint3",
+            parent=styles["BulletPoint"],
+            leftIndent=60,
+            bulletIndent=50,
+        )
+    )
+    styles.add(
+        ParagraphStyle(
+            name="BlockQuote",
+            parent=styles["Normal"],
+            leftIndent=20,
+            rightIndent=20,
+            spaceBefore=4,
+            spaceAfter=4,
+            textColor=HexColor("#555555"),
+            fontName="Helvetica-Oblique",
+        )
+    )
+    styles.add(
+        ParagraphStyle(
+            name="TableCell",
+            parent=styles["Normal"],
+            fontSize=9,
+            leading=11,
+        )
+    )
     styles.add(
         ParagraphStyle(
             name="DiagramAlert",
@@ -115,92 +191,274 @@ def convert_notes_to_pdf(
             borderWidth=0.5,
         )
     )
+    for style in styles.byName.values():
+        if not isinstance(style, ParagraphStyle):
+            continue
+        style.fontName = registry.substitutes.get(style.fontName, style.fontName)
+        style.bulletFontName = registry.substitutes.get(style.bulletFontName, style.bulletFontName)
+    return styles
 
-    # --- Build PDF Story ---
-    story = []
 
-    # Title section
-    story.append(Paragraph(video_title, styles["Title"]))
-    story.append(Spacer(1, 12))
-    story.append(
-        Paragraph(
-            f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-            styles["Normal"],
-        )
+def iter_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Re-splits a stream of text chunks (e.g. LLM tokens) into complete lines."""
+    pending = ""
+    for chunk in chunks:
+        pending += chunk
+        start = 0
+        end = pending.find("\n")
+        while end != -1:
+            yield pending[start:end]
+            start = end + 1
+            end = pending.find("\n", start)
+        pending = pending[start:]
+    if pending:
+        yield pending
+
+
+def block_flowables(block, styles) -> Iterator[Flowable]:
+    """Yields the flowables for one markdown AST block."""
+    if isinstance(block, markdown_ast.BlankLine):
+        yield Spacer(1, 6)
+    elif isinstance(block, markdown_ast.Heading):
+        style = HEADING_STYLES.get(block.level, "CustomHeading4")
+        yield Paragraph(styled_markup(block.children, styles[style]), styles[style])
+    elif isinstance(block, markdown_ast.ListItem):
+        level = min(block.depth, len(LIST_STYLES) - 1)
+        marker = f"{block.number}." if block.ordered else BULLET_MARKERS[level]
+        yield Paragraph(f"{marker} {inline_markup(block.children)}", styles[LIST_STYLES[level]])
+    elif isinstance(block, markdown_ast.CodeBlock):
+        registry = fonts.get_registry()
+        code_text = registry.markup(block.text, registry.mono)
+        yield Paragraph(code_text.replace("\n", "<br/>"), styles["CodeBlock"])
+    elif isinstance(block, markdown_ast.DiagramAlert):
+        icon = fonts.get_registry().markup("📊")
+        yield Paragraph(f"{icon} <b>DIAGRAM:</b> {inline_markup(block.children)}", styles["DiagramAlert"])
+    elif isinstance(block, markdown_ast.BlockQuote):
+        yield Paragraph(styled_markup(block.children, styles["BlockQuote"]), styles["BlockQuote"])
+    elif isinstance(block, markdown_ast.Table):
+        yield table_flowable(block, styles)
+    elif isinstance(block, markdown_ast.Rule):
+        yield HRFlowable(width="100%", thickness=0.5, color=HexColor("#999999"), spaceBefore=6, spaceAfter=6)
+    else:
+        yield Paragraph(inline_markup(block.children), styles["Normal"])
+
+
+def table_flowable(block, styles) -> Table:
+    cell_style = styles["TableCell"]
+    rows = []
+    if block.header:
+        rows.append([Paragraph(f"<b>{inline_markup(cell, bold=True)}</b>", cell_style) for cell in block.header])
+    for row in block.rows:
+        rows.append([Paragraph(inline_markup(cell), cell_style) for cell in row])
+
+    columns = max(len(row) for row in rows) if rows else 1
+    for row in rows:
+        row.extend(Paragraph("", cell_style) for _ in range(columns - len(row)))
+
+    commands = [
+        ("GRID", (0, 0), (-1, -1), 0.5, HexColor("#999999")),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+    ]
+    if block.header:
+        commands.append(("BACKGROUND", (0, 0), (-1, 0), HexColor("#EEEEEE")))
+    return Table(
+        rows,
+        colWidths=[CONTENT_WIDTH / columns] * columns,
+        repeatRows=1 if block.header else 0,
+        style=TableStyle(commands),
+        spaceBefore=6,
+        spaceAfter=6,
+    )
+
+
+def iter_markdown_flowables(chunks: Iterable[str], styles) -> Iterator[Flowable]:
+    """
+    Parses markdown incrementally and yields one flowable at a time.
+
+    Only the current line (and an open code block or table) is held in memory,
+    so the markdown can come straight from a streaming LLM response.
+    """
+    return iter_block_flowables(markdown_ast.parse_blocks(iter_lines(chunks)), styles)
+
+
+def iter_block_flowables(blocks: Iterable[markdown_ast.Block], styles) -> Iterator[Flowable]:
+    """Yields the flowables for already parsed blocks, one block at a time."""
+    for block in blocks:
+        yield from block_flowables(block, styles)
+
+
+def iter_title_flowables(video_title: str, video_url: str, styles) -> Iterator[Flowable]:
+    yield Paragraph(fonts.get_registry().markup(video_title, bold=True), styles["Title"])
+    yield Spacer(1, 12)
+    yield Paragraph(
+        f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+        styles["Normal"],
     )
     if video_url:
-        story.append(
-            Paragraph(
-                f"Source: <a href='{video_url}' color='black'>{video_url}</a>",
-                styles["Normal"],
-            )
+        yield Paragraph(
+            f"Source: <a href='{video_url}' color='black'>{video_url}</a>",
+            styles["Normal"],
         )
-    story.append(Spacer(1, 20))
-
-    # --- Parse Markdown Content ---
-    lines = markdown_content.split("\n")
-    i = 0
-    in_code_block = False
-    code_buffer = []
-
-    while i < len(lines):
-        line = lines[i]
-        stripped_line = line.strip()
-
-        # Handle fenced code blocks
-        if stripped_line.startswith("```"):
-            if not in_code_block:
-                in_code_block = True
-            else:
-                in_code_block = False
-                code_text = escape("\n".join(code_buffer))
-                story.append(
-                    Paragraph(code_text.replace("\n", "<br/>"), styles["CodeBlock"])
-                )
-                code_buffer = []
-            i += 1
-            continue
+    yield Spacer(1, 20)
 
-        if in_code_block:
-            code_buffer.append(line)
-            i += 1
-            continue
 
-        # Handle other markdown elements
-        if not stripped_line:
-            story.append(Spacer(1, 6))
-        elif stripped_line.startswith("## "):
-            story.append(
-                Paragraph(format_text(stripped_line[3:]), styles["CustomHeading2"])
-            )
-        elif stripped_line.startswith("### "):
-            story.append(
-                Paragraph(format_text(stripped_line[4:]), styles["CustomHeading3"])
-            )
-        elif stripped_line.startswith("#### "):
-            story.append(
-                Paragraph(format_text(stripped_line[5:]), styles["CustomHeading4"])
-            )
-        elif "DIAGRAM ALERT" in stripped_line:
-            clean_line = stripped_line.replace("📊 **[DIAGRAM ALERT]**:", "").strip()
-            story.append(
-                Paragraph(f"📊 <b>DIAGRAM:</b> {clean_line}", styles["DiagramAlert"])
-            )
-        elif stripped_line.startswith("* "):
-            bullet_text = stripped_line[2:]
-            story.append(
-                Paragraph(f"• {format_text(bullet_text)}", styles["BulletPoint"])
-            )
-        else:
-            story.append(Paragraph(format_text(stripped_line), styles["Normal"]))
+class FlowableStream(list):
+    """
+    A story list that refills itself lazily from a flowable iterator.
+
+    BaseDocTemplate.build only works on the front of the story (checking len(),
+    indexing [0], deleting and re-inserting split parts), so keeping a small
+    lookahead buffered lets a story of any length be laid out without ever
+    materializing it.
+    """
+
+    def __init__(self, flowables: Iterable[Flowable], lookahead: int = 8):
+        super().__init__()
+        self._source = iter(flowables)
+        self._lookahead = lookahead
+
+    def __len__(self):
+        while self._source is not None and list.__len__(self) < self._lookahead:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+        return list.__len__(self)
+
+
+class NotesRenderer:
+    """
+    Renders notes PDFs with a theme that is built once and shared.
+
+    The stylesheet is frozen into a read-only mapping at construction, and
+    ReportLab only reads styles during layout, so one instance can serve any
+    number of renders, including concurrent ones from several threads.
+
+    Fonts and the page decorations (header/footer faces and geometry) are also
+    resolved here; ReportLab builds each document's Frame and PageTemplate from
+    them, since it mutates those while laying out pages.
+    """
 
-        i += 1
+    def __init__(self, styles=None, registry=None):
+        self.fonts = registry or fonts.get_registry()
+        styles = styles or build_styles(self.fonts)
+        self.styles = MappingProxyType(dict(styles.byName))
+        self.decoration_font = self.fonts.text.regular
+        self.header_y = letter[1] - PAGE_MARGIN - HEADER_HEIGHT / 2
+        self.footer_y = PAGE_MARGIN + FOOTER_HEIGHT / 2
+        self.rule_y = letter[1] - PAGE_MARGIN - HEADER_HEIGHT + 4
 
-    # Build the PDF in the memory buffer
-    doc.build(story)
+    def draw_footer(self, canvas, doc):
+        canvas.saveState()
+        canvas.setFont(self.decoration_font, 8)
+        canvas.setFillColor(PAGE_DECORATION_COLOR)
+        canvas.drawRightString(letter[0] - PAGE_MARGIN, self.footer_y, f"Page {doc.page}")
+        canvas.restoreState()
 
-    # Get the byte value of the PDF and close the buffer
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
+    def draw_header_and_footer(self, canvas, doc):
+        """Running title and rule on every page after the first (which has the big title)."""
+        canvas.saveState()
+        canvas.setFont(self.decoration_font, 8)
+        canvas.setFillColor(PAGE_DECORATION_COLOR)
+        canvas.drawString(PAGE_MARGIN, self.header_y, doc.title)
+        canvas.setStrokeColor(PAGE_DECORATION_COLOR)
+        canvas.setLineWidth(0.5)
+        canvas.line(PAGE_MARGIN, self.rule_y, letter[0] - PAGE_MARGIN, self.rule_y)
+        canvas.restoreState()
+        self.draw_footer(canvas, doc)
 
-    return pdf_bytes
+    def render(
+        self,
+        chunks: Iterable[str],
+        sink: Union[str, BinaryIO],
+        video_title: str = "Educational Notes",
+        video_url: str = "",
+    ) -> None:
+        """
+        Renders streamed markdown chunks into a PDF written to `sink`.
+
+        `sink` is a filename or any binary file-like object with write() (an open
+        file, a socket's makefile("wb"), ...). Flowables are created and laid out
+        one at a time, so neither the full markdown nor the full story is kept.
+        """
+        self.render_blocks(markdown_ast.parse_blocks(iter_lines(chunks)), sink, video_title, video_url)
+
+    def render_blocks(
+        self,
+        blocks: Iterable[markdown_ast.Block],
+        sink: Union[str, BinaryIO],
+        video_title: str = "Educational Notes",
+        video_url: str = "",
+    ) -> None:
+        """Renders parsed markdown blocks (e.g. exporters.Document.blocks) into a PDF written to `sink`."""
+        doc = SimpleDocTemplate(
+            sink,
+            pagesize=letter,
+            leftMargin=PAGE_MARGIN,
+            rightMargin=PAGE_MARGIN,
+            topMargin=PAGE_MARGIN + HEADER_HEIGHT,
+            bottomMargin=PAGE_MARGIN + FOOTER_HEIGHT,
+            title=video_title,
+        )
+
+        story = itertools.chain(
+            iter_title_flowables(video_title, video_url, self.styles),
+            iter_block_flowables(blocks, self.styles),
+        )
+        doc.build(
+            FlowableStream(story),
+            onFirstPage=self.draw_footer,
+            onLaterPages=self.draw_header_and_footer,
+        )
+
+    def convert(
+        self,
+        markdown_content: str,
+        video_title: str = "Educational Notes",
+        video_url: str = "",
+    ) -> bytes:
+        """Renders a markdown string into a PDF in memory and returns its bytes."""
+        # Create an in-memory buffer to hold the PDF data
+        buffer = io.BytesIO()
+        self.render([markdown_content], buffer, video_title, video_url)
+
+        # Get the byte value of the PDF and close the buffer
+        pdf_bytes = buffer.getvalue()
+        buffer.close()
+
+        return pdf_bytes
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_renderer() -> NotesRenderer:
+    """Returns the process-wide renderer, building its theme on first use."""
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = NotesRenderer()
+    return _renderer
+
+
+def render_notes_to_sink(
+    chunks: Iterable[str],
+    sink: Union[str, BinaryIO],
+    video_title: str = "Educational Notes",
+    video_url: str = "",
+) -> None:
+    """Renders streamed markdown chunks into a PDF written to `sink`."""
+    get_renderer().render(chunks, sink, video_title, video_url)
+
+
+def convert_notes_to_pdf(
+    markdown_content: str,
+    video_title: str = "Educational Notes",
+    video_url: str = "",
+) -> bytes:
+    """
+    Converts a markdown string into a PDF file in memory and returns its bytes.
+    """
+    return get_renderer().convert(markdown_content, video_title, video_url)
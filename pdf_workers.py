@@ -0,0 +1,101 @@
+import asyncio
+import io
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Worker processes for PDF rendering; 0 renders inline in the calling process.
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "2"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _init_worker():
+    """Preloads ReportLab, the PDF fonts and the shared theme so the first job doesn't pay for them."""
+    import pdf_converter
+
+    pdf_converter.get_renderer()
+
+
+def _render(markdown_content, video_title, video_url, to_file):
+    # Imported here so that importing this module doesn't load ReportLab.
+    import pdf_converter
+
+    renderer = pdf_converter.get_renderer()
+    if isinstance(markdown_content, str):
+        draw = lambda sink: renderer.render([markdown_content], sink, video_title, video_url)
+    else:
+        # Blocks parsed by the caller (exporters.Document.blocks) aren't parsed again.
+        draw = lambda sink: renderer.render_blocks(markdown_content, sink, video_title, video_url)
+
+    if not to_file:
+        buffer = io.BytesIO()
+        draw(buffer)
+        return buffer.getvalue()
+
+    # Writing to a temp file avoids pickling the PDF back through the pool's pipe.
+    fd, path = tempfile.mkstemp(prefix="ytpdf_", suffix=".pdf")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            draw(f)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+def get_executor():
+    """Returns the shared process pool, starting it on first use (None when PDF_WORKERS is 0)."""
+    global _executor
+    if PDF_WORKERS <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            # spawn keeps workers independent of the parent's event loop and threads.
+            _executor = ProcessPoolExecutor(
+                max_workers=PDF_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _executor
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def render_pdf_sync(markdown_content, video_title="Educational Notes", video_url="", to_file=False):
+    """Renders in the current process; for single-shot CLI use where a pool isn't worth starting."""
+    return _render(markdown_content, video_title, video_url, to_file)
+
+
+async def render_pdf(markdown_content, video_title="Educational Notes", video_url="", to_file=False):
+    """
+    Renders a notes PDF in the worker pool without blocking the event loop.
+
+    markdown_content is markdown text or a sequence of markdown_ast blocks.
+    Returns the PDF bytes, or the path of a temporary PDF file when to_file is
+    True (the caller owns and deletes it). Falls back to rendering inline when
+    the pool is disabled or a worker died.
+    """
+    executor = get_executor()
+    if executor is None:
+        return render_pdf_sync(markdown_content, video_title, video_url, to_file)
+
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(
+            executor, _render, markdown_content, video_title, video_url, to_file
+        )
+    except BrokenProcessPool:
+        print("⚠️ PDF worker pool broke, restarting it and rendering inline")
+        shutdown()
+        return render_pdf_sync(markdown_content, video_title, video_url, to_file)
@@ -1,7 +1,35 @@
-def get_video_analysis_prompt(video_url):
-    return f"""
-    Analyze this educational video: {video_url}
+from dataclasses import dataclass
+
+# Bump whenever a prompt changes so cached results from older prompts are not reused.
+PROMPT_VERSION = "3"
+
+
+@dataclass(frozen=True)
+class Prompt:
+    """
+    A prompt split into static instructions and the per-request input.
+
+    The instructions come first and are identical for every video, so Gemini can
+    serve them from its implicit context cache; only the input differs per call.
+    """
+
+    instructions: str
+    content: str
+
+    @property
+    def text(self) -> str:
+        """Single-message form (e.g. for the agent), still instructions first."""
+        return self.instructions + self.content
+
+    def messages(self) -> list:
+        """Chat messages: the instructions as the system message, the input as the user message."""
+        return [("system", self.instructions), ("human", self.content)]
 
+    def __str__(self):
+        return self.text
+
+# Shared by the agent prompt (video URL) and the transcript prompt.
+VIDEO_ANALYSIS_INSTRUCTIONS = """
     You are analyzing an educational video where a teacher explains PowerPoint slides to students. Extract ALL educational content in a comprehensive 2000+ word format. Focus entirely on the learning material and instructional content.
 
     ## SLIDE CONTENT EXTRACTION (600-800 words)
@@ -78,9 +106,27 @@ def get_video_analysis_prompt(video_url):
     Your goal is to create a complete educational resource that captures everything a student would need to learn from this lecture, presented in a clear, organized format that mirrors the instructional sequence.
     """
 
-def get_short_convert_markdown_prompt(content):
-    return f"""
-You are an expert technical writer specializing in distillation. Your sole task is to distill the following content into an ultra-concise, key-point-focused markdown summary. Be ruthless in cutting non-essential information.
+TRANSCRIPT_ANALYSIS_INSTRUCTIONS = """
+    The video's full transcript is included after these instructions, with [mm:ss] timestamps.
+    The slides themselves are not visible, so reconstruct slide titles and content from what
+    the teacher says and use the timestamps for the chronological progression.
+""" + VIDEO_ANALYSIS_INSTRUCTIONS
+
+def get_video_analysis_prompt(video_url):
+    return Prompt(VIDEO_ANALYSIS_INSTRUCTIONS, f"""
+    Analyze this educational video: {video_url}
+""")
+
+def get_transcript_analysis_prompt(video_url, transcript):
+    return Prompt(TRANSCRIPT_ANALYSIS_INSTRUCTIONS, f"""
+    Analyze this educational video: {video_url}
+
+    TRANSCRIPT:
+{transcript}
+""")
+
+SHORT_CONVERT_INSTRUCTIONS = """
+You are an expert technical writer specializing in distillation. Your sole task is to distill the content that follows these instructions into an ultra-concise, key-point-focused markdown summary. Be ruthless in cutting non-essential information.
 
 ---
 **CRITICAL RULES:**
@@ -92,20 +138,18 @@ You are an expert technical writer specializing in distillation. Your sole task
   - Enclose essential keywords in `**bold**`.
 - **Visuals:** If the content describes a diagram, chart, or illustration, flag it with: `📊 **[DIAGRAM ALERT]**: [Brief description of the visual's purpose].`
 
----
-**CONTENT TO DISTILL:**
-{content}
-
----
 Produce only the markdown summary. Do not include any preamble or extra text.
 """
 
-def get_long_convert_markdown_prompt(content):
-    return f"""
-Convert the following content into comprehensive, detailed markdown notes that preserve all educational value and context.
-
-CONTENT TO CONVERT:
+def get_short_convert_markdown_prompt(content):
+    return Prompt(SHORT_CONVERT_INSTRUCTIONS, f"""
+---
+**CONTENT TO DISTILL:**
 {content}
+""")
+
+LONG_CONVERT_INSTRUCTIONS = """
+Convert the content that follows these instructions into comprehensive, detailed markdown notes that preserve all educational value and context.
 
 FORMAT REQUIREMENTS:
 - Use hierarchical markdown headers (##, ###, ####)
@@ -129,3 +173,70 @@ Format: 📊 **[DIAGRAM ALERT]**: [Detailed description of visual content and it
 
 Convert the content directly into markdown notes without additional sections or structure explanations.
 """
+
+def get_long_convert_markdown_prompt(content):
+    return Prompt(LONG_CONVERT_INSTRUCTIONS, f"""
+CONTENT TO CONVERT:
+{content}
+""")
+
+CHUNK_STYLES = {
+    "short": """- Keep only the core concepts, key terms and essential facts of this part.
+- Use `##` for main topics, `###` for sub-topics and bullet points (`*`) for details.
+- Enclose essential keywords in `**bold**`.""",
+    "long": """- Preserve all explanations, examples, formulas and data from this part.
+- Use hierarchical markdown headers (##, ###, ####) and detailed bullet points.
+- Use **bold** for key terms, *italics* for emphasis and ```formula``` blocks for formulas.
+- Add tables for data/comparisons when relevant.""",
+}
+
+CHUNK_CONVERT_INSTRUCTIONS = {
+    note_type: f"""
+You are converting one part of a long lecture analysis into markdown notes; the part
+follows these instructions. The other parts are converted separately and merged
+afterwards, so cover only this part and do not add an introduction or conclusion.
+
+FORMAT REQUIREMENTS:
+{style}
+- Alert users to visual content with: 📊 **[DIAGRAM ALERT]**: [Description of the visual]
+
+Produce only the markdown notes for this part.
+"""
+    for note_type, style in CHUNK_STYLES.items()
+}
+
+def get_chunk_convert_markdown_prompt(content, note_type, part, total):
+    return Prompt(CHUNK_CONVERT_INSTRUCTIONS[note_type], f"""
+CONTENT TO CONVERT (PART {part} OF {total}):
+{content}
+""")
+
+MERGE_TARGETS = {
+    "short": """- The merged summary must be **under 400 words**; keep only the absolute core concepts.
+- Be ruthless in cutting repetition and non-essential detail.""",
+    "long": """- Keep all educational detail, examples, formulas, tables and diagram alerts.
+- Target 600-800 words, or more if the lecture needs it for comprehensive coverage.""",
+}
+
+MERGE_INSTRUCTIONS = {
+    note_type: f"""
+The markdown notes that follow these instructions were written separately for consecutive
+parts of one lecture. Merge them into a single, coherent set of notes.
+
+MERGE RULES:
+- Combine sections that cover the same topic and remove repeated points.
+- Keep the lecture's chronological and logical order.
+- Use `##` for main topics, `###`/`####` for sub-topics and bullet points (`*`) for details.
+- Keep every 📊 **[DIAGRAM ALERT]** line that describes a distinct visual.
+{target}
+
+Produce only the merged markdown notes. Do not include any preamble or extra text.
+"""
+    for note_type, target in MERGE_TARGETS.items()
+}
+
+def get_merge_markdown_prompt(partial_notes, note_type):
+    return Prompt(MERGE_INSTRUCTIONS[note_type], f"""
+PARTIAL NOTES:
+{partial_notes}
+""")
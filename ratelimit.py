@@ -0,0 +1,374 @@
+import asyncio
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+
+import clients
+import config
+import metrics
+
+# Per-key Gemini quota; the agent, transcript and conversion calls all draw from it.
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "10"))
+GEMINI_TPM = float(os.getenv("GEMINI_TPM", "250000"))
+# SQLite file holding the budgets, shared by every process on this machine (the web app,
+# its job workers, `python jobs.py`, batch runs); empty keeps a separate budget per process.
+RATELIMIT_DB_PATH = os.getenv("RATELIMIT_DB_PATH", os.path.join(".cache", "ratelimit.sqlite3"))
+# Output tokens assumed per call when reserving token budget (input is estimated from the prompt).
+OUTPUT_TOKEN_ESTIMATE = int(os.getenv("GEMINI_OUTPUT_TOKEN_ESTIMATE", "2000"))
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "5"))
+RETRY_BASE_DELAY = float(os.getenv("RETRY_BASE_DELAY", "1.0"))
+RETRY_MAX_DELAY = float(os.getenv("RETRY_MAX_DELAY", "60"))
+
+# After a 429 the request rate is halved, then recovers by this fraction per success.
+MIN_RATE_FACTOR = 0.1
+RATE_RECOVERY_STEP = 0.05
+
+RETRYABLE_CODES = {408, 429, 500, 502, 503, 504}
+RETRYABLE_MESSAGE = re.compile(
+    r"\b(429|500|502|503|504|RESOURCE_EXHAUSTED|UNAVAILABLE|DEADLINE_EXCEEDED|INTERNAL)\b"
+    r"|rate limit|quota|overloaded|temporarily",
+    re.IGNORECASE,
+)
+RATE_LIMIT_MESSAGE = re.compile(r"\b429\b|RESOURCE_EXHAUSTED|rate limit|quota", re.IGNORECASE)
+# Gemini puts the hint in the error details, e.g. "retryDelay": "17s" or "Please retry in 17.2s".
+RETRY_DELAY_MESSAGE = re.compile(r"retry(?:Delay|[ _-]after| in)[\"':\s]*([\d.]+)\s*s", re.IGNORECASE)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    -- Fraction of the configured rate in use after 429s.
+    factor REAL NOT NULL,
+    -- Wall-clock time until which nobody may start a call (server retry hint).
+    blocked_until REAL NOT NULL
+);
+"""
+_STATE_FIELDS = ("tokens", "updated_at", "factor", "blocked_until")
+
+
+class SharedBuckets:
+    """
+    Token bucket state in a SQLite file, so all processes using one API key draw
+    from a single budget instead of each getting the full quota.
+
+    Every change is one short write transaction; calls happen at most a few
+    times a second, far below what SQLite handles.
+    """
+
+    def __init__(self, path: str = RATELIMIT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Autocommit mode: update() opens its own BEGIN IMMEDIATE transactions.
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def update(self, name: str, default: dict, change):
+        """Applies change(state) to bucket `name` (created from `default`) atomically and returns its result."""
+        with self._lock:
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                row = self._conn.execute(
+                    "SELECT tokens, updated_at, factor, blocked_until FROM buckets WHERE name = ?", (name,)
+                ).fetchone()
+                state = dict(zip(_STATE_FIELDS, row)) if row else dict(default)
+                result = change(state)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (name, tokens, updated_at, factor, blocked_until) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (name, *(state[field] for field in _STATE_FIELDS)),
+                )
+                self._conn.execute("COMMIT")
+                return result
+            except BaseException:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_buckets():
+    """Returns the process-wide SharedBuckets, or None when disabled or the file can't be opened."""
+    global _shared
+    if not RATELIMIT_DB_PATH:
+        return None
+    with _shared_lock:
+        if _shared is None:
+            try:
+                _shared = SharedBuckets(RATELIMIT_DB_PATH)
+            except sqlite3.Error as e:
+                print(f"⚠️ Shared rate limit store unavailable, limiting per process: {e}")
+                return None
+        return _shared
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `per_minute`.
+
+    reserve() always succeeds and returns how long the caller must wait, so
+    callers queue up in reservation order instead of polling, across threads
+    and event loops alike. With `shared` (a SharedBuckets) the level lives in
+    SQLite under `name` and is shared with other processes; if the file is
+    unavailable the bucket falls back to its in-process level.
+    """
+
+    def __init__(self, per_minute: float, capacity: float = None, shared: SharedBuckets = None, name: str = None):
+        self.per_minute = per_minute
+        self.capacity = capacity or per_minute
+        self.shared = shared
+        self.name = name
+        self._local = {"tokens": self.capacity, "updated_at": time.time(), "factor": 1.0, "blocked_until": 0.0}
+        self._lock = threading.Lock()
+
+    def _update(self, change):
+        if self.shared is not None:
+            try:
+                return self.shared.update(self.name, self._local, change)
+            except sqlite3.Error as e:
+                print(f"⚠️ Shared rate limit bucket {self.name} failed, using this process's budget: {e}")
+        with self._lock:
+            return change(self._local)
+
+    def _refill(self, state, now):
+        rate = self.per_minute * state["factor"] / 60.0
+        elapsed = max(0.0, now - state["updated_at"])
+        state["tokens"] = min(self.capacity, state["tokens"] + elapsed * rate)
+        state["updated_at"] = now
+        return rate
+
+    @property
+    def factor(self) -> float:
+        return self._update(lambda state: state["factor"])
+
+    def reserve(self, amount: float) -> float:
+        if self.per_minute <= 0:
+            return 0.0
+        # A single request larger than the bucket would otherwise wait forever.
+        amount = min(amount, self.capacity)
+
+        def take(state):
+            now = time.time()
+            rate = self._refill(state, now)
+            state["tokens"] -= amount
+            delay = 0.0 if state["tokens"] >= 0 else -state["tokens"] / rate
+            return max(delay, state["blocked_until"] - now)
+
+        return self._update(take)
+
+    def refund(self, amount: float):
+        if self.per_minute <= 0:
+            return
+
+        def give(state):
+            self._refill(state, time.time())
+            state["tokens"] = min(self.capacity, state["tokens"] + amount)
+
+        self._update(give)
+
+    def scale(self, change) -> float:
+        """Sets the rate factor to change(factor) and returns the new factor."""
+        def apply(state):
+            # Tokens earned so far count at the old rate.
+            self._refill(state, time.time())
+            state["factor"] = change(state["factor"])
+            return state["factor"]
+
+        return self._update(apply)
+
+    def block(self, seconds: float):
+        """Makes every reservation wait at least until `seconds` from now."""
+        def apply(state):
+            state["blocked_until"] = max(state["blocked_until"], time.time() + seconds)
+
+        self._update(apply)
+
+
+class KeyLimiter:
+    """
+    Requests-per-minute and tokens-per-minute budgets of one API key.
+
+    With `shared`, the budgets (and the 429 back-off) are shared with every
+    other process using the same key; `lane` names them and is the key's
+    fingerprint, never the key itself.
+    """
+
+    def __init__(self, lane: str, rpm: float = GEMINI_RPM, tpm: float = GEMINI_TPM, shared: SharedBuckets = None):
+        self.lane = lane[:8]
+        self.requests = TokenBucket(rpm, shared=shared, name=f"{lane}:requests")
+        self.tokens = TokenBucket(tpm, shared=shared, name=f"{lane}:tokens")
+        self.waiting = 0
+        self._lock = threading.Lock()
+
+    def _publish(self, factor=None):
+        metrics.set_gauge("ytpdf_ratelimit_waiting", self.waiting, lane=self.lane)
+        if factor is not None:
+            metrics.set_gauge("ytpdf_ratelimit_rate_factor", round(factor, 3), lane=self.lane)
+
+    async def acquire(self, tokens: int = 0, requests: int = 1):
+        """Waits until the key has budget for `requests` calls using about `tokens` tokens."""
+        delay = max(self.requests.reserve(requests), self.tokens.reserve(tokens))
+        with self._lock:
+            if delay <= 0:
+                return
+            self.waiting += 1
+            self._publish()
+        try:
+            metrics.inc("ytpdf_ratelimit_wait_seconds_total", delay, lane=self.lane)
+            await asyncio.sleep(delay)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+                self._publish()
+
+    def settle(self, estimated_tokens: int, actual_tokens: int):
+        """Returns over-reserved token budget once a call's real usage is known."""
+        if actual_tokens and actual_tokens < estimated_tokens:
+            self.tokens.refund(estimated_tokens - actual_tokens)
+
+    def success(self):
+        if self.requests.per_minute <= 0:
+            return
+        factor = self.requests.scale(lambda factor: min(1.0, factor + RATE_RECOVERY_STEP))
+        self._publish(factor)
+
+    def rate_limited(self, retry_after: float = None):
+        """Backs the whole key off after a 429: pause everyone, then run at a reduced rate."""
+        factor = self.requests.scale(lambda factor: max(MIN_RATE_FACTOR, factor / 2))
+        if retry_after:
+            self.requests.block(retry_after)
+        self._publish(factor)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(api_key: str = None) -> KeyLimiter:
+    """Returns the shared limiter of an API key (default: the current request's key)."""
+    lane = clients.fingerprint(api_key or config.require_api_key())
+    with _limiters_lock:
+        limiter = _limiters.get(lane)
+        if limiter is None:
+            limiter = _limiters[lane] = KeyLimiter(lane, shared=get_shared_buckets())
+        return limiter
+
+
+def estimate_tokens(prompt) -> int:
+    """Rough token count of a call (a string or prompts.Prompt): ~4 characters per input token plus the expected output."""
+    return len(str(prompt)) // 4 + OUTPUT_TOKEN_ESTIMATE
+
+
+def _error_chain(error):
+    # Client libraries wrap the HTTP error (run_agent wraps again), so look at every cause.
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__ or error.__context__
+
+
+def _status_code(error):
+    for attr in ("code", "status_code"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def is_rate_limit(error) -> bool:
+    return any(
+        _status_code(e) == 429 or RATE_LIMIT_MESSAGE.search(str(e)) for e in _error_chain(error)
+    )
+
+
+def is_retryable(error) -> bool:
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    for e in _error_chain(error):
+        code = _status_code(e)
+        if code is not None:
+            return code in RETRYABLE_CODES
+        if isinstance(e, (asyncio.TimeoutError, ConnectionError)):
+            return True
+    return any(RETRYABLE_MESSAGE.search(str(e)) for e in _error_chain(error))
+
+
+def retry_after(error):
+    """Returns the server's retry hint in seconds (Retry-After header or retryDelay), if any."""
+    for e in _error_chain(error):
+        headers = getattr(getattr(e, "response", None), "headers", None)
+        value = headers.get("retry-after") if headers is not None else None
+        if value:
+            try:
+                return float(value)
+            except ValueError:
+                pass
+        match = RETRY_DELAY_MESSAGE.search(str(e))
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def backoff_delay(attempt: int, hint: float = None) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's hint."""
+    delay = random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt))
+    if hint:
+        delay = max(delay, hint + random.uniform(0, RETRY_BASE_DELAY))
+    return delay
+
+
+async def call(operation, name: str, estimated_tokens: int = 0, requests: int = 1,
+               max_attempts: int = RETRY_MAX_ATTEMPTS, api_key: str = None,
+               on_retry=None, used_tokens=None):
+    """
+    Runs `operation()` (a coroutine function) under the key's rate limit, retrying
+    429s, 5xx and transient network errors with jittered exponential backoff.
+
+    on_retry() is called before each retry, e.g. to drop the chunks a failed
+    streamed attempt already passed on. used_tokens() returns the tokens the
+    successful attempt used, for results without usage_metadata (streamed text,
+    agent runs); the unused part of the reservation is returned to the budget.
+
+    Non-retryable errors and the last attempt's error are raised unchanged.
+    """
+    limiter = get_limiter(api_key)
+    for attempt in range(1, max_attempts + 1):
+        await limiter.acquire(estimated_tokens, requests)
+        try:
+            result = await operation()
+        except Exception as e:
+            if attempt == max_attempts or not is_retryable(e):
+                raise
+            hint = retry_after(e)
+            rate_limited = is_rate_limit(e)
+            if rate_limited:
+                limiter.rate_limited(hint)
+            delay = backoff_delay(attempt, hint)
+            metrics.inc("ytpdf_retries_total", call=name, reason="rate_limit" if rate_limited else "transient")
+            print(f"⚠️ {name} failed (attempt {attempt}/{max_attempts}), retrying in {delay:.1f}s: {e}")
+            if on_retry is not None:
+                on_retry()
+            await asyncio.sleep(delay)
+            continue
+
+        limiter.success()
+        if used_tokens is not None:
+            limiter.settle(estimated_tokens, used_tokens())
+        else:
+            usage = getattr(result, "usage_metadata", None) or {}
+            limiter.settle(estimated_tokens, usage.get("total_tokens", 0))
+        return result
@@ -0,0 +1,202 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import exporters
+import metrics
+import prompts
+
+CACHE_PATH = os.getenv("YTPDF_CACHE_PATH", os.path.join(".cache", "ytpdf.sqlite3"))
+CACHE_TTL = int(os.getenv("YTPDF_CACHE_TTL", str(7 * 24 * 3600)))
+CACHE_MAX_BYTES = int(os.getenv("YTPDF_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+CACHE_MEMORY_ITEMS = int(os.getenv("YTPDF_CACHE_MEMORY_ITEMS", "64"))
+CACHE_ENABLED = os.getenv("YTPDF_CACHE_ENABLED", "1") not in ("0", "false", "False")
+
+# Kinds of pipeline output stored separately, so e.g. one analysis serves both note types.
+CONTENT = "content"
+MARKDOWN = "markdown"
+PDF = "pdf"
+# Raw caption text; independent of prompts, so its key ignores PROMPT_VERSION.
+TRANSCRIPT = "transcript"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    video_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    note_type TEXT NOT NULL,
+    is_text INTEGER NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at);
+"""
+
+
+def make_key(video_id: str, kind: str, note_type: str = "", version: str = None) -> str:
+    """Content-addressed key for one stage's output of one video."""
+    if version is None:
+        if kind == TRANSCRIPT:
+            version = "raw"
+        elif kind == PDF:
+            # A PDF depends on the renderer as well as on the prompts that produced its notes.
+            version = f"{prompts.PROMPT_VERSION}+renderer{exporters.RENDERER_VERSION}"
+        else:
+            version = prompts.PROMPT_VERSION
+    raw = f"{version}\x00{video_id}\x00{kind}\x00{note_type}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """
+    Two-level cache for pipeline results.
+
+    A small in-memory LRU sits in front of a SQLite file. Entries expire after
+    `ttl` seconds, and the SQLite store is trimmed to `max_bytes` by evicting
+    the least recently accessed rows. The file is shared with other processes
+    (job workers), so a SQLite error such as "database is locked" is logged and
+    treated as a miss rather than failing the pipeline.
+    """
+
+    def __init__(
+        self,
+        path: str = CACHE_PATH,
+        ttl: int = CACHE_TTL,
+        max_bytes: int = CACHE_MAX_BYTES,
+        memory_items: int = CACHE_MEMORY_ITEMS,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.memory_items = memory_items
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def get(self, video_id: str, kind: str, note_type: str = ""):
+        """Returns the cached str/bytes value, or None on a miss or expired entry."""
+        try:
+            value = self._get(video_id, kind, note_type)
+        except sqlite3.Error as e:
+            self._failed("read", e)
+            value = None
+        metrics.record_cache(value is not None)
+        return value
+
+    def _failed(self, action, error):
+        print(f"⚠️ Result cache {action} failed, continuing without it: {error}")
+        with self._lock:
+            try:
+                self._conn.rollback()
+            except sqlite3.Error:
+                pass
+
+    def _get(self, video_id, kind, note_type):
+        key = make_key(video_id, kind, note_type)
+        now = time.time()
+        with self._lock:
+            hit = self._memory.get(key)
+            if hit is not None:
+                value, created_at = hit
+                if now - created_at <= self.ttl:
+                    self._memory.move_to_end(key)
+                    return value
+                del self._memory[key]
+
+            row = self._conn.execute(
+                "SELECT is_text, value, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            is_text, value, created_at = row
+            if now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            self._conn.execute(
+                "UPDATE results SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            value = value.decode("utf-8") if is_text else bytes(value)
+            self._remember(key, value, created_at)
+            return value
+
+    def set(self, video_id: str, kind: str, value, note_type: str = ""):
+        if value is None:
+            return
+        key = make_key(video_id, kind, note_type)
+        is_text = isinstance(value, str)
+        blob = value.encode("utf-8") if is_text else bytes(value)
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO results "
+                    "(key, video_id, kind, note_type, is_text, value, size, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, video_id, kind, note_type, int(is_text), blob, len(blob), now, now),
+                )
+                self._evict(now)
+                self._conn.commit()
+                self._remember(key, value, now)
+        except sqlite3.Error as e:
+            self._failed("write", e)
+
+    def _remember(self, key, value, created_at):
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM results WHERE created_at < ?", (now - self.ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM results ORDER BY accessed_at ASC"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._memory.pop(key, None)
+            total -= size
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """Returns the shared process-wide cache, or None when caching is disabled."""
+    global _cache
+    if not CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = ResultCache()
+            except sqlite3.Error as e:
+                # Tried again on the next call; until then the pipeline runs uncached.
+                print(f"⚠️ Result cache unavailable, continuing without it: {e}")
+        return _cache
@@ -0,0 +1,73 @@
+import asyncio
+import os
+
+import metrics
+
+# Join identical concurrent requests in this process ("0" runs every request separately).
+COALESCE_REQUESTS = os.getenv("COALESCE_REQUESTS", "1") == "1"
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time; concurrent callers with the same
+    key await the call already in flight instead of starting their own.
+
+    The shared call runs as its own task and every caller awaits it through
+    asyncio.shield, so a caller that is cancelled only stops waiting. The call
+    itself is cancelled once no caller is left waiting for it. A finished call
+    is forgotten at once: results aren't cached here, and a failure is seen by
+    the callers that were waiting but not by later ones.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        # key -> (task, number of callers waiting on it)
+        self._calls = {}
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def run(self, key, factory):
+        """Returns the result of `factory()`, sharing one run among concurrent callers with the same key."""
+        loop = asyncio.get_running_loop()
+        # Tasks are bound to their loop, so calls from another loop run separately.
+        key = (id(loop), key)
+        call = self._calls.get(key)
+        if call is None:
+            task = loop.create_task(factory())
+            task.add_done_callback(lambda done: self._forget(key, done))
+            metrics.inc("ytpdf_singleflight_calls_total", flight=self.name, role="leader")
+        else:
+            task = call[0]
+            print(f"Joining in-flight {self.name} for {key[1]}")
+            metrics.inc("ytpdf_singleflight_calls_total", flight=self.name, role="coalesced")
+        self._calls[key] = (task, (call[1] if call else 0) + 1)
+        metrics.set_gauge("ytpdf_singleflight_in_flight", len(self._calls), flight=self.name)
+
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._leave(key, task)
+
+    def _leave(self, key, task):
+        call = self._calls.get(key)
+        if call is None or call[0] is not task:
+            return
+        waiting = call[1] - 1
+        if waiting:
+            self._calls[key] = (task, waiting)
+            return
+        # The last caller left (e.g. every waiter was cancelled): nobody wants the result anymore.
+        del self._calls[key]
+        if not task.done():
+            task.cancel()
+        metrics.set_gauge("ytpdf_singleflight_in_flight", len(self._calls), flight=self.name)
+
+    def _forget(self, key, task):
+        call = self._calls.get(key)
+        if call is not None and call[0] is task:
+            del self._calls[key]
+            metrics.set_gauge("ytpdf_singleflight_in_flight", len(self._calls), flight=self.name)
+        if not task.cancelled():
+            # Marks an error as retrieved, so one nobody awaited anymore isn't logged as "never retrieved".
+            task.exception()
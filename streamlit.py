@@ -1,20 +1,29 @@
 import streamlit as st
-import asyncio
-import younote  # Your updated younote.py
+import streamlit.components.v1 as components
+import jobs
+import artifacts
+import exporters
 import config
+from video_url import InvalidVideoURL, extract_video_id
 from dotenv import load_dotenv
 import os
 import tempfile
+import time
+import uuid
 
 load_dotenv()
 st.title("YouTube Educational Notes Generator")
+artifacts.ensure_server()
 
 # --- Key Handling & Session State Initialization ---
 if 'notes_generated' not in st.session_state:
     st.session_state.notes_generated = False
-    st.session_state.markdown_content = ""
-    st.session_state.pdf_bytes = None
+    # Only artifact handles are kept per session; the notes and PDFs stay on disk.
+    st.session_state.notes = {}
     st.session_state.video_title = "YouTube_Notes"
+if 'watcher_id' not in st.session_state:
+    # Identifies this session among everyone waiting for a shared (deduplicated) job.
+    st.session_state.watcher_id = uuid.uuid4().hex
 
 st.info("Only add the Gemini API key if the site fails to generate the PDF; otherwise, leave it blank.")
 api_key_input = st.text_input("Gemini API Key:", type="password")
@@ -24,7 +33,87 @@ if api_key_to_use:
 
 # --- UI Inputs ---
 youtube_url = st.text_input("Enter YouTube URL:")
-note_type = st.radio("Choose note type:", ["Short Notes", "Long Notes"])
+NOTE_TYPE_OPTIONS = {"Short Notes": 1, "Long Notes": 2, "Both (Short + Long)": 3}
+note_type = st.radio("Choose note type:", list(NOTE_TYPE_OPTIONS))
+export_formats = st.multiselect(
+    "Export formats:",
+    list(exporters.FORMATS),
+    default=list(exporters.EXPORT_FORMATS),
+    format_func=lambda name: exporters.FORMATS[name].label,
+)
+
+STAGE_LABELS = {"analysis": "Video analysis", "short": "Short notes", "long": "Long notes"}
+# Seconds between job status polls while a job is running.
+JOB_POLL_INTERVAL = 0.5
+
+
+def watch_job(job_id):
+    """Polls a job, showing its streamed text live, and returns its final status record."""
+    service = jobs.get_service()
+    status = st.empty()
+    placeholders = {}
+
+    while True:
+        job = service.status(job_id, watcher=st.session_state.watcher_id)
+        if job is None or job["status"] in jobs.FINISHED:
+            break
+
+        if job["status"] == jobs.QUEUED:
+            status.info("Waiting for a free worker...")
+        for stage, text in job["progress"].items():
+            if stage.endswith("_preview"):
+                # The HTML export is ready before the PDF, so it replaces the raw stream meanwhile.
+                variant = stage[:-len("_preview")]
+                if stage in placeholders:
+                    continue
+                if variant not in placeholders:
+                    # Notes served from the cache were never streamed.
+                    st.caption(STAGE_LABELS.get(variant, variant))
+                    placeholders[variant] = st.empty()
+                status.info("Rendering the remaining formats...")
+                with placeholders[variant].container():
+                    components.html(text, height=500, scrolling=True)
+                placeholders[stage] = True
+                continue
+            if f"{stage}_preview" in placeholders:
+                continue
+            if stage not in placeholders:
+                status.info(f"Generating {STAGE_LABELS.get(stage, stage).lower()}...")
+                st.caption(STAGE_LABELS.get(stage, stage))
+                placeholders[stage] = st.empty()
+            placeholders[stage].markdown(text)
+        time.sleep(JOB_POLL_INTERVAL)
+
+    status.empty()
+    return job
+
+
+def load_job(job_id):
+    """Waits for a job and moves its notes into the session state."""
+    # Clicking reruns the script, which stops this poll; the worker then cancels the job.
+    if st.button("Cancel generation", key=f"cancel_{job_id}"):
+        if not jobs.get_service().cancel(job_id, watcher=st.session_state.watcher_id):
+            # Others asked for the same notes: only this session stops waiting.
+            st.info("Stopped waiting for these notes.")
+            st.session_state.job_id = None
+            st.query_params.pop("job", None)
+            return
+
+    job = watch_job(job_id)
+    if job is None:
+        st.error("This job is no longer available, please generate the notes again.")
+    elif job["status"] == jobs.CANCELLED:
+        st.warning(f"Generation stopped: {job['error']}")
+    elif job["status"] == jobs.FAILED:
+        st.error(f"Workflow failed: {job['error']}")
+    else:
+        st.session_state.notes = jobs.get_service().result(job_id)
+        st.session_state.notes_generated = True
+        # You could extract a title here if you add it to the state
+        st.session_state.video_title = f"Notes_for_{extract_video_id(job['youtube_url']) or 'video'}"
+    st.session_state.job_id = None
+    st.query_params.pop("job", None)
+
 
 # --- Generation Button Logic ---
 if st.button("Generate Notes"):
@@ -32,52 +121,77 @@ if st.button("Generate Notes"):
         st.error("A Gemini API key is required.")
     elif not youtube_url:
         st.error("Please enter a YouTube URL.")
+    elif not export_formats:
+        st.error("Please choose at least one export format.")
     else:
-        with st.spinner("Analyzing video and generating notes..."):
-            try:
-                note_type_num = 1 if note_type == "Short Notes" else 2
-                
-                # MODIFIED: Run the workflow and capture the returned state dictionary
-                final_state = asyncio.run(younote.extract_youtube_content(youtube_url, note_type_num))
-                
-                # Check for errors from the workflow
-                if final_state.get("error"):
-                    st.error(f"Workflow failed: {final_state['error']}")
-                else:
-                    # Populate session state from the returned dictionary
-                    st.session_state.notes_generated = True
-                    st.session_state.markdown_content = final_state.get("markdown_content")
-                    st.session_state.pdf_bytes = final_state.get("pdf_bytes")
-                    # You could extract a title here if you add it to the state
-                    st.session_state.video_title = f"Notes_for_{youtube_url[-11:]}"
-
-            except Exception as e:
-                st.error(f"An error occurred: {e}")
+        try:
+            note_type_num = NOTE_TYPE_OPTIONS[note_type]
+            # Generation runs in the job workers; the job ID in the URL survives a page refresh.
+            job_id = jobs.get_service().submit(
+                youtube_url, note_type_num, api_key=config.get_api_key(), formats=export_formats,
+                watcher=st.session_state.watcher_id,
+            )
+            st.session_state.job_id = job_id
+            st.session_state.notes_generated = False
+            st.query_params["job"] = job_id
+        except InvalidVideoURL as e:
+            st.error(str(e))
+        except Exception as e:
+            st.error(f"An error occurred: {e}")
+
+# Resume watching a submitted job after a rerun or refresh.
+pending_job = st.session_state.get("job_id") or st.query_params.get("job")
+if pending_job:
+    with st.container():
+        try:
+            load_job(pending_job)
+        except Exception as e:
+            st.error(f"An error occurred: {e}")
 
 # --- Display Results and Download Button ---
-if st.session_state.notes_generated:
-    st.success("✅ Notes generated successfully!")
+def show_notes(variant, markdown_handle, exports):
+    markdown_content = artifacts.read_text(markdown_handle) if markdown_handle else ""
+    with st.expander(f"View {variant.title()} Markdown Notes"):
+        st.markdown(markdown_content)
 
-    with st.expander("View Markdown Notes"):
-        st.markdown(st.session_state.markdown_content)
-   
-    # Only show download if PDF exists
-    if st.session_state.pdf_bytes:
-        import base64
-        b64 = base64.b64encode(st.session_state.pdf_bytes).decode()
-        
-        # Display PDF in iframe
-        pdf_display = f'<iframe src="data:application/pdf;base64,{b64}" width="700" height="500" type="application/pdf"></iframe>'
-        st.markdown(pdf_display, unsafe_allow_html=True)
-        
-        # And provide the download link
-        st.markdown(f'<a href="data:application/pdf;base64,{b64}" target="_blank">Open PDF in new tab (then save)</a>', unsafe_allow_html=True)
-    else:
-        st.error("PDF generation failed - no download available")
+    exports = {name: handle for name, handle in exports.items() if handle and artifacts.exists(handle)}
+    if not exports:
+        st.error("Export failed - no download available")
         # Offer markdown download as fallback
         st.download_button(
             label="⬇️ Download as Markdown",
-            data=st.session_state.markdown_content,
-            file_name=f"{st.session_state.video_title}.md",
-            mime="text/markdown"
+            data=markdown_content,
+            file_name=f"{st.session_state.video_title}_{variant}.md",
+            mime="text/markdown",
+            key=f"download_md_{variant}",
+        )
+        return
+
+    # The PDF viewer loads the file from the app's own origin (Streamlit static serving,
+    # with range requests) instead of the page carrying it as base64.
+    if "pdf" in exports:
+        pdf_url = artifacts.url_for(exports["pdf"])
+        viewer = f'<iframe src="{pdf_url}" width="700" height="500" type="application/pdf"></iframe>'
+        st.markdown(viewer, unsafe_allow_html=True)
+        st.markdown(f'<a href="{pdf_url}" target="_blank">Open {variant} PDF in new tab</a>', unsafe_allow_html=True)
+    elif "html" in exports:
+        components.html(artifacts.read_text(exports["html"]), height=500, scrolling=True)
+
+    # Downloads go through Streamlit itself, so they work wherever the page does.
+    columns = st.columns(len(exports))
+    for column, (name, handle) in zip(columns, exports.items()):
+        export_format = exporters.FORMATS[name]
+        column.download_button(
+            label=f"⬇️ {export_format.label}",
+            data=artifacts.read(handle),
+            file_name=f"{st.session_state.video_title}_{variant}{export_format.suffix}",
+            mime=artifacts.CONTENT_TYPES.get(export_format.suffix, "application/octet-stream"),
+            key=f"download_{name}_{variant}",
         )
+
+
+if st.session_state.notes_generated:
+    st.success("✅ Notes generated successfully!")
+
+    for variant, notes in st.session_state.notes.items():
+        show_notes(variant, notes["markdown_handle"], notes["exports"])
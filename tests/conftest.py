@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root, not in a package.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ratelimit  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def isolated_rate_limits(tmp_path, monkeypatch):
+    """Gives every test fresh rate-limit budgets instead of the shared .cache store."""
+    monkeypatch.setattr(ratelimit, "RATELIMIT_DB_PATH", str(tmp_path / "ratelimit.sqlite3"))
+    monkeypatch.setattr(ratelimit, "_shared", None)
+    monkeypatch.setattr(ratelimit, "_limiters", {})
@@ -0,0 +1,29 @@
+import os
+import urllib.request
+
+import artifacts
+
+
+def test_url_mirrors_store_layout(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "ARTIFACTS_DIR", str(tmp_path / "static" / "artifacts"))
+    monkeypatch.setattr(artifacts, "ARTIFACT_PUBLIC_URL", "app/static/artifacts")
+    handle = artifacts.put(b"%PDF-1.4 notes")
+
+    url = artifacts.url_for(handle)
+    # Streamlit serves static/ at app/static/, so the URL must match the file's path under it.
+    relative = os.path.relpath(artifacts.path_for(handle), str(tmp_path)).replace(os.sep, "/")
+    assert url == "app/" + relative
+
+
+def test_standalone_server_serves_store_urls(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifacts, "ARTIFACTS_DIR", str(tmp_path))
+    handle = artifacts.put(b"0123456789", ".pdf")
+    server = artifacts.serve(port=0, host="127.0.0.1")
+    try:
+        monkeypatch.setattr(artifacts, "ARTIFACT_PUBLIC_URL", f"http://127.0.0.1:{server.server_port}/artifacts")
+        request = urllib.request.Request(artifacts.url_for(handle), headers={"Range": "bytes=2-4"})
+        with urllib.request.urlopen(request) as response:
+            assert response.status == 206
+            assert response.read() == b"234"
+    finally:
+        server.shutdown()
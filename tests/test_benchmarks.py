@@ -0,0 +1,53 @@
+import argparse
+import asyncio
+import os
+import sys
+
+import pdf_workers
+import ratelimit
+import result_cache
+import transcripts
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+import bench_pipeline  # noqa: E402
+
+
+def _run(monkeypatch, transcript_bytes):
+    monkeypatch.setattr(result_cache, "get_cache", lambda: None)
+    # The fakes have no quota (the script itself sets GEMINI_RPM=0 before importing ratelimit).
+    unlimited = ratelimit.KeyLimiter("bench", rpm=0, tpm=0)
+    monkeypatch.setattr(ratelimit, "get_limiter", lambda api_key=None: unlimited)
+    monkeypatch.setattr(pdf_workers, "PDF_WORKERS", 0)
+    monkeypatch.setattr(transcripts, "TRANSCRIPT_PROVIDER", transcripts.TRANSCRIPT_PROVIDER)
+    args = argparse.Namespace(
+        requests=2, concurrency=2, decision=3,
+        agent_latency=0.01, agent_bytes=2_000, llm_latency=0.01, llm_bytes=1_000,
+        transcript_bytes=transcript_bytes,
+    )
+    return asyncio.run(bench_pipeline.run(args))
+
+
+def test_pipeline_benchmark_runs_against_the_fakes(monkeypatch):
+    stats = _run(monkeypatch, transcript_bytes=0)
+
+    assert stats["errors"] == 0
+    assert stats["agent_calls"] == 2
+
+
+def test_pipeline_benchmark_measures_transcript_fast_path_offline(monkeypatch):
+    fetched = []
+    original = transcripts.FileTranscriptProvider.fetch
+
+    async def fetch(self, video_id):
+        fetched.append(video_id)
+        return await original(self, video_id)
+
+    monkeypatch.setattr(transcripts.FileTranscriptProvider, "fetch", fetch)
+    monkeypatch.setattr(transcripts.YouTubeTranscriptProvider, "fetch", None)
+
+    stats = _run(monkeypatch, transcript_bytes=2_000)
+
+    assert stats["errors"] == 0
+    assert stats["agent_calls"] == 0
+    assert sorted(fetched) == ["bench000000", "bench000001"]
@@ -0,0 +1,55 @@
+import asyncio
+
+import exporters
+import result_cache
+import younote
+
+NOTES = "# Notes\n* point **one**\n"
+URL = "https://www.youtube.com/watch?v=abcdefghijk"
+
+
+def test_export_with_no_formats_renders_nothing():
+    document = exporters.parse(NOTES)
+    assert exporters.export(document, []) == {}
+
+
+def test_quick_exports_skip_pdf_only_requests():
+    document = exporters.parse(NOTES)
+    assert younote.render_quick_exports(document, ("pdf",)) == {}
+    assert set(younote.render_quick_exports(document, ("pdf", "html", "txt"))) == {"html", "txt"}
+
+
+def test_validate_formats_rejects_unknown_and_empty():
+    for formats in (["docx"], []):
+        try:
+            exporters.validate_formats(formats)
+        except ValueError:
+            continue
+        raise AssertionError(f"{formats} was accepted")
+
+
+def test_pdf_only_request_is_served_from_cache(tmp_path, monkeypatch):
+    cache = result_cache.ResultCache(path=str(tmp_path / "cache.sqlite3"))
+    cache.set("abcdefghijk", result_cache.MARKDOWN, NOTES, "short")
+    cache.set("abcdefghijk", result_cache.PDF, b"%PDF-cached", "short")
+    monkeypatch.setattr(result_cache, "get_cache", lambda: cache)
+
+    state = asyncio.run(younote.extract_youtube_content(URL, 1, formats=["pdf"]))
+
+    assert state["error"] is None
+    assert state["exports"] == {"short": {"pdf": b"%PDF-cached"}}
+
+
+def test_pdf_only_request_renders_without_error(monkeypatch):
+    monkeypatch.setattr(result_cache, "get_cache", lambda: None)
+    state = younote._initial_state(URL, 1, formats=["pdf"])
+    state["short_markdown_content"] = NOTES
+
+    async def fake_render_pdf(markdown_content, video_title, video_url, to_file=False):
+        return b"%PDF-rendered"
+
+    monkeypatch.setattr(younote.pdf_workers, "render_pdf", fake_render_pdf)
+    state = asyncio.run(younote.markdown_pdf(state))
+
+    assert state["error"] is None
+    assert state["exports"] == {"short": {"pdf": b"%PDF-rendered"}}
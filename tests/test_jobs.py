@@ -0,0 +1,123 @@
+import asyncio
+import threading
+import time
+
+import jobs
+
+URL = "https://www.youtube.com/watch?v=abcdefghijk"
+
+
+def _service(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs.artifacts, "prune", lambda: None)
+    # No workers: nothing is dispatched unless the test claims jobs itself.
+    return jobs.JobService(store=jobs.JobStore(str(tmp_path / "jobs.sqlite3")), workers=0)
+
+
+def test_cancelled_job_drops_api_key(tmp_path, monkeypatch):
+    service = _service(tmp_path, monkeypatch)
+    job_id = service.submit(URL, 1, api_key="key-1", formats=["pdf"])
+    assert service._keys == {job_id: "key-1"}
+
+    assert service.cancel(job_id)
+    assert service._keys == {}
+
+
+def test_joining_started_job_keeps_no_api_key(tmp_path, monkeypatch):
+    service = _service(tmp_path, monkeypatch)
+    job_id = service.submit(URL, 1, formats=["pdf"])
+    assert service.store.claim_next()["id"] == job_id
+
+    assert service.submit(URL, 1, api_key="key-2", formats=["pdf"]) == job_id
+    assert service._keys == {}
+
+
+def test_joining_queued_job_hands_over_api_key(tmp_path, monkeypatch):
+    service = _service(tmp_path, monkeypatch)
+    job_id = service.submit(URL, 1, formats=["pdf"])
+
+    assert service.submit(URL, 1, api_key="key-3", formats=["pdf"]) == job_id
+    assert service._keys == {job_id: "key-3"}
+
+
+def test_keys_of_jobs_cancelled_elsewhere_are_dropped(tmp_path, monkeypatch):
+    service = _service(tmp_path, monkeypatch)
+    kept = service.submit(URL, 2, api_key="key-4", formats=["pdf"])
+    cancelled = service.submit(URL, 1, api_key="key-5", formats=["pdf"])
+    # Another process sharing the queue cancels the job.
+    jobs.JobStore(service.store.path).cancel(cancelled)
+
+    service._forget_stale_keys()
+    assert service._keys == {kept: "key-4"}
+
+
+def test_key_is_registered_before_dispatcher_can_claim(tmp_path, monkeypatch):
+    service = _service(tmp_path, monkeypatch)
+    submit = service.store.submit
+    claimed = []
+
+    def submit_then_race(*args):
+        job_id = submit(*args)
+        # The dispatcher polls on its own thread and may try to claim the new row right away.
+        dispatcher = threading.Thread(target=lambda: claimed.append(service._claim()))
+        dispatcher.start()
+        dispatcher.join(0.2)
+        racers.append(dispatcher)
+        return job_id
+
+    racers = []
+    monkeypatch.setattr(service.store, "submit", submit_then_race)
+    job_id = service.submit(URL, 1, api_key="key-6", formats=["pdf"])
+    racers[0].join()
+
+    job, api_key = claimed[0]
+    assert job["id"] == job_id
+    assert api_key == "key-6"
+    assert service._keys == {}
+
+
+def test_silent_running_job_is_not_requeued(tmp_path, monkeypatch):
+    store = jobs.JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.submit(URL, 1, ["pdf"])
+    store.claim_next()
+    # Last progress write long ago, e.g. a slow agent tool call that streams nothing.
+    with store._conn:
+        store._conn.execute("UPDATE jobs SET updated_at = ? WHERE id = ?", (time.time() - 3600, job_id))
+
+    async def quiet_consume(*args):
+        await asyncio.sleep(0.05)
+        return {"decision": 1}
+
+    monkeypatch.setattr(jobs, "_consume", quiet_consume)
+    monkeypatch.setattr(jobs, "JOB_POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(jobs, "JOB_HEARTBEAT_INTERVAL", 0)
+    asyncio.run(jobs._execute(store, job_id, URL, 1, ["pdf"], "key"))
+
+    store.requeue_stale(stale_seconds=900)
+    assert store.get(job_id)["status"] == jobs.RUNNING
+
+
+def test_cancel_only_stops_job_when_last_watcher_leaves(tmp_path, monkeypatch):
+    service = _service(tmp_path, monkeypatch)
+    job_id = service.submit(URL, 1, formats=["pdf"], watcher="alice")
+    assert service.submit(URL, 1, formats=["pdf"], watcher="bob") == job_id
+    service.store.claim_next()
+
+    assert not service.cancel(job_id, watcher="alice")
+    assert service.store.stop_reason(job_id) is None
+
+    assert service.cancel(job_id, watcher="bob")
+    assert service.store.stop_reason(job_id) == (jobs.CANCELLED, "Cancelled")
+
+
+def test_watchers_that_stopped_polling_do_not_block_cancel(tmp_path, monkeypatch):
+    service = _service(tmp_path, monkeypatch)
+    job_id = service.submit(URL, 1, formats=["pdf"], watcher="alice")
+    service.submit(URL, 1, formats=["pdf"], watcher="bob")
+    # Bob closed the tab long ago.
+    with service.store._conn:
+        service.store._conn.execute(
+            "UPDATE job_watchers SET seen_at = ? WHERE watcher = ?", (time.time() - 3600, "bob")
+        )
+
+    assert service.cancel(job_id, watcher="alice")
+    assert service.store.get(job_id)["status"] == jobs.CANCELLED
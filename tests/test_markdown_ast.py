@@ -0,0 +1,150 @@
+from markdown_ast import (
+    BlankLine, BlockQuote, Code, CodeBlock, DiagramAlert, Emphasis, Heading, ListItem,
+    Paragraph, Rule, Strong, Table, Text, inline_text, parse, parse_inline,
+)
+
+
+def blocks(markdown):
+    """Parsed blocks without the blank lines between them."""
+    return [block for block in parse(markdown) if not isinstance(block, BlankLine)]
+
+
+# --- Short notes: ## / ### headings, * bullets, **bold** keywords, diagram alerts ---
+
+SHORT_NOTES = """\
+## Photosynthesis
+### Light Reactions
+* Converts **light energy** into **ATP**
+* Happens in the *thylakoid*
+📊 **[DIAGRAM ALERT]**: Chloroplast cross-section showing the thylakoid stacks.
+"""
+
+
+def test_short_notes_structure():
+    assert blocks(SHORT_NOTES) == [
+        Heading(2, (Text("Photosynthesis"),)),
+        Heading(3, (Text("Light Reactions"),)),
+        ListItem(0, False, None, (Text("Converts "), Strong((Text("light energy"),)), Text(" into "), Strong((Text("ATP"),)))),
+        ListItem(0, False, None, (Text("Happens in the "), Emphasis((Text("thylakoid"),)))),
+        DiagramAlert((Text("Chloroplast cross-section showing the thylakoid stacks."),)),
+    ]
+
+
+def test_diagram_alert_variants():
+    for line in (
+        "📊 **[DIAGRAM ALERT]**: A chart",
+        "📊 **[DIAGRAM ALERT]** A chart",
+        "**DIAGRAM ALERT:** A chart",
+    ):
+        assert blocks(line) == [DiagramAlert((Text("A chart"),))], line
+
+
+# --- Long notes: ####, nested bullets, numbered lists, formula fences, tables ---
+
+def test_heading_levels():
+    assert [block.level for block in blocks("## A\n### B\n#### C\n##### D")] == [2, 3, 4, 5]
+    assert blocks("## Closed ##") == [Heading(2, (Text("Closed"),))]
+    # No space after the hashes: not a heading.
+    assert blocks("#hashtag") == [Paragraph((Text("#hashtag"),))]
+
+
+def test_nested_bullets():
+    items = blocks("* top\n  - sub\n    + subsub\n* next")
+    assert [(item.depth, inline_text(item.children)) for item in items] == [
+        (0, "top"), (1, "sub"), (2, "subsub"), (0, "next"),
+    ]
+
+
+def test_numbered_list_keeps_labels():
+    items = blocks(
+        "1. Type of visual\n"
+        "2. What it depicts\n"
+        "3) Key elements\n"
+    )
+    assert [(item.ordered, item.number, inline_text(item.children)) for item in items] == [
+        (True, "1", "Type of visual"),
+        (True, "2", "What it depicts"),
+        (True, "3", "Key elements"),
+    ]
+
+
+def test_code_fences():
+    assert blocks("```python\ndef f(x):\n    return x * 2\n```") == [
+        CodeBlock("def f(x):\n    return x * 2", "python"),
+    ]
+    # Markdown inside a fence is kept verbatim.
+    assert blocks("```\n## not a heading\n* not a bullet\n```") == [
+        CodeBlock("## not a heading\n* not a bullet", ""),
+    ]
+
+
+def test_one_line_formula_fence():
+    # The long notes prompt asks for formulas as ```formula``` on one line.
+    assert blocks("```E = mc^2```\n* after") == [
+        CodeBlock("E = mc^2"),
+        ListItem(0, False, None, (Text("after"),)),
+    ]
+
+
+def test_unterminated_fence_is_dropped():
+    assert blocks("## Before\n```\ncode") == [Heading(2, (Text("Before"),))]
+
+
+def test_table_with_header():
+    (table,) = blocks(
+        "| Stage | Output |\n"
+        "|:------|-------:|\n"
+        "| Light | **ATP** |\n"
+        "| Calvin | Glucose |"
+    )
+    assert isinstance(table, Table)
+    assert [inline_text(cell) for cell in table.header] == ["Stage", "Output"]
+    assert [[inline_text(cell) for cell in row] for row in table.rows] == [["Light", "ATP"], ["Calvin", "Glucose"]]
+    assert table.rows[0][1] == (Strong((Text("ATP"),)),)
+
+
+def test_table_without_separator_has_no_header():
+    (table,) = blocks("| a | b |\n| c | d |")
+    assert table.header == ()
+    assert len(table.rows) == 2
+
+
+def test_quote_and_rule():
+    assert blocks("> Remember this\n---\n***") == [
+        BlockQuote((Text("Remember this"),)),
+        Rule(),
+        Rule(),
+    ]
+
+
+# --- Analysis: bold labels the analysis prompt asks for ---
+
+def test_analysis_labels():
+    parsed = blocks(
+        "**SLIDE 1**: Intro - Course overview\n"
+        "**Minutes 0-2**: Opening topic\n"
+        "- Slide content: Title slide\n"
+    )
+    assert parsed[0] == Paragraph((Strong((Text("SLIDE 1"),)), Text(": Intro - Course overview")))
+    assert parsed[1] == Paragraph((Strong((Text("Minutes 0-2"),)), Text(": Opening topic")))
+    assert parsed[2] == ListItem(0, False, None, (Text("Slide content: Title slide"),))
+
+
+# --- Inline ---
+
+def test_inline_spans():
+    assert parse_inline("**bold** and *it* and `a*b`") == (
+        Strong((Text("bold"),)), Text(" and "), Emphasis((Text("it"),)), Text(" and "), Code("a*b"),
+    )
+
+
+def test_nested_markers():
+    assert parse_inline("***x***") == (Strong((Emphasis((Text("x"),)),)),)
+    assert parse_inline("**bold *it***") == (Strong((Text("bold "), Emphasis((Text("it"),)))),)
+    assert parse_inline("*a **b***") == (Emphasis((Text("a "), Strong((Text("b"),)))),)
+
+
+def test_unmatched_markers_stay_literal():
+    assert parse_inline("a * b * c") == (Text("a * b * c"),)
+    assert parse_inline("**open only") == (Text("**open only"),)
+    assert parse_inline("2 * 3 = 6, `x") == (Text("2 * 3 = 6, `x"),)
@@ -0,0 +1,118 @@
+import asyncio
+
+import anyio
+
+import mcp_pool
+
+
+class FakeSession:
+    """Stands in for a PooledSession without starting an MCP server."""
+
+    started = []
+
+    def __init__(self, server_params=None, timeout_seconds=None):
+        self.tools = object()
+        self.closed = False
+        self.answers_ping = True
+        FakeSession.started.append(self)
+
+    async def start(self):
+        return self
+
+    def is_healthy(self):
+        return not self.closed
+
+    async def ping(self, timeout=None):
+        return self.is_healthy() and self.answers_ping
+
+    async def close(self, timeout=10):
+        self.closed = True
+
+
+class RateLimited(Exception):
+    code = 429
+
+
+def _pool(monkeypatch):
+    FakeSession.started = []
+    monkeypatch.setattr(mcp_pool, "PooledSession", FakeSession)
+    return mcp_pool.MCPSessionPool(server_params=object(), size=1)
+
+
+async def _borrow(pool, error=None):
+    async with pool.session() as tools:
+        if error is not None:
+            raise error
+        return tools
+
+
+def test_model_error_keeps_session(monkeypatch):
+    async def scenario():
+        pool = _pool(monkeypatch)
+        try:
+            await _borrow(pool, RateLimited("429 RESOURCE_EXHAUSTED"))
+        except RateLimited:
+            pass
+        await _borrow(pool)
+
+    asyncio.run(scenario())
+    assert len(FakeSession.started) == 1
+    assert not FakeSession.started[0].closed
+
+
+def test_transport_error_discards_session(monkeypatch):
+    async def scenario():
+        pool = _pool(monkeypatch)
+        try:
+            # Wrapped the way agno re-raises tool failures.
+            try:
+                raise anyio.ClosedResourceError()
+            except anyio.ClosedResourceError as e:
+                raise RuntimeError("tool call failed") from e
+        except RuntimeError as e:
+            try:
+                async with pool.session():
+                    raise e
+            except RuntimeError:
+                pass
+        await _borrow(pool)
+
+    asyncio.run(scenario())
+    assert len(FakeSession.started) == 2
+    assert FakeSession.started[0].closed
+
+
+def test_failed_ping_replaces_idle_session(monkeypatch):
+    async def scenario():
+        pool = _pool(monkeypatch)
+        await _borrow(pool)
+        FakeSession.started[0].answers_ping = False
+        await _borrow(pool)
+
+    asyncio.run(scenario())
+    assert len(FakeSession.started) == 2
+    assert FakeSession.started[0].closed
+    assert not FakeSession.started[1].closed
+
+
+def test_ping_times_out_on_hung_server():
+    class HungClient(mcp_pool.ClientSession):
+        def __init__(self):
+            pass
+
+        async def send_ping(self):
+            await asyncio.sleep(60)
+
+    class Tools:
+        _active_contexts = [HungClient()]
+
+    async def scenario():
+        session = mcp_pool.PooledSession(server_params=None)
+        session._task = asyncio.create_task(asyncio.sleep(60))
+        session.tools = Tools()
+        try:
+            return await session.ping(timeout=0.05)
+        finally:
+            session._task.cancel()
+
+    assert asyncio.run(scenario()) is False
@@ -0,0 +1,108 @@
+import asyncio
+
+import config
+import jobs
+import ratelimit
+import younote
+from langchain_core.messages import AIMessageChunk
+
+
+class Unavailable(Exception):
+    code = 503
+
+
+class FlakyLLM:
+    """Fails with a 503 after two chunks on the first attempt, then streams the full answer."""
+
+    def __init__(self):
+        self.attempts = 0
+
+    async def astream(self, messages):
+        self.attempts += 1
+        for text in ("AAA ", "BBB "):
+            yield AIMessageChunk(content=text, usage_metadata={"input_tokens": 5, "output_tokens": 5, "total_tokens": 10})
+        if self.attempts == 1:
+            raise Unavailable("503 UNAVAILABLE")
+        yield AIMessageChunk(content="CCC", usage_metadata={"input_tokens": 0, "output_tokens": 5, "total_tokens": 5})
+
+
+def _setup(monkeypatch):
+    config.set_api_key("test-key")
+    monkeypatch.setattr(ratelimit, "backoff_delay", lambda attempt, hint=None: 0)
+    settled = []
+    monkeypatch.setattr(ratelimit.KeyLimiter, "settle", lambda self, estimated, actual: settled.append(actual))
+    return settled
+
+
+def test_retried_stream_replaces_partial_text(monkeypatch):
+    settled = _setup(monkeypatch)
+    llm = FlakyLLM()
+    monkeypatch.setattr(younote, "get_llm", lambda: llm)
+    shown = []
+
+    prompt = younote.prompts.get_short_convert_markdown_prompt("content")
+    result = asyncio.run(younote.stream_llm(prompt, shown.append, "short", on_reset=shown.clear))
+
+    assert llm.attempts == 2
+    assert result == "AAA BBB CCC"
+    assert "".join(shown) == result
+    # Only the successful attempt's usage is settled against the reservation.
+    assert settled == [25]
+
+
+def test_agent_usage_is_settled(monkeypatch):
+    settled = _setup(monkeypatch)
+
+    async def fake_agent(message, on_token=None, on_retry=None, on_usage=None):
+        on_usage(1234)
+        return "analysis"
+
+    monkeypatch.setattr(younote, "run_agent", fake_agent)
+    assert asyncio.run(younote.analyze_with_agent("https://youtu.be/abcdefghijk", lambda text: None)) == "analysis"
+    assert settled == [1234]
+
+
+class RecordingStore:
+    def __init__(self):
+        self.progress = {}
+
+    def update_progress(self, job_id, progress):
+        self.progress = dict(progress)
+
+
+def test_job_progress_drops_text_on_reset(monkeypatch):
+    async def fake_stream(*args, **kwargs):
+        for event in (
+            {"type": "token", "stage": "short", "text": "AAA BBB "},
+            {"type": "reset", "stage": "short", "text": ""},
+            {"type": "token", "stage": "short", "text": "AAA BBB CCC"},
+        ):
+            yield event
+        yield {"type": "done", "state": {}}
+
+    monkeypatch.setattr(jobs.younote, "stream_youtube_content", fake_stream)
+    monkeypatch.setattr(jobs, "JOB_PROGRESS_INTERVAL", 0)
+    store = RecordingStore()
+    asyncio.run(jobs._consume(store, "job", "https://youtu.be/abcdefghijk", 1, ["pdf"], None))
+    assert store.progress == {"short": "AAA BBB CCC"}
+
+
+def test_processes_share_one_key_budget(tmp_path):
+    path = str(tmp_path / "ratelimit.sqlite3")
+    # Separate SharedBuckets stand in for two worker processes using the same key.
+    first = ratelimit.KeyLimiter("lane", rpm=2, tpm=0, shared=ratelimit.SharedBuckets(path))
+    second = ratelimit.KeyLimiter("lane", rpm=2, tpm=0, shared=ratelimit.SharedBuckets(path))
+
+    assert first.requests.reserve(2) == 0
+    assert 29 < second.requests.reserve(1) <= 30
+
+
+def test_rate_limit_backoff_reaches_other_processes(tmp_path):
+    path = str(tmp_path / "ratelimit.sqlite3")
+    first = ratelimit.KeyLimiter("lane", rpm=60, tpm=0, shared=ratelimit.SharedBuckets(path))
+    second = ratelimit.KeyLimiter("lane", rpm=60, tpm=0, shared=ratelimit.SharedBuckets(path))
+
+    first.rate_limited(retry_after=20)
+
+    assert second.requests.factor == 0.5
+    assert 19 < second.requests.reserve(1) <= 20
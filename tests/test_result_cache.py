@@ -0,0 +1,53 @@
+import sqlite3
+
+import exporters
+import prompts
+import result_cache
+
+
+def test_pdf_key_follows_renderer_version(monkeypatch):
+    pdf_key = result_cache.make_key("abcdefghijk", result_cache.PDF, "short")
+    markdown_key = result_cache.make_key("abcdefghijk", result_cache.MARKDOWN, "short")
+
+    monkeypatch.setattr(exporters, "RENDERER_VERSION", exporters.RENDERER_VERSION + "-next")
+
+    assert result_cache.make_key("abcdefghijk", result_cache.PDF, "short") != pdf_key
+    assert result_cache.make_key("abcdefghijk", result_cache.MARKDOWN, "short") == markdown_key
+
+
+def test_prompt_version_changes_every_derived_key(monkeypatch):
+    keys = {kind: result_cache.make_key("abcdefghijk", kind) for kind in (result_cache.CONTENT, result_cache.PDF)}
+    transcript_key = result_cache.make_key("abcdefghijk", result_cache.TRANSCRIPT)
+
+    monkeypatch.setattr(prompts, "PROMPT_VERSION", prompts.PROMPT_VERSION + "-next")
+
+    for kind, key in keys.items():
+        assert result_cache.make_key("abcdefghijk", kind) != key
+    assert result_cache.make_key("abcdefghijk", result_cache.TRANSCRIPT) == transcript_key
+
+
+def test_cached_pdf_from_older_renderer_is_not_served(tmp_path, monkeypatch):
+    cache = result_cache.ResultCache(path=str(tmp_path / "cache.sqlite3"))
+    cache.set("abcdefghijk", result_cache.PDF, b"%PDF-old", "short")
+    assert cache.get("abcdefghijk", result_cache.PDF, "short") == b"%PDF-old"
+
+    monkeypatch.setattr(exporters, "RENDERER_VERSION", exporters.RENDERER_VERSION + "-next")
+    assert cache.get("abcdefghijk", result_cache.PDF, "short") is None
+
+
+class LockedConnection:
+    """Stands in for a connection whose database another process holds locked."""
+
+    def execute(self, *args):
+        raise sqlite3.OperationalError("database is locked")
+
+    def rollback(self):
+        pass
+
+
+def test_sqlite_errors_are_cache_misses(tmp_path):
+    cache = result_cache.ResultCache(path=str(tmp_path / "cache.sqlite3"))
+    cache._conn = LockedConnection()
+
+    cache.set("abcdefghijk", result_cache.MARKDOWN, "# Notes", "short")
+    assert cache.get("abcdefghijk", result_cache.CONTENT) is None
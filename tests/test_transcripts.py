@@ -0,0 +1,21 @@
+import asyncio
+
+import pytest
+
+import transcripts
+
+
+def test_provider_without_fetch_fails_when_built():
+    class Incomplete(transcripts.TranscriptProvider):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_file_provider_reads_transcript(tmp_path):
+    (tmp_path / "abcdefghijk.txt").write_text("[00:00] Hello", encoding="utf-8")
+    provider = transcripts.get_provider(f"file:{tmp_path}")
+
+    assert asyncio.run(provider.fetch("abcdefghijk")) == "[00:00] Hello"
+    assert asyncio.run(provider.fetch("missing0000")) is None
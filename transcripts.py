@@ -0,0 +1,118 @@
+import asyncio
+import os
+from abc import ABC, abstractmethod
+
+import result_cache
+
+# "youtube" (default) uses youtube-transcript-api, "file:<dir>" reads <dir>/<video_id>.txt,
+# "none" disables the transcript fast path.
+TRANSCRIPT_PROVIDER = os.getenv("TRANSCRIPT_PROVIDER", "youtube")
+TRANSCRIPT_LANGUAGES = os.getenv("TRANSCRIPT_LANGUAGES", "en").split(",")
+
+def format_timestamp(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+def format_segments(segments) -> str:
+    """Joins (start_seconds, text) segments, starting a new [mm:ss] line every minute."""
+    lines = []
+    current_minute = None
+    for start, text in segments:
+        text = " ".join(text.split())
+        if not text:
+            continue
+        minute = int(start) // 60
+        if minute != current_minute:
+            lines.append(f"[{format_timestamp(start)}] {text}")
+            current_minute = minute
+        else:
+            lines[-1] += " " + text
+    return "\n".join(lines)
+
+
+class TranscriptProvider(ABC):
+    """Fetches a video's transcript; returns None when none is available."""
+
+    @abstractmethod
+    async def fetch(self, video_id: str):
+        """Returns the transcript as "[mm:ss] text" lines, or None."""
+
+
+class FileTranscriptProvider(TranscriptProvider):
+    """Reads transcripts from <directory>/<video_id>.txt; a local stand-in for tests and offline runs."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    async def fetch(self, video_id: str):
+        path = os.path.join(self.directory, f"{video_id}.txt")
+        if not os.path.isfile(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+
+
+class YouTubeTranscriptProvider(TranscriptProvider):
+    """Fetches captions with the optional youtube-transcript-api package."""
+
+    def __init__(self, languages=None):
+        self.languages = languages or TRANSCRIPT_LANGUAGES
+
+    def _fetch_sync(self, video_id):
+        try:
+            from youtube_transcript_api import YouTubeTranscriptApi
+        except ImportError:
+            print("youtube-transcript-api is not installed; skipping transcript fast path")
+            return None
+
+        try:
+            if hasattr(YouTubeTranscriptApi, "get_transcript"):
+                # 0.x releases: class method returning a list of dicts
+                raw = YouTubeTranscriptApi.get_transcript(video_id, languages=self.languages)
+                segments = [(item["start"], item["text"]) for item in raw]
+            else:
+                fetched = YouTubeTranscriptApi().fetch(video_id, languages=self.languages)
+                segments = [(snippet.start, snippet.text) for snippet in fetched]
+        except Exception as e:
+            print(f"No transcript available for {video_id}: {e}")
+            return None
+        return format_segments(segments) or None
+
+    async def fetch(self, video_id: str):
+        return await asyncio.to_thread(self._fetch_sync, video_id)
+
+
+def get_provider(spec: str = None):
+    """Builds the provider named by TRANSCRIPT_PROVIDER (or `spec`), or None if disabled."""
+    spec = spec or TRANSCRIPT_PROVIDER
+    if spec == "none":
+        return None
+    if spec.startswith("file:"):
+        return FileTranscriptProvider(spec[len("file:"):])
+    return YouTubeTranscriptProvider()
+
+
+async def get_transcript(video_id: str, provider=None):
+    """Returns the transcript for a video, from the result cache when possible."""
+    provider = provider or get_provider()
+    if provider is None or not video_id:
+        return None
+
+    cache = result_cache.get_cache()
+    if cache is not None:
+        cached = cache.get(video_id, result_cache.TRANSCRIPT)
+        if cached:
+            return cached
+
+    try:
+        transcript = await provider.fetch(video_id)
+    except Exception as e:
+        # A failing provider must never break the pipeline; the agent path still works.
+        print(f"Transcript provider failed for {video_id}: {e}")
+        return None
+    if transcript and transcript.strip():
+        if cache is not None:
+            cache.set(video_id, result_cache.TRANSCRIPT, transcript)
+        return transcript
+    return None
@@ -0,0 +1,117 @@
+"""
+YouTube URL parsing and validation.
+
+Every entry point runs the URL through parse_video_url before any expensive
+work, so a bad URL fails in microseconds instead of after an agent run. The
+video ID it returns is what cache keys, job dedup keys and file names use.
+"""
+import re
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+VIDEO_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{11}$")
+PLAYLIST_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{2,64}$")
+# "90", "90s", "1m30s", "1h2m3s"
+TIMESTAMP_PATTERN = re.compile(r"^(?:(\d+)h)?(?:(\d+)m)?(?:(\d+)s?)?$")
+# Path prefixes followed by the video ID on youtube.com.
+ID_PATH_PREFIXES = ("shorts", "embed", "live", "v", "e")
+YOUTUBE_HOSTS = {"youtube.com", "youtube-nocookie.com"}
+SHORT_HOSTS = {"youtu.be"}
+# Subdomains that serve the same pages as www.
+HOST_PREFIXES = ("www.", "m.", "music.")
+MAX_URL_LENGTH = 2048
+
+
+class InvalidVideoURL(ValueError):
+    """Raised for input that isn't a link to a single YouTube video."""
+
+
+@dataclass(frozen=True)
+class VideoURL:
+    video_id: str
+    # Start time in seconds from t= / start=, if the link had one.
+    start_seconds: Optional[int] = None
+    playlist_id: Optional[str] = None
+
+    @property
+    def url(self) -> str:
+        """Canonical watch URL, without timestamp, playlist or tracking parameters."""
+        return f"https://www.youtube.com/watch?v={self.video_id}"
+
+
+def _parse_timestamp(value: str) -> Optional[int]:
+    match = TIMESTAMP_PATTERN.match(value.strip().lower())
+    if not match or not any(match.groups()):
+        return None
+    hours, minutes, seconds = (int(group or 0) for group in match.groups())
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def _host(netloc: str) -> str:
+    host = netloc.rsplit("@", 1)[-1].split(":", 1)[0].lower()
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix):
+            return host[len(prefix):]
+    return host
+
+
+def parse_video_url(url: str) -> VideoURL:
+    """
+    Parses a YouTube video link (watch, youtu.be, shorts, embed and live links,
+    on www., m. and music. hosts) or a bare video ID.
+
+    Raises InvalidVideoURL for anything else, including playlist-only links.
+    """
+    text = (url or "").strip()
+    if not text:
+        raise InvalidVideoURL("Please enter a YouTube URL.")
+    if len(text) > MAX_URL_LENGTH:
+        raise InvalidVideoURL("The URL is too long.")
+    if VIDEO_ID_PATTERN.match(text):
+        return VideoURL(text)
+
+    if "://" not in text:
+        text = "https://" + text
+    parts = urlsplit(text)
+    if parts.scheme.lower() not in ("http", "https"):
+        raise InvalidVideoURL(f"Not a web link: {url!r}")
+    host = _host(parts.netloc)
+    query = parse_qs(parts.query)
+    segments = [segment for segment in parts.path.split("/") if segment]
+
+    if host in SHORT_HOSTS:
+        candidate = segments[0] if segments else ""
+    elif host in YOUTUBE_HOSTS:
+        if segments[:1] == ["watch"]:
+            candidate = query.get("v", [""])[0]
+        elif len(segments) >= 2 and segments[0] in ID_PATH_PREFIXES:
+            candidate = segments[1]
+        elif segments[:1] == ["playlist"]:
+            raise InvalidVideoURL("Playlist links aren't supported; please link a single video.")
+        else:
+            candidate = ""
+    else:
+        raise InvalidVideoURL(f"Not a YouTube link: {url!r}")
+
+    if not VIDEO_ID_PATTERN.match(candidate):
+        raise InvalidVideoURL(f"No valid video ID in {url!r}")
+
+    start = query.get("t") or query.get("start")
+    # Timestamps also come as a fragment, e.g. youtu.be/ID#t=90.
+    if not start and parts.fragment.startswith("t="):
+        start = [parts.fragment[2:]]
+    playlist = query.get("list", [""])[0]
+    return VideoURL(
+        video_id=candidate,
+        start_seconds=_parse_timestamp(start[0]) if start else None,
+        playlist_id=playlist if PLAYLIST_ID_PATTERN.match(playlist) else None,
+    )
+
+
+def extract_video_id(url: str) -> Optional[str]:
+    """Returns the video ID of a YouTube link, or None if it isn't one."""
+    try:
+        return parse_video_url(url).video_id
+    except InvalidVideoURL:
+        return None
@@ -2,41 +2,150 @@ from typing import TypedDict
 import os
 import config
 
-from langgraph.graph import StateGraph, END
-from langchain_google_genai import ChatGoogleGenerativeAI
+# langgraph, the agent (agno, mcp) and ReportLab are imported on first use, so that
+# importing this module (the web app, job and CLI entry points) stays cheap.
 import asyncio
-import re
+import functools
+import threading
+import uuid
 from datetime import datetime
 import prompts
-import pdf_converter
-from yt_mcp import run_agent
+import chunking
+import compaction
+import exporters
+import pdf_workers
+import result_cache
+import singleflight
+import metrics
+import ratelimit
+import transcripts
+from clients import get_llm
+from video_url import extract_video_id, parse_video_url
+
+def _cache_for(state):
+    """Returns (cache, video_id) when the result of this state can be cached."""
+    cache = result_cache.get_cache()
+    video_id = extract_video_id(state["youtube_url"])
+    if cache is None or video_id is None:
+        return None, None
+    return cache, video_id
+
+# decision: 1 = short notes, 2 = long notes, 3 = both from a single analysis
+DECISION_TEXT = {1: "short", 2: "long", 3: "both"}
+NOTE_TYPES = {1: ["short"], 2: ["long"], 3: ["short", "long"]}
+CONVERT_PROMPTS = {
+    "short": prompts.get_short_convert_markdown_prompt,
+    "long": prompts.get_long_convert_markdown_prompt,
+}
+
+# Per-node time limits in seconds; a node that runs over ends the workflow with an error.
+NODE_TIMEOUTS = {
+    "analyze_video": float(os.getenv("ANALYZE_TIMEOUT", "900")),
+    "markdown": float(os.getenv("MARKDOWN_TIMEOUT", "600")),
+    "markdown_to_pdf": float(os.getenv("PDF_TIMEOUT", "300")),
+}
+
+async def _gather_or_cancel(*aws):
+    """Like asyncio.gather, but one failure cancels the siblings instead of leaving them running."""
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+async def run_agent(message: str, on_token=None, on_retry=None, on_usage=None) -> str:
+    """Runs the MCP agent; yt_mcp (and with it agno and mcp) is imported on the first call."""
+    from yt_mcp import run_agent as run_mcp_agent
+
+    return await run_mcp_agent(message, on_token=on_token, on_retry=on_retry, on_usage=on_usage)
+
+def _stream_writer():
+    """Returns LangGraph's custom stream writer, or a no-op outside a graph run."""
+    try:
+        from langgraph.config import get_stream_writer
+
+        return get_stream_writer()
+    except Exception:
+        return lambda chunk: None
+
+def stage_stream(stage):
+    """
+    Returns (on_token, reset) for one streamed stage.
+
+    on_token forwards a chunk to the graph's custom stream. reset tells consumers
+    to drop the stage's text so far; it's called before a failed streamed call is
+    retried, so the retry's text replaces the partial one instead of following it.
+    """
+    writer = _stream_writer()
+    streamed = False
+
+    def on_token(text):
+        nonlocal streamed
+        streamed = True
+        writer({"stage": stage, "text": text})
+
+    def reset():
+        nonlocal streamed
+        if streamed:
+            streamed = False
+            writer({"type": "reset", "stage": stage, "text": ""})
+
+    return on_token, reset
 
 class State(TypedDict):
     youtube_url: str
     content: str
     decision: int
     decision_text:str
+    # markdown_content / pdf_bytes hold the last requested variant (long when decision is 3);
+    # the per-variant fields below hold each note type separately.
     markdown_content:str
     pdf_bytes: bytes
+    # Correlates metrics records of one workflow run.
+    request_id: str
+    short_markdown_content: str
+    long_markdown_content: str
+    short_pdf_bytes: bytes
+    long_pdf_bytes: bytes
+    # Export formats to render (exporters.FORMATS names) and their output,
+    # {note_type: {format: bytes}}; the *_pdf_bytes fields hold the PDFs too.
+    formats: list
+    exports: dict
     error: str 
 
 async def analyze_video_content(state: State) -> State:
     try:
         youtube_url = state["youtube_url"]
         print(f"Analyzing video: {youtube_url}")
-        
-        prompt = prompts.get_video_analysis_prompt(youtube_url)
-        print("Prompt generated successfully")
-        print(f"Prompt: {prompt[:200]}...") 
-        
-        print("Calling run_agent...")
-        response = await run_agent(prompt)
-        print(f"Raw response from run_agent: {response[:500]}...")
-        
+
+        cache, video_id = _cache_for(state)
+        if cache is not None:
+            cached = cache.get(video_id, result_cache.CONTENT)
+            if cached:
+                print(f"Using cached analysis for {video_id}")
+                state["content"] = cached
+                return state
+
+        on_token, reset = stage_stream("analysis")
+
+        # Fast path: one Gemini call over the captions instead of the agent's tool loop.
+        transcript = await transcripts.get_transcript(extract_video_id(youtube_url))
+        if transcript:
+            print(f"Analyzing from transcript ({len(transcript)} chars)")
+            response = await analyze_transcript(youtube_url, transcript, on_token, reset)
+        else:
+            print("No transcript available, falling back to the agent")
+            response = await analyze_with_agent(youtube_url, on_token, reset)
+
         if not response or len(response.strip()) == 0:
-            raise ValueError("Empty response received from agent")
-            
+            raise ValueError("Empty analysis response received")
+
         state["content"] = response
+        if cache is not None:
+            cache.set(video_id, result_cache.CONTENT, response)
         return state
         
     except Exception as e:
@@ -49,6 +158,66 @@ async def analyze_video_content(state: State) -> State:
         return state
 
 
+async def stream_llm(prompt, on_token, name, on_reset=None):
+    """
+    Streams one Gemini completion of a prompts.Prompt under the key's rate limit, passing each chunk to on_token.
+
+    on_reset() is called before a retry, once chunks of the failed attempt were already passed on.
+    """
+    llm = get_llm()
+    used_tokens = 0
+
+    async def attempt():
+        nonlocal used_tokens
+        used_tokens = 0
+        chunks = []
+        async for chunk in llm.astream(prompt.messages()):
+            metrics.record_usage(chunk)
+            used_tokens += (getattr(chunk, "usage_metadata", None) or {}).get("total_tokens", 0)
+            text = chunk.content if hasattr(chunk, 'content') else str(chunk)
+            if text:
+                chunks.append(text)
+                on_token(text)
+        return "".join(chunks)
+
+    return await ratelimit.call(
+        attempt, name, ratelimit.estimate_tokens(prompt),
+        on_retry=on_reset, used_tokens=lambda: used_tokens,
+    )
+
+
+async def analyze_transcript(youtube_url, transcript, on_token, on_reset=None):
+    """Analyzes a video from its transcript with a single streamed Gemini call."""
+    prompt = prompts.get_transcript_analysis_prompt(youtube_url, transcript)
+    return await stream_llm(prompt, on_token, "analysis", on_reset)
+
+
+async def analyze_with_agent(youtube_url, on_token, on_reset=None):
+    """Lets the agent fetch and summarize the video through the MCP tool."""
+    prompt = prompts.get_video_analysis_prompt(youtube_url)
+    print("Prompt generated successfully")
+    print(f"Prompt: {prompt.content.strip()[:200]}...")
+
+    print("Calling run_agent...")
+    used_tokens = 0
+
+    def record_usage(tokens):
+        nonlocal used_tokens
+        used_tokens = tokens
+
+    # A run is at least two model calls: the tool call and the final answer.
+    response = await ratelimit.call(
+        lambda: run_agent(prompt.text, on_token=on_token, on_retry=on_reset, on_usage=record_usage),
+        "agent",
+        ratelimit.estimate_tokens(prompt),
+        requests=2,
+        on_retry=on_reset,
+        used_tokens=lambda: used_tokens,
+    )
+    print(f"Raw response from run_agent: {response[:500]}...")
+    return response
+
+
 async def display_content(state: State) -> State:
     if state.get("error"):
         print(f"Error: {state['error']}")
@@ -57,25 +226,86 @@ async def display_content(state: State) -> State:
     
     return state
 
-def convert_markdown_format(state: State) -> State:
-    llm = ChatGoogleGenerativeAI(
-        model="gemini-2.5-flash",
-        api_key=config.get_api_key(),
-        temperature=0
+def compact_for_conversion(content, conversions=1):
+    """Compacts the analysis for the conversion prompts, recording the tokens it saves."""
+    if not compaction.COMPACT_CONTENT:
+        return content
+    compacted, stats = compaction.compact(content)
+    print(
+        f"Compacted analysis {stats.chars_before} -> {stats.chars_after} chars "
+        f"({stats.duplicates_removed} repeated passages, {stats.headings_removed} scaffolding lines removed)"
     )
-    
+    # Each conversion (one per requested variant) sends the analysis again.
+    metrics.record_saved_tokens(stats.saved_chars // 4 * conversions)
+    return compacted
+
+async def convert_markdown_format(state: State) -> State:
     content = state["content"]
     decision = state["decision"]
+    state["decision_text"] = DECISION_TEXT[decision]
+    note_types = NOTE_TYPES[decision]
+
+    cache, video_id = _cache_for(state)
+    results = {}
+    pending = []
+    for note_type in note_types:
+        cached = cache.get(video_id, result_cache.MARKDOWN, note_type) if cache is not None else None
+        if cached:
+            print(f"Using cached {note_type} notes for {video_id}")
+            results[note_type] = cached
+        else:
+            pending.append(note_type)
+
+    if pending:
+        content = compact_for_conversion(content, len(pending))
+        llm = get_llm()
+
+        async def stream(prompt, note_type):
+            # Tokens are forwarded to the graph's custom stream as they arrive.
+            on_token, reset = stage_stream(note_type)
+            return await stream_llm(prompt, on_token, note_type, reset)
 
-    if decision == 1:
-        state["decision_text"] = "short"
-        prompt = prompts.get_short_convert_markdown_prompt(content)
-    elif decision == 2:
-        state["decision_text"] = "long"
-        prompt = prompts.get_long_convert_markdown_prompt(content)
+        async def convert(note_type):
+            if not chunking.needs_map_reduce(content):
+                return await stream(CONVERT_PROMPTS[note_type](content), note_type)
 
-    response = llm.invoke(prompt)
-    state["markdown_content"] = response.content if hasattr(response, 'content') else str(response)
+            # Long lectures: convert each part in parallel, then merge in one reduce pass.
+            parts = chunking.split_analysis(content)
+            print(f"Map-reduce {note_type} conversion over {len(parts)} parts")
+            limit = asyncio.Semaphore(chunking.MAP_PARALLELISM)
+
+            async def convert_part(index, part):
+                async with limit:
+                    prompt = prompts.get_chunk_convert_markdown_prompt(part, note_type, index, len(parts))
+                    response = await ratelimit.call(
+                        lambda: llm.ainvoke(prompt.messages()), f"{note_type}_part", ratelimit.estimate_tokens(prompt)
+                    )
+                    metrics.record_usage(response)
+                    return response.content if hasattr(response, 'content') else str(response)
+
+            partial_notes = await _gather_or_cancel(
+                *(convert_part(index, part) for index, part in enumerate(parts, 1))
+            )
+            merge_prompt = prompts.get_merge_markdown_prompt("\n\n".join(partial_notes), note_type)
+            return await stream(merge_prompt, note_type)
+
+        # One analysis fans out into every requested variant, converted concurrently
+        # without blocking the event loop shared with other workflows.
+        try:
+            markdowns = await _gather_or_cancel(*(convert(note_type) for note_type in pending))
+        except Exception as e:
+            error_msg = f"Markdown conversion failed: {e}"
+            print(f"❌ {error_msg}")
+            state["error"] = error_msg
+            return state
+        for note_type, markdown in zip(pending, markdowns):
+            results[note_type] = markdown
+            if cache is not None:
+                cache.set(video_id, result_cache.MARKDOWN, markdown, note_type)
+
+    for note_type, markdown in results.items():
+        state[f"{note_type}_markdown_content"] = markdown
+    state["markdown_content"] = results[note_types[-1]]
     
     return state
 
@@ -85,69 +315,289 @@ def process_video_to_pdf(video_url, markdown_notes, note_type):
     
     Args:
         video_url (str): YouTube URL
-        markdown_notes (str): Generated markdown content from your prompts
+        markdown_notes (str or iterable of str): Generated markdown content from your
+            prompts, either whole or as streamed chunks
         note_type (str): "short" or "long" for filename distinction
+
+    Returns:
+        str: Path of the PDF written to disk
     """
     
     # Generate appropriate filename
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    video_id = re.search(r'(?:v=|youtu\.be/)([^&\n?#]+)', video_url)
-    video_id_str = video_id.group(1) if video_id else "unknown"
+    video_id_str = extract_video_id(video_url) or "unknown"
     
     output_filename = f"notes_{note_type}_{video_id_str}_{timestamp}.pdf"
     
-    return pdf_converter.convert_notes_to_pdf(
-        markdown_content=markdown_notes,
-        output_filename=output_filename,
+    import pdf_converter
+
+    chunks = [markdown_notes] if isinstance(markdown_notes, str) else markdown_notes
+    pdf_converter.render_notes_to_sink(
+        chunks,
+        output_filename,
         video_title=f"Educational Notes ({note_type.title()})",
         video_url=video_url
     )
+    return output_filename
 
-def markdown_pdf(state: State) -> State:
-    """Generates a PDF from markdown and stores the bytes in the state."""
+def note_document(state, note_type):
+    """Parses one note type's markdown into the document every export format renders from."""
+    return exporters.parse(
+        state[f"{note_type}_markdown_content"],
+        title=f"YouTube Notes ({note_type.title()})",
+        source_url=state["youtube_url"],
+    )
+
+def render_quick_exports(document, formats):
+    """Renders every requested format except the PDF, which is left to the worker pool."""
+    return exporters.export(document, [name for name in formats if name != "pdf"])
+
+async def markdown_pdf(state: State) -> State:
+    """
+    Renders every requested note type in every requested export format.
+
+    Each note type's markdown is parsed once. HTML, EPUB and text are built
+    inline and the HTML goes out as a preview event right away; the PDF (if
+    requested) is rendered in the worker pool from the same parsed blocks.
+    """
     try:
-        pdf_data = pdf_converter.convert_notes_to_pdf(
-            markdown_content=state["markdown_content"],
-            video_title=f"YouTube Notes ({state['decision_text'].title()})",
-            video_url=state["youtube_url"],
-        )
-        state["pdf_bytes"] = pdf_data
-        print("✅ PDF generated in memory.")
+        cache, video_id = _cache_for(state)
+        note_types = NOTE_TYPES[state["decision"]]
+        formats = exporters.validate_formats(state.get("formats"))
+        writer = _stream_writer()
+        documents = {}
+        exports = {}
+        pending = []
+        for note_type in note_types:
+            documents[note_type] = note_document(state, note_type)
+            exports[note_type] = render_quick_exports(documents[note_type], formats)
+            if "html" in exports[note_type]:
+                writer({"type": "preview", "stage": note_type, "text": exports[note_type]["html"].decode("utf-8")})
+            if "pdf" not in formats:
+                continue
+            cached = cache.get(video_id, result_cache.PDF, note_type) if cache is not None else None
+            if cached:
+                state[f"{note_type}_pdf_bytes"] = cached
+                print(f"✅ {note_type.title()} PDF served from cache.")
+            else:
+                pending.append(note_type)
+
+        # ReportLab layout is CPU-bound, so it runs in the worker pool and variants render in parallel.
+        pdfs = await _gather_or_cancel(*(
+            pdf_workers.render_pdf(
+                markdown_content=documents[note_type].blocks,
+                video_title=documents[note_type].title,
+                video_url=documents[note_type].source_url,
+            )
+            for note_type in pending
+        ))
+        for note_type, pdf_data in zip(pending, pdfs):
+            state[f"{note_type}_pdf_bytes"] = pdf_data
+            if cache is not None:
+                cache.set(video_id, result_cache.PDF, pdf_data, note_type)
+            print(f"✅ {note_type.title()} PDF generated.")
+        if "pdf" in formats:
+            for note_type in note_types:
+                exports[note_type]["pdf"] = state[f"{note_type}_pdf_bytes"]
+        state["exports"] = exports
+        state["pdf_bytes"] = state[f"{note_types[-1]}_pdf_bytes"]
     except Exception as e:
-        error_msg = f"PDF conversion failed: {e}"
+        error_msg = f"Export failed: {e}"
         print(f"❌ {error_msg}")
         state["error"] = error_msg
     return state
 
-# Build workflow
-workflow = StateGraph(State)
+def with_timeout(name, node):
+    """
+    Bounds a node by NODE_TIMEOUTS[name].
+
+    On timeout the node's in-flight calls are cancelled and the state gets an
+    error, so routing stops the workflow instead of the caller hanging.
+    """
+    seconds = NODE_TIMEOUTS.get(name)
+    if not seconds:
+        return node
+
+    @functools.wraps(node)
+    async def wrapper(state):
+        try:
+            return await asyncio.wait_for(node(state), timeout=seconds)
+        except asyncio.TimeoutError:
+            error_msg = f"{name} timed out after {seconds:g}s"
+            print(f"❌ {error_msg}")
+            state["error"] = error_msg
+            return state
+
+    return wrapper
+
+def continue_unless_error(next_node):
+    """Routes to next_node, or straight to END once a node has recorded an error."""
+    from langgraph.graph import END
+
+    def route(state: State):
+        return END if state.get("error") else next_node
+    return route
+
+def build_workflow():
+    """Builds the (uncompiled) notes workflow graph."""
+    from langgraph.graph import StateGraph, END
+
+    workflow = StateGraph(State)
+
+    # Every node is wrapped so its timing, tokens, bytes and cache hits are recorded.
+    workflow.add_node("analyze_video", metrics.instrument("analyze_video", with_timeout("analyze_video", analyze_video_content)))
+    workflow.add_node("display", metrics.instrument("display", display_content))
+    workflow.add_node("markdown", metrics.instrument("markdown", with_timeout("markdown", convert_markdown_format)))
+    workflow.add_node("markdown_to_pdf", metrics.instrument("markdown_to_pdf", with_timeout("markdown_to_pdf", markdown_pdf)))
 
-workflow.add_node("analyze_video", analyze_video_content)
-workflow.add_node("display", display_content)
-workflow.add_node("markdown",convert_markdown_format)
-workflow.add_node("markdown_to_pdf",markdown_pdf)
+    workflow.set_entry_point("analyze_video")
 
-workflow.set_entry_point("analyze_video")
+    # A failed stage ends the run, so no paid call is made on empty or partial content.
+    workflow.add_conditional_edges("analyze_video", continue_unless_error("markdown"), ["markdown", END])
+    workflow.add_conditional_edges("markdown", continue_unless_error("markdown_to_pdf"), ["markdown_to_pdf", END])
+    workflow.add_edge("markdown_to_pdf", END)
+    return workflow
 
-workflow.add_edge("analyze_video","markdown")
-workflow.add_edge("markdown","markdown_to_pdf")
-workflow.add_edge("markdown_to_pdf", END)
+_app = None
+_app_lock = threading.Lock()
 
-app = workflow.compile()
+def get_app():
+    """Returns the compiled workflow, importing langgraph and compiling it on first use."""
+    global _app
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                _app = build_workflow().compile()
+    return _app
 
-async def extract_youtube_content(youtube_url: str, decision: int):
-    """Invokes the workflow and returns the final state dictionary."""
-    initial_state = State(
-        youtube_url=youtube_url,
+def __getattr__(name):
+    # `younote.app` still works, compiled lazily on first access.
+    if name == "app":
+        return get_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+_workflow_flights = singleflight.SingleFlight("workflow")
+
+def _initial_state(youtube_url: str, decision: int, request_id: str = None, formats=None) -> State:
+    """Validates the request (raising InvalidVideoURL or ValueError) and returns the workflow's first state."""
+    if decision not in NOTE_TYPES:
+        raise ValueError(f"Unknown decision {decision!r}; expected one of {sorted(NOTE_TYPES)}")
+    return State(
+        request_id=request_id or uuid.uuid4().hex,
+        # The canonical URL, so the agent and the PDFs never see tracking or playlist parameters.
+        youtube_url=parse_video_url(youtube_url).url,
         content="",
         decision=decision,
         decision_text="",
         markdown_content="",
         pdf_bytes=None,
+        short_markdown_content="",
+        long_markdown_content="",
+        short_pdf_bytes=None,
+        long_pdf_bytes=None,
+        formats=list(exporters.validate_formats(formats)),
+        exports={},
         error=None,
     )
-    final_state = await app.ainvoke(initial_state)
-    return final_state
+
+async def extract_youtube_content(
+    youtube_url: str, decision: int, request_id: str = None, api_key: str = None, formats=None
+):
+    """
+    Invokes the workflow and returns the final state dictionary.
+
+    api_key, if given, is used for this run only; otherwise the key already set
+    in the caller's context (config.set_api_key) applies. formats picks the
+    export formats (default exporters.EXPORT_FORMATS). A URL that isn't a
+    YouTube video link raises video_url.InvalidVideoURL before any work starts.
+    """
+    if api_key:
+        with config.api_key_context(api_key):
+            return await extract_youtube_content(youtube_url, decision, request_id, formats=formats)
+
+    initial_state = _initial_state(youtube_url, decision, request_id, formats)
+
+    with metrics.stage("cache", initial_state["request_id"]):
+        cached_state = _load_cached_result(initial_state)
+    if cached_state is not None:
+        return cached_state
+
+    if not singleflight.COALESCE_REQUESTS:
+        return await get_app().ainvoke(initial_state)
+    # Identical requests made while this one runs share its workflow run; each
+    # caller gets its own copy of the final state.
+    key = (extract_video_id(initial_state["youtube_url"]), decision, tuple(initial_state["formats"]))
+    final_state = await _workflow_flights.run(key, lambda: get_app().ainvoke(initial_state))
+    return dict(final_state)
+
+
+async def stream_youtube_content(
+    youtube_url: str, decision: int, request_id: str = None, api_key: str = None, formats=None
+):
+    """
+    Runs the workflow and yields events as it progresses.
+
+    Yields {"type": "token", "stage": ..., "text": ...} for every chunk the agent
+    ("analysis") or the Gemini conversion ("short"/"long") produces, a
+    {"type": "reset", "stage": ..., "text": ""} when a failed call is retried
+    and that stage's text so far must be dropped, a
+    {"type": "preview", "stage": note_type, "text": html} per note type once its
+    HTML export is ready (before the PDF), then a single {"type": "done", "state":
+    final_state}. Closing the generator early cancels the in-flight generation.
+    api_key, formats and URL validation work as in extract_youtube_content.
+    """
+    if api_key:
+        with config.api_key_context(api_key):
+            async for event in stream_youtube_content(youtube_url, decision, request_id, formats=formats):
+                yield event
+        return
+
+    initial_state = _initial_state(youtube_url, decision, request_id, formats)
+
+    with metrics.stage("cache", initial_state["request_id"]):
+        cached_state = _load_cached_result(initial_state)
+    if cached_state is not None:
+        yield {"type": "done", "state": cached_state}
+        return
+
+    final_state = initial_state
+    async for mode, chunk in get_app().astream(initial_state, stream_mode=["custom", "values"]):
+        if mode == "custom":
+            yield {"type": chunk.get("type", "token"), "stage": chunk["stage"], "text": chunk["text"]}
+        else:
+            final_state = chunk
+    yield {"type": "done", "state": final_state}
+
+
+def _load_cached_result(state: State):
+    """Returns a finished state straight from the cache, skipping the graph entirely."""
+    cache, video_id = _cache_for(state)
+    note_types = NOTE_TYPES.get(state["decision"])
+    if cache is None or note_types is None:
+        return None
+
+    formats = state["formats"]
+    for note_type in note_types:
+        markdown_content = cache.get(video_id, result_cache.MARKDOWN, note_type)
+        pdf_bytes = cache.get(video_id, result_cache.PDF, note_type) if "pdf" in formats else None
+        if not markdown_content or ("pdf" in formats and not pdf_bytes):
+            return None
+        state[f"{note_type}_markdown_content"] = markdown_content
+        state[f"{note_type}_pdf_bytes"] = pdf_bytes
+
+    # Only the PDF is worth caching; the other formats render from the markdown in milliseconds.
+    for note_type in note_types:
+        state["exports"][note_type] = render_quick_exports(note_document(state, note_type), formats)
+        if "pdf" in formats:
+            state["exports"][note_type]["pdf"] = state[f"{note_type}_pdf_bytes"]
+
+    decision_text = DECISION_TEXT[state["decision"]]
+    print(f"Serving {decision_text} notes for {video_id} from cache")
+    state["content"] = cache.get(video_id, result_cache.CONTENT) or ""
+    state["decision_text"] = decision_text
+    state["markdown_content"] = state[f"{note_types[-1]}_markdown_content"]
+    state["pdf_bytes"] = state[f"{note_types[-1]}_pdf_bytes"]
+    return state
 
 async def main(yt,dec):
     # if api:
@@ -1,14 +1,52 @@
 import anyio
-import config
-from agno.tools.mcp import MultiMCPTools
+import clients
+import metrics
 from agno.agent import Agent
 from agno.models.google import Gemini
-from mcp import StdioServerParameters
+from mcp_pool import get_pool
 import asyncio
 import datetime
+import inspect
 import os
 
-async def run_agent(message: str) -> str:
+async def _stream_agent(agent, message, on_token):
+    """Runs the agent in streaming mode, passing each content chunk to on_token."""
+    stream = agent.arun(message, stream=True)
+    # Older agno releases return the iterator from a coroutine, newer ones return it directly.
+    if inspect.isawaitable(stream):
+        stream = await stream
+
+    chunks = []
+    async for chunk in stream:
+        text = getattr(chunk, "content", None)
+        if isinstance(text, str) and text:
+            chunks.append(text)
+            on_token(text)
+    return "".join(chunks)
+
+
+def _record_agent_usage(agent):
+    """Reports the agent run's token usage to the current metrics stage and returns its total."""
+    run_metrics = getattr(getattr(agent, "run_response", None), "metrics", None) or {}
+
+    def total(key):
+        value = run_metrics.get(key, 0)
+        # agno reports one value per model call within the run.
+        return sum(value) if isinstance(value, list) else (value or 0)
+
+    metrics.record_tokens(total("input_tokens"), total("output_tokens"))
+    return total("input_tokens") + total("output_tokens")
+
+
+async def run_agent(message: str, on_token=None, on_retry=None, on_usage=None) -> str:
+    """
+    Runs the summarizer agent on a pooled MCP session and returns its full response.
+
+    If on_token is given, the agent streams and on_token(text) is called for every
+    chunk as it arrives; the concatenated text is still returned at the end.
+    on_retry() is called before the run is retried on a fresh session, and
+    on_usage(tokens) with the run's total token usage.
+    """
     print(f"Starting run_agent with message: {message[:100]}...")
     try:
         # Try different node paths
@@ -30,31 +68,44 @@ async def run_agent(message: str) -> str:
        
         print(f"Using node path: {node_path}")
        
-        mcp_tools_brevo = StdioServerParameters(
-            command="npx",
-            args=["-y", "youtube-video-summarizer-mcp"],
-        )
-           
-        async with MultiMCPTools(server_params_list=[mcp_tools_brevo], timeout_seconds=120.0) as mcp_tools_main:
-            print("MCP Tools initialized successfully")
-            agent = Agent(
-                model=Gemini(api_key=config.get_api_key()),
-                tools=[mcp_tools_main],
-                markdown=True,
-                show_tool_calls=True,
-                retries=2,
-            )
-           
-            print(f"Sending request to agent...")
-            response = await agent.arun(message)
-            response = response.content
-            print(f"Agent response received: {response[:200]}..." if response else "No response from agent")
-           
-            if not response:
-                raise ValueError("Empty response received from agent")
-               
-            return str(response)
-           
+        pool = get_pool()
+        for attempt in range(2):
+            try:
+                async with pool.session() as mcp_tools_main:
+                    print("MCP Tools ready (pooled session)")
+                    agent = Agent(
+                        # Shares the pooled genai client (and its connections) of this request's key.
+                        model=Gemini(client=clients.get_genai_client()),
+                        tools=[mcp_tools_main],
+                        markdown=True,
+                        show_tool_calls=True,
+                    )
+
+                    print(f"Sending request to agent...")
+                    if on_token is not None:
+                        response = await _stream_agent(agent, message, on_token)
+                    else:
+                        response = await agent.arun(message)
+                        response = response.content
+                    tokens = _record_agent_usage(agent)
+                    if on_usage is not None:
+                        on_usage(tokens)
+                break
+            except anyio.ClosedResourceError:
+                # The pool has already discarded the dead session; retry once on a fresh one.
+                if attempt == 1:
+                    raise
+                print("MCP stream closed, restarting session and retrying...")
+                if on_retry is not None:
+                    on_retry()
+
+        print(f"Agent response received: {response[:200]}..." if response else "No response from agent")
+
+        if not response:
+            raise ValueError("Empty response received from agent")
+
+        return str(response)
+
     except anyio.ClosedResourceError as e:
         error_msg = f"MCP stream closed unexpectedly: {str(e)}"
         print(error_msg)